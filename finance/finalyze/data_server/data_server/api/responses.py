@@ -0,0 +1,210 @@
+"""Fast JSON responses with ETag revalidation.
+
+FastAPI normally runs every returned dict through jsonable_encoder (a
+recursive pure-Python walk) and then json.dumps. For bar and fundamentals
+payloads with thousands of rows that walk dominates the response time, so
+routes on the API router use FastJSONRoute: endpoint results are encoded
+directly with orjson, which also handles datetimes, NumPy scalars/arrays
+and Decimals without a Python-level conversion per value.
+
+Endpoints with a `fmt` parameter can also answer fmt=arrow (Arrow IPC
+stream) or fmt=parquet when their result is tabular: a list of row dicts,
+or a {symbol: row dict} mapping (returned with a leading "symbol" column).
+Clients load these straight into a DataFrame without parsing JSON.
+
+ETagMiddleware tags successful GET JSON/Arrow/Parquet responses with a
+hash of the body and answers a matching If-None-Match with an empty 304,
+so a client that re-requests an unchanged payload skips the transfer and
+the parse.
+"""
+
+import functools
+import hashlib
+from decimal import Decimal
+from typing import Any, Callable
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from fastapi import HTTPException
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# fmt values answered with a columnar body instead of JSON
+TABULAR_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as JSON bytes (NaN/Infinity become null)."""
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def to_arrow_table(data: Any):
+    """Arrow table from a list of row dicts or a {symbol: row dict} mapping."""
+    import pyarrow as pa
+
+    if isinstance(data, dict) and all(isinstance(v, dict) for v in data.values()):
+        rows = [{"symbol": key, **value} for key, value in data.items()]
+    elif isinstance(data, list) and all(isinstance(r, dict) for r in data):
+        rows = data
+    else:
+        raise HTTPException(status_code=400, detail="This endpoint has no tabular format; use fmt=json")
+
+    # Union of keys in first-seen order (rows may carry optional fields)
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    try:
+        return pa.table({name: [row.get(name) for row in rows] for name in names})
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Result is not tabular: {e}")
+
+
+def tabular_response(data: Any, fmt: str) -> Response:
+    """Encode a tabular result as an Arrow IPC stream or Parquet file."""
+    return table_response(to_arrow_table(data), fmt)
+
+
+def table_response(table: Any, fmt: str) -> Response:
+    """Encode an Arrow table as an Arrow IPC stream or Parquet file.
+
+    Endpoints that already hold columnar data build the table from their
+    arrays directly and return this, skipping the row dicts.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return Response(content=sink.getvalue().to_pybytes(), media_type=TABULAR_MEDIA_TYPES[fmt])
+
+
+class FastJSONRoute(APIRoute):
+    """APIRoute whose endpoint results skip jsonable_encoder.
+
+    Plain return values are wrapped in a FastJSONResponse before FastAPI
+    serializes them (or a tabular response when the endpoint's `fmt`
+    argument is arrow/parquet); endpoints returning a Response are left
+    alone. Routes with an explicit response_model keep FastAPI's validation.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        response_model = kwargs.get("response_model")
+        if isinstance(response_model, DefaultPlaceholder):
+            response_model = response_model.value
+        if response_model is None:
+            endpoint = _wrap_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _wrap_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # functools.wraps keeps the signature FastAPI inspects for parameters
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = await endpoint(*args, **kwargs)
+        if isinstance(result, Response):
+            return result
+        fmt = kwargs.get("fmt")
+        if fmt in TABULAR_MEDIA_TYPES:
+            return tabular_response(result, fmt)
+        return FastJSONResponse(result)
+
+    return wrapper
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag or candidate == "*":
+            return True
+    return False
+
+
+class ETagMiddleware:
+    """Add ETags to GET data responses and answer If-None-Match with 304."""
+
+    # Headers kept on a 304 (RFC 9110 section 15.4.5)
+    _NOT_MODIFIED_HEADERS = {"etag", "cache-control", "vary", "date", "expires"}
+    _MEDIA_TYPES = ("application/json", *TABULAR_MEDIA_TYPES.values())
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Message = {}
+        chunks: list[bytes] = []
+        passthrough = False
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                if (
+                    message["status"] != 200
+                    or "etag" in headers
+                    or not headers.get("content-type", "").startswith(self._MEDIA_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            if if_none_match and _etag_matches(if_none_match, etag):
+                raw = [
+                    (name, value)
+                    for name, value in start.get("headers", [])
+                    if name.decode("latin-1").lower() in self._NOT_MODIFIED_HEADERS
+                ]
+                raw.append((b"etag", etag.encode("latin-1")))
+                await send({"type": "http.response.start", "status": 304, "headers": raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            MutableHeaders(scope=start).append("etag", etag)
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
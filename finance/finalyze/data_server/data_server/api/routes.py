@@ -6,14 +6,21 @@ import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from data_server import metrics
 from data_server.config import get_settings
 from data_server.db.database import get_session
 from data_server.db import cache
+from data_server.db.bar_cache import daily_bar_cache
+from data_server.db.resample import INTERVAL_SECONDS, resampled_bar_cache
+from data_server.db.rollups import rollup_tier_for
+from data_server.api.responses import TABULAR_MEDIA_TYPES, FastJSONRoute, table_response
 from data_server.services.eodhd_client import get_eodhd_client, get_eodhd_stats
+from data_server.services.request_scheduler import Priority, get_request_scheduler_stats, run_at_priority
 from data_server.utils.exchange_hours import is_market_open as is_exchange_market_open
 
 logger = logging.getLogger(__name__)
@@ -24,7 +31,7 @@ settings = get_settings()
 _earnings_cache: Dict[str, tuple] = {}
 _EARNINGS_CACHE_TTL = 3600  # 1 hour
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 # EODHD exchange code → native currency mapping
 # Used to fix cases where EODHD/yfinance returns ADR data (USD) for non-US listings
@@ -200,6 +207,9 @@ async def get_fetch_lock(cache_key: str) -> asyncio.Lock:
 
 def log_timing(endpoint: str, cache_hit: bool, cache_time_ms: float, eodhd_time_ms: float = 0, total_time_ms: float = 0):
     """Log cache hit/miss and timing information."""
+    # "GET /eod/AAPL.US?from=..." -> "eod"
+    data_type = endpoint.partition(" /")[2].split("/", 1)[0].split("?", 1)[0]
+    metrics.record_cache(data_type, cache_hit)
     status = "CACHE HIT" if cache_hit else "CACHE MISS"
     if cache_hit:
         logger.info(f"[{status}] {endpoint} | cache lookup: {cache_time_ms:.1f}ms | total: {total_time_ms:.1f}ms")
@@ -261,6 +271,63 @@ async def _append_live_price_bar(session, symbol: str, data: list, to_date) -> l
     return data
 
 
+async def _fetch_daily_range(
+    symbol: str, from_: Optional[str], to: Optional[str], period: str = "d"
+) -> tuple[list[dict], bool]:
+    """Fetch daily bars from EODHD, falling back to yfinance.
+
+    Returns (bars, answered); answered is False when every source failed,
+    so an empty result is not mistaken for a range without trading days.
+    """
+    from data_server.services.yfinance_client import is_exchange_supported_by_eodhd
+    exchange_code = symbol.split(".")[-1] if "." in symbol else "US"
+
+    # Fetch from EODHD (only if exchange is supported)
+    data = []
+    answered = False
+    if is_exchange_supported_by_eodhd(exchange_code):
+        client = await get_eodhd_client()
+        try:
+            data = await client.get_eod(symbol, from_, to, period)
+            answered = True
+        except Exception as e:
+            logger.warning(f"EODHD error for {symbol}: {e}")
+            data = []  # Let yfinance fallback handle it
+    else:
+        logger.info(f"Skipping EODHD for {symbol} (exchange {exchange_code} not supported)")
+
+    # If EODHD returned nothing or was skipped, try yfinance as fallback
+    if not data:
+        try:
+            from data_server.services.yfinance_client import get_daily_prices as yf_daily
+            ticker_part = symbol.split(".")[0]
+            data = await yf_daily(ticker_part, exchange_code, from_, to)
+            answered = True
+            if data:
+                logger.info(f"yfinance returned {len(data)} daily bars for {symbol}")
+        except Exception as e:
+            logger.warning(f"yfinance daily fallback failed for {symbol}: {e}")
+
+    return data or [], answered
+
+
+async def _start_covered(
+    session: AsyncSession,
+    symbol: str,
+    from_date_obj,
+    oldest_date_obj,
+) -> bool:
+    """Whether cached bars reach back far enough to serve from_date_obj."""
+    if not from_date_obj or oldest_date_obj <= from_date_obj + timedelta(days=5):
+        # Allow up to 5 days slack (weekends + holidays)
+        return True
+    # Older start (e.g. before listing): trust the coverage index
+    covered = await cache.get_daily_coverage_ranges(session, symbol)
+    return not cache.missing_date_ranges(
+        covered, from_date_obj, oldest_date_obj - timedelta(days=1)
+    )
+
+
 @router.get("/eod/{symbol}")
 async def get_eod_prices(
     symbol: str,
@@ -268,7 +335,7 @@ async def get_eod_prices(
     from_: Optional[str] = Query(None, alias="from", description="Start date (YYYY-MM-DD)"),
     to: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     period: str = Query("d", description="Period: d, w, m"),
-    fmt: str = Query("json", description="Format (always json)"),
+    fmt: str = Query("json", description="Format: json, arrow (IPC stream) or parquet"),
     session: AsyncSession = Depends(get_session),
 ):
     """Get end-of-day prices for a symbol (cached).
@@ -311,9 +378,7 @@ async def get_eod_prices(
             start_covered = True
             if from_date_obj and oldest_date:
                 oldest_date_obj = datetime.fromisoformat(oldest_date).date() if isinstance(oldest_date, str) else oldest_date
-                # Allow up to 5 days slack (weekends + holidays)
-                if oldest_date_obj > from_date_obj + timedelta(days=5):
-                    start_covered = False
+                start_covered = await _start_covered(session, symbol, from_date_obj, oldest_date_obj)
 
             # Cache hit if data is fresh enough.
             # For historical ranges (to_date in the past), always use cache.
@@ -339,9 +404,10 @@ async def get_eod_prices(
                 log_timing(endpoint, True, cache_time, 0, total_time)
                 return cached_data
 
-    # Cache miss - need to fetch from EODHD
+    # Cache miss - need to fetch from EODHD. The lock is per symbol so that
+    # overlapping ranges wait for each other and reuse the recorded coverage.
     cache_key = f"eod:{symbol}:{from_}:{to}:{period}"
-    fetch_lock = await get_fetch_lock(cache_key)
+    fetch_lock = await get_fetch_lock(f"eod:{symbol}")
     async with fetch_lock:
         # Expire session cache to see changes from other transactions
         session.expire_all()
@@ -360,46 +426,63 @@ async def get_eod_prices(
                 start_covered = True
                 if from_date_obj and oldest_date:
                     oldest_date_obj = datetime.fromisoformat(oldest_date).date() if isinstance(oldest_date, str) else oldest_date
-                    if oldest_date_obj > from_date_obj + timedelta(days=5):
-                        start_covered = False
+                    start_covered = await _start_covered(session, symbol, from_date_obj, oldest_date_obj)
                 if start_covered and (days_behind <= 1 or to_date_obj < today):
                     cached_data = await _append_live_price_bar(session, symbol, cached_data, to_date)
                     total_time = (time.time() - start_time) * 1000
                     logger.info(f"[CACHE HIT after lock] {endpoint}")
                     return cached_data
 
-        # Check if EODHD supports this exchange
-        from data_server.services.yfinance_client import is_exchange_supported_by_eodhd
-        exchange_code = symbol.split(".")[-1] if "." in symbol else "US"
-
-        # Fetch from EODHD (only if exchange is supported)
         eodhd_start = time.time()
-        data = []
-        if is_exchange_supported_by_eodhd(exchange_code):
-            client = await get_eodhd_client()
-            try:
-                data = await client.get_eod(symbol, from_, to, period)
-            except Exception as e:
-                logger.warning(f"EODHD error for {symbol}: {e}")
-                data = []  # Let yfinance fallback handle it
+        if period != "d":
+            # Weekly/monthly bars are not tracked by the coverage index
+            data, _ = await _fetch_daily_range(symbol, from_, to, period)
+            count = await cache.store_daily_prices(session, symbol, data)
         else:
-            logger.info(f"Skipping EODHD for {symbol} (exchange {exchange_code} not supported)")
+            # Only fetch the sub-ranges the coverage index doesn't know about
+            from datetime import date as date_type
+            today = datetime.now().date()
+            req_start = from_date.date() if from_date else date_type.min
+            req_end = min(to_date.date() if to_date else today, today)
+            covered = await cache.get_daily_coverage_ranges(session, symbol)
+            gaps = cache.missing_date_ranges(covered, req_start, req_end)
+
+            results = await asyncio.gather(*(
+                _fetch_daily_range(
+                    symbol,
+                    None if gap_start == date_type.min else gap_start.isoformat(),
+                    gap_end.isoformat(),
+                )
+                for gap_start, gap_end in gaps
+            ))
+            if gaps:
+                logger.info(f"Fetching {len(gaps)} missing daily range(s) for {symbol}: "
+                            f"{[(str(a), str(b)) for a, b in gaps]}")
+
+            # Record answered gaps as complete. Today's bar is never final, and
+            # yesterday's may not be published yet, so recent gaps only count
+            # up to the newest bar the upstream actually returned.
+            new_coverage = []
+            complete_until = today - timedelta(days=1)
+            for (gap_start, gap_end), (bars, answered) in zip(gaps, results):
+                if not answered:
+                    continue
+                end = min(gap_end, complete_until)
+                if gap_end >= complete_until:
+                    newest = max((str(b.get("date")) for b in bars if b.get("date")), default=None)
+                    if newest is None:
+                        continue
+                    end = min(end, date_type.fromisoformat(newest[:10]))
+                if gap_start <= end:
+                    new_coverage.append((gap_start, end))
+
+            count = await cache.store_daily_prices(
+                session, symbol, [bar for bars, _ in results for bar in bars]
+            )
+            await cache.add_daily_coverage(session, symbol, new_coverage)
         eodhd_time = (time.time() - eodhd_start) * 1000
 
-        # If EODHD returned nothing or was skipped, try yfinance as fallback
-        if not data:
-            try:
-                from data_server.services.yfinance_client import get_daily_prices as yf_daily
-                ticker_part = symbol.split(".")[0]
-                exchange_part = symbol.split(".")[-1] if "." in symbol else "US"
-                data = await yf_daily(ticker_part, exchange_part, from_, to)
-                if data:
-                    logger.info(f"yfinance returned {len(data)} daily bars for {symbol}")
-            except Exception as e:
-                logger.warning(f"yfinance daily fallback failed for {symbol}: {e}")
-
         # Store in cache (even if empty, to avoid repeated fetches for missing data)
-        count = await cache.store_daily_prices(session, symbol, data)
         await cache.update_cache_metadata(
             session,
             cache_key,
@@ -410,6 +493,8 @@ async def get_eod_prices(
         )
         await session.commit()
 
+        if period == "d":
+            data = await cache.get_daily_prices(session, symbol, from_date, to_date)
         data = await _append_live_price_bar(session, symbol, data, to_date)
 
         total_time = (time.time() - start_time) * 1000
@@ -418,14 +503,46 @@ async def get_eod_prices(
         return data
 
 
+# Days of intraday history each upstream keeps per bar interval
+_EODHD_INTRADAY_HISTORY = {"1m": 120, "5m": 600, "1h": 7200}
+_YFINANCE_INTRADAY_HISTORY = {"1m": 7, "5m": 60, "1h": 730}
+
+
+def _upstream_interval(
+    interval: str,
+    history: Dict[str, int],
+    from_ts: Optional[datetime],
+    to_ts: Optional[datetime],
+) -> str:
+    """Bar interval to fetch from an upstream for an intraday request.
+
+    1-minute bars are fetched for ranges of up to a day inside the
+    upstream's 1m history. Older or longer ranges get the coarsest upstream
+    interval that evenly divides the requested one and still reaches back
+    to the range start, so 5m/1h charts over months are neither empty nor
+    60x larger than needed.
+    """
+    now = datetime.utcnow()
+    start = from_ts or now
+    age_days = (now - start).total_seconds() / 86400
+    span_days = ((to_ts or now) - start).total_seconds() / 86400
+    if age_days <= history["1m"] and (interval == "1m" or span_days <= 1):
+        return "1m"
+
+    step = INTERVAL_SECONDS[interval]
+    divisors = [iv for iv in history if step % INTERVAL_SECONDS[iv] == 0]
+    reaching = [iv for iv in divisors if age_days <= history[iv]]
+    return max(reaching or divisors, key=INTERVAL_SECONDS.get)
+
+
 @router.get("/intraday/{symbol}")
 async def get_intraday_prices(
     symbol: str,
     api_token: str = Query(None),
-    interval: str = Query("1m", description="Interval: 1m, 5m, 1h"),
+    interval: str = Query("1m", description="Interval: 1m, 5m, 15m, 1h, 1d"),
     from_: Optional[int] = Query(None, alias="from", description="Start timestamp"),
     to: Optional[int] = Query(None, description="End timestamp"),
-    fmt: str = Query("json"),
+    fmt: str = Query("json", description="Format: json, arrow (IPC stream) or parquet"),
     force_eodhd: bool = Query(False, description="Force fetch from EODHD API (bypass price worker data)"),
     session: AsyncSession = Depends(get_session),
 ):
@@ -439,10 +556,24 @@ async def get_intraday_prices(
     When market is closed: checks if cached data is from 'live' source.
     If so, tries to fetch from EODHD for proper OHLC data.
     EODHD takes several hours after close to have data, so falls back to cached if unavailable.
+
+    Bars are fetched as 1-minute bars while the range is inside the
+    upstream's 1m history and stored in intraday_prices; older or multi-day
+    ranges at 5m or coarser are fetched at the coarsest fitting interval and
+    stored straight into the intraday_rollups tiers. Coarser intervals are
+    aggregated server-side before returning. Historical requests at 5m or
+    coarser are served from the intraday_rollups tiers when complete.
     """
+    if interval not in INTERVAL_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported interval '{interval}' (expected one of {', '.join(INTERVAL_SECONDS)})",
+        )
+
     start_time = time.time()
-    # Use full symbol (e.g., LULU.US) for consistency with daily prices
-    cache_key = f"intraday:{symbol}:{interval}:{from_}:{to}"
+    # Use full symbol (e.g., LULU.US) for consistency with daily prices.
+    # Stored bars are 1m regardless of the requested interval.
+    cache_key = f"intraday:{symbol}:1m:{from_}:{to}"
     endpoint = f"GET /intraday/{symbol}?interval={interval}"
     from_ts = datetime.utcfromtimestamp(from_) if from_ else None
     to_ts = datetime.utcfromtimestamp(to) if to else None
@@ -468,6 +599,29 @@ async def get_intraday_prices(
     # For today's data, use shorter TTL (60s) to get fresh updates
     cache_ttl = settings.cache_daily_prices if not is_today else settings.cache_intraday_prices
 
+    def resampled(bars: list[dict]) -> list[dict]:
+        return resampled_bar_cache.resample(symbol, interval, bars, from_, to)
+
+    # A full US trading day has ~390 1-minute bars (9:30 AM - 4:00 PM ET).
+    # Consider data "complete" if it covers at least 80% of the day.
+    min_complete_bars = 310
+
+    # Historical ranges at 5m or coarser: serve complete EODHD data from the
+    # coarsest rollup tier instead of scanning (possibly compacted) raw minutes
+    tier = rollup_tier_for(interval)
+    if tier and not is_today:
+        cache_start = time.time()
+        rollup = await cache.get_intraday_rollups(session, symbol, tier, from_ts, to_ts)
+        cache_time = (time.time() - cache_start) * 1000
+        if rollup["source"] == "eodhd" and rollup["minutes"] >= min_complete_bars:
+            bars = rollup["bars"]
+            if interval != tier:
+                bars = resampled_bar_cache.resample(symbol, interval, bars, from_, to)
+            total_time = (time.time() - start_time) * 1000
+            log_timing(endpoint, True, cache_time, 0, total_time)
+            logger.info(f"[CACHE HIT] {tier} rollup for {symbol} ({len(bars)} bars)")
+            return bars
+
     # Check cached data first
     cache_start = time.time()
     cached_data = await cache.get_intraday_prices(session, symbol, from_ts, to_ts)
@@ -501,7 +655,7 @@ async def get_intraday_prices(
         if cached_data:
             total_time = (time.time() - start_time) * 1000
             log_timing(endpoint, True, cache_time, 0, total_time)
-            return cached_data
+            return resampled(cached_data)
 
         # If requesting today and no cached data:
         # - For US stocks during/before market hours: return empty (data accumulates from price worker)
@@ -518,16 +672,12 @@ async def get_intraday_prices(
                 # Non-US stock - market may have already closed today, try yfinance
                 logger.info(f"Non-US stock {symbol}, no cached data today - trying yfinance fallback")
 
-    # A full US trading day has ~390 1-minute bars (9:30 AM - 4:00 PM ET).
-    # Consider data "complete" if it covers at least 80% of the day.
-    min_complete_bars = 310
-
     # If we already have complete EODHD data, return it
     if cached_source == "eodhd" and cached_data and len(cached_data) >= min_complete_bars:
         total_time = (time.time() - start_time) * 1000
         log_timing(endpoint, True, cache_time, 0, total_time)
         logger.info(f"[CACHE HIT] EODHD data for {symbol} ({len(cached_data)} bars)")
-        return cached_data
+        return resampled(cached_data)
 
     if cached_source == "eodhd" and cached_data:
         logger.info(f"Cached EODHD data for {symbol} is incomplete ({len(cached_data)} bars < {min_complete_bars}), retrying")
@@ -541,14 +691,19 @@ async def get_intraday_prices(
         from data_server.services.yfinance_client import is_exchange_supported_by_eodhd
         eodhd_supported = is_exchange_supported_by_eodhd(exchange_code)
 
-        # Fetch from EODHD (only if exchange is supported)
+        # Fetch from EODHD (only if exchange is supported). Today's bars
+        # are always 1m so they line up with the price worker's minutes.
+        eodhd_interval = "1m" if is_today else _upstream_interval(
+            interval, _EODHD_INTRADAY_HISTORY, from_ts, to_ts
+        )
+        data_interval = eodhd_interval
         eodhd_start = time.time()
         data = []
         if eodhd_supported:
-            logger.info(f"Fetching {symbol} from EODHD")
+            logger.info(f"Fetching {symbol} from EODHD ({eodhd_interval})")
             client = await get_eodhd_client()
             try:
-                data = await client.get_intraday(symbol, interval, from_, to)
+                data = await client.get_intraday(symbol, eodhd_interval, from_, to)
             except Exception as e:
                 logger.warning(f"EODHD error for {symbol}: {e}")
                 data = []  # Let yfinance fallback handle it below
@@ -556,12 +711,15 @@ async def get_intraday_prices(
             logger.info(f"Skipping EODHD for {symbol} (exchange {exchange_code} not supported)")
         eodhd_time = (time.time() - eodhd_start) * 1000
 
+        def covered_minutes(bars: list[dict], bar_interval: str) -> int:
+            return len(bars) * INTERVAL_SECONDS[bar_interval] // 60 if bars else 0
+
         # If EODHD data is missing or incomplete, try yfinance as fallback
         # Always try yfinance if EODHD returned nothing (exchange may not be supported)
-        eodhd_count = len(data) if data else 0
-        eodhd_is_complete = eodhd_count >= min_complete_bars
-        if not eodhd_is_complete and (not market_open or eodhd_count == 0):
-            logger.info(f"EODHD data incomplete for {symbol} ({eodhd_count} bars), trying yfinance fallback")
+        eodhd_minutes = covered_minutes(data, eodhd_interval)
+        eodhd_is_complete = eodhd_minutes >= min_complete_bars
+        if not eodhd_is_complete and (not market_open or eodhd_minutes == 0):
+            logger.info(f"EODHD data incomplete for {symbol} ({len(data)} {eodhd_interval} bars), trying yfinance fallback")
 
             try:
                 from data_server.services.yfinance_client import get_intraday_prices as yf_intraday
@@ -571,16 +729,23 @@ async def get_intraday_prices(
                 ticker_part = symbol.split(".")[0]
                 exchange_part = symbol.split(".")[-1] if "." in symbol else "US"
 
+                yf_interval = "1m" if is_today else _upstream_interval(
+                    interval, _YFINANCE_INTRADAY_HISTORY, from_ts, to_ts
+                )
+                end_date = to_ts.date() if to_ts and yf_interval != "1m" else None
+
                 yf_data = await yf_intraday(
                     ticker=ticker_part,
                     exchange=exchange_part,
-                    interval=interval,
+                    interval=yf_interval,
                     target_date=target_date,
+                    end_date=end_date,
                 )
 
-                if yf_data and len(yf_data) > eodhd_count:
-                    logger.info(f"yfinance returned {len(yf_data)} bars for {symbol} (vs EODHD {eodhd_count})")
+                if covered_minutes(yf_data, yf_interval) > eodhd_minutes:
+                    logger.info(f"yfinance returned {len(yf_data)} {yf_interval} bars for {symbol} (vs EODHD {len(data)})")
                     data = yf_data
+                    data_interval = yf_interval
                 else:
                     logger.info(f"yfinance returned {len(yf_data) if yf_data else 0} bars, not better than EODHD")
             except Exception as e:
@@ -610,23 +775,29 @@ async def get_intraday_prices(
                         logger.info(f"Replacing {len(cached_data)} flat bars with LivePrice summary for {symbol}: "
                                     f"O={summary_bar['open']} H={summary_bar['high']} "
                                     f"L={summary_bar['low']} C={summary_bar['close']}")
-                        return [summary_bar]
-                return cached_data
+                        return resampled([summary_bar])
+                return resampled(cached_data)
             return []
 
         # Only mark as 'eodhd' source if data covers most of the trading day.
         # Otherwise keep as 'live' so we retry on next request.
-        is_complete = len(data) >= min_complete_bars
+        data_minutes = covered_minutes(data, data_interval)
+        is_complete = data_minutes >= min_complete_bars
         source_label = "eodhd" if is_complete else "live"
         if not is_complete:
-            logger.info(f"Storing incomplete data for {symbol} ({len(data)} bars), keeping source='live' for retry")
+            logger.info(f"Storing incomplete data for {symbol} ({len(data)} {data_interval} bars), keeping source='live' for retry")
 
-            # If cached data has more records, prefer it
-            if cached_data and len(cached_data) >= len(data):
-                logger.info(f"Cached data has more records ({len(cached_data)} vs {len(data)}), keeping cached")
-                return cached_data
+            # If cached data covers more minutes, prefer it
+            if cached_data and len(cached_data) >= data_minutes:
+                logger.info(f"Cached data has more records ({len(cached_data)} vs {data_minutes} minutes), keeping cached")
+                return resampled(cached_data)
 
-        count = await cache.store_intraday_prices(session, symbol, data, source=source_label)
+        # Only 1m bars go to intraday_prices (and are rolled up from there);
+        # coarser upstream bars are written to their rollup tier directly
+        if data_interval == "1m":
+            count = await cache.store_intraday_prices(session, symbol, data, source=source_label)
+        else:
+            count = await cache.store_intraday_rollup_bars(session, symbol, data_interval, data, source=source_label)
         await cache.update_cache_metadata(
             session,
             cache_key,
@@ -640,7 +811,7 @@ async def get_intraday_prices(
         total_time = (time.time() - start_time) * 1000
         log_timing(endpoint, False, cache_time, eodhd_time, total_time)
 
-        return data
+        return resampled(data)
 
 
 @router.get("/real-time/{symbol}")
@@ -794,31 +965,34 @@ async def get_all_live_prices(
 
     Stale data is refreshed at server startup (see main.py _refresh_stale_live_prices).
     This endpoint returns whatever is in the LivePrice table.
+
+    Columns are selected directly (no ORM objects) with numerics cast to
+    float in SQL, so rows go from the cursor to the JSON encoder without
+    per-value Decimal conversion. Zero prices map to null as before.
     """
-    from sqlalchemy import select
+    from sqlalchemy import Float, cast, select
     from data_server.db.models import LivePrice
 
-    result = await session.execute(select(LivePrice))
-    prices = result.scalars().all()
-    output = []
-    for p in prices:
-        output.append({
-                "ticker": p.ticker,
-                "exchange": p.exchange,
-                "price": float(p.price) if p.price else None,
-                "open": float(p.open) if p.open else None,
-                "high": float(p.high) if p.high else None,
-                "low": float(p.low) if p.low else None,
-                "previous_close": float(p.previous_close) if p.previous_close else None,
-                "change": float(p.change) if p.change else None,
-                "change_percent": float(p.change_percent) if p.change_percent else None,
-                "volume": p.volume,
-                "market_timestamp": p.market_timestamp.isoformat() if p.market_timestamp else None,
-                "updated_at": p.updated_at.isoformat() if p.updated_at else None,
-                "data_source": p.data_source,
-            })
-
-    return output
+    def _price(column):
+        return cast(func.nullif(column, 0), Float).label(column.key)
+
+    result = await session.execute(select(
+        LivePrice.ticker,
+        LivePrice.exchange,
+        _price(LivePrice.price),
+        _price(LivePrice.open),
+        _price(LivePrice.high),
+        _price(LivePrice.low),
+        _price(LivePrice.previous_close),
+        _price(LivePrice.change),
+        _price(LivePrice.change_percent),
+        LivePrice.volume,
+        LivePrice.market_timestamp,
+        LivePrice.updated_at,
+        LivePrice.data_source,
+    ))
+    # datetimes are encoded as ISO 8601 by the route's JSON encoder
+    return [row._asdict() for row in result]
 
 
 async def _enrich_with_live_market_cap(session: AsyncSession, symbol: str, company: dict) -> dict:
@@ -1404,6 +1578,7 @@ async def update_news():
 
 
 @router.post("/fundamentals/update")
+@run_at_priority(Priority.BACKFILL)
 async def update_all_fundamentals():
     """Bulk-update quarterly financials for all tracked stocks.
 
@@ -1732,9 +1907,60 @@ async def get_content_batch(
 
 
 # Batch API (for treemap optimization)
+def _daily_change_from_window(window: dict, daily_change: bool, today_iso: str) -> Optional[dict]:
+    """Compute a batch daily-change entry from a cache.get_daily_change_windows summary.
+
+    Returns None when the cached data cannot produce a change (fewer than
+    2 bars, or missing start/end price), so the caller fetches fresh data.
+    """
+    count = window["count"]
+    if count < 2:
+        return None
+
+    tail = window["tail"]
+    volume_sum = window["volume_sum"]
+    volume_count = window["volume_count"]
+
+    # Strip phantom today entry: if the last entry is today and
+    # its close duplicates a recent entry, it's stale pre-market data
+    if tail[-1]["date"] == today_iso and count >= 3:
+        last_close = tail[-1]["close"]
+        if last_close is not None:
+            for prev in tail[-6:-1]:
+                prev_close = prev["close"]
+                if prev_close is not None and abs(last_close - prev_close) < 0.01:
+                    phantom = tail[-1]
+                    tail = tail[:-1]
+                    if phantom["volume"] is not None:
+                        volume_sum -= phantom["volume"]
+                        volume_count -= 1
+                    break
+
+    if daily_change:
+        # Compare last 2 trading days (1D change)
+        start_bar = tail[-2]
+    else:
+        # Compare start to end of range
+        start_bar = window["head"]
+    start_price = start_bar["adjusted_close"] or start_bar["close"]
+    end_price = tail[-1]["close"]
+
+    if start_price is None or end_price is None or start_price == 0:
+        return None
+
+    return {
+        "start_price": float(start_price),
+        "end_price": float(end_price),
+        "change": float((end_price - start_price) / start_price),
+        # Average daily volume over the period
+        "avg_volume": int(volume_sum / volume_count) if volume_count else None,
+    }
+
+
 @router.post("/batch/daily-changes")
 async def get_batch_daily_changes(
     request: dict,
+    fmt: str = Query("json", description="Format: json, arrow (IPC stream) or parquet"),
     session: AsyncSession = Depends(get_session),
 ):
     """
@@ -1776,56 +2002,23 @@ async def get_batch_daily_changes(
     client = await get_eodhd_client()
     symbols_to_fetch = []
 
-    # First pass: check cache for all symbols
+    # First pass: summarize all cached symbols with one windowed query
+    try:
+        windows = await cache.get_daily_change_windows(session, symbols, from_date, to_date)
+    except Exception as e:
+        logger.warning(f"Batch cache lookup failed: {e}")
+        await session.rollback()
+        windows = {}
+
+    from datetime import date as date_type
+    today_iso = date_type.today().isoformat()
     for symbol in symbols:
-        try:
-            # Get all prices in the date range from cache
-            prices = await cache.get_daily_prices(session, symbol, from_date, to_date)
-
-            if prices and len(prices) >= 2:
-                # Strip phantom today entry: if the last entry is today and
-                # its close duplicates a recent entry, it's stale pre-market data
-                from datetime import date as _date_type
-                today_iso = _date_type.today().isoformat()
-                last_date = prices[-1].get("date", "")
-                if str(last_date)[:10] == today_iso and len(prices) >= 3:
-                    last_close = prices[-1].get("close")
-                    if last_close is not None:
-                        for prev in prices[-6:-1]:
-                            prev_close = prev.get("close")
-                            if prev_close is not None and abs(last_close - prev_close) < 0.01:
-                                prices = prices[:-1]
-                                break
-
-                if daily_change:
-                    # Compare last 2 trading days (1D change)
-                    start_price = prices[-2].get("adjusted_close") or prices[-2].get("close")
-                    end_price = prices[-1].get("close")
-                else:
-                    # Compare start to end of range
-                    start_price = prices[0].get("adjusted_close") or prices[0].get("close")
-                    end_price = prices[-1].get("close")
-
-                # Compute average daily volume over the period
-                volumes = [p.get("volume") for p in prices if p.get("volume") is not None]
-                avg_volume = int(sum(volumes) / len(volumes)) if volumes else None
-
-                if start_price is not None and end_price is not None and start_price != 0:
-                    change = (end_price - start_price) / start_price
-                    results[symbol] = {
-                        "start_price": float(start_price),
-                        "end_price": float(end_price),
-                        "change": float(change),
-                        "avg_volume": avg_volume,
-                    }
-                else:
-                    # Have data but missing prices, try to fetch fresh
-                    symbols_to_fetch.append(symbol)
-            else:
-                # Less than 2 days in cache, need to fetch from EODHD
-                symbols_to_fetch.append(symbol)
-        except Exception as e:
-            logger.debug(f"Cache lookup failed for {symbol}: {e}")
+        window = windows.get(symbol)
+        summary = _daily_change_from_window(window, daily_change, today_iso) if window else None
+        if summary is not None:
+            results[symbol] = summary
+        else:
+            # Less than 2 days in cache or missing prices, need to fetch from EODHD
             symbols_to_fetch.append(symbol)
 
     cache_time = (time.time() - start_time) * 1000
@@ -1833,11 +2026,14 @@ async def get_batch_daily_changes(
 
     # Second pass: fetch missing symbols from EODHD concurrently
     if symbols_to_fetch:
+        # Fetched bars are written in one bulk upsert after all fetches finish
+        fetched_bars: Dict[str, list] = {}
+
         async def fetch_symbol(symbol: str):
             try:
                 data = await client.get_eod(symbol, start_date, end_date)
                 if data and len(data) > 0:
-                    await cache.store_daily_prices(session, symbol, data)
+                    fetched_bars[symbol] = data
                     # Data is ordered by date ASC from EODHD
                     if daily_change and len(data) >= 2:
                         # Compare last 2 trading days
@@ -1885,6 +2081,9 @@ async def get_batch_daily_changes(
             if data is not None:
                 results[symbol] = data
 
+        if fetched_bars:
+            stored = await cache.store_daily_prices_batch(session, fetched_bars)
+            logger.info(f"Batch daily changes: stored {stored} bars for {len(fetched_bars)} symbols")
         await session.commit()
 
     total_time = (time.time() - start_time) * 1000
@@ -1893,6 +2092,86 @@ async def get_batch_daily_changes(
     return results
 
 
+@router.post("/batch/daily-closes")
+async def get_batch_daily_closes(
+    request: dict,
+    fmt: str = Query("json", description="Format: json, arrow (IPC stream) or parquet"),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Get stored daily closes for many symbols in a single call.
+
+    Serves cached history only (no EODHD fetch), so a portfolio's returns
+    matrix can be built or extended with one request.
+
+    Request body:
+    {
+        "symbols": ["AAPL.US", "GOOGL.US", ...],
+        "start_date": "2025-01-02",
+        "end_date": "2026-02-02"
+    }
+
+    Returns (json):
+    {
+        "AAPL.US": {"dates": ["2025-01-02", ...], "close": [...], "adjusted_close": [...]},
+        ...
+    }
+    With fmt=arrow/parquet: one row per bar with columns
+    symbol, date, close, adjusted_close. Symbols without bars are omitted.
+    """
+    start_time = time.time()
+    symbols = request.get("symbols", [])
+    start_date = request.get("start_date")
+    end_date = request.get("end_date")
+    from_date = datetime.fromisoformat(start_date).date() if start_date else None
+    to_date = datetime.fromisoformat(end_date).date() if end_date else None
+
+    bars = await cache.get_daily_bars_batch(session, symbols, from_date, to_date) if symbols else {}
+    slices = {}
+    for symbol, symbol_bars in bars.items():
+        s = symbol_bars.range_slice(from_date, to_date)
+        if s.stop > s.start:
+            slices[symbol] = (symbol_bars, s)
+
+    total = sum(s.stop - s.start for _, s in slices.values())
+    logger.info(
+        f"Batch daily closes: {len(slices)}/{len(symbols)} symbols, {total} bars "
+        f"in {(time.time() - start_time) * 1000:.1f}ms"
+    )
+
+    if fmt in TABULAR_MEDIA_TYPES:
+        import pyarrow as pa
+
+        def column(name: str) -> np.ndarray:
+            return np.concatenate([getattr(b, name)[s] for b, s in slices.values()])
+
+        if slices:
+            counts = [s.stop - s.start for _, s in slices.values()]
+            table = pa.table({
+                "symbol": pa.array(np.repeat(np.array(list(slices), dtype=object), counts), type=pa.string()),
+                "date": pa.array(column("dates")),
+                "close": pa.array(column("close"), from_pandas=True),
+                "adjusted_close": pa.array(column("adjusted_close"), from_pandas=True),
+            })
+        else:
+            table = pa.table({
+                "symbol": pa.array([], type=pa.string()),
+                "date": pa.array([], type=pa.date32()),
+                "close": pa.array([], type=pa.float64()),
+                "adjusted_close": pa.array([], type=pa.float64()),
+            })
+        return table_response(table, fmt)
+
+    return {
+        symbol: {
+            "dates": np.datetime_as_string(b.dates[s], unit="D").tolist(),
+            "close": b.close[s],
+            "adjusted_close": b.adjusted_close[s],
+        }
+        for symbol, (b, s) in slices.items()
+    }
+
+
 @router.post("/cache/invalidate")
 async def invalidate_cache(
     body: dict,
@@ -1913,6 +2192,17 @@ async def invalidate_cache(
         delete(CacheMetadata).where(CacheMetadata.cache_key.startswith(prefix))
     )
     deleted = result.rowcount
+
+    # Daily bars are also held in process memory, keyed by symbol, and the
+    # coverage index would otherwise keep the next request from refetching
+    if prefix.startswith("eod:"):
+        ticker_prefix = prefix[len("eod:"):].split(":")[0]
+        daily_bar_cache.invalidate_prefix(ticker_prefix)
+        await cache.clear_daily_coverage(session, ticker_prefix)
+    elif "eod:".startswith(prefix):
+        daily_bar_cache.clear()
+        await cache.clear_daily_coverage(session)
+
     logger.info(f"Invalidated {deleted} cache entries with prefix '{prefix}'")
     return {"deleted": deleted}
 
@@ -2071,6 +2361,7 @@ async def update_forex_rates(
 @router.post("/batch/highlights")
 async def get_batch_highlights(
     request: dict,
+    fmt: str = Query("json", description="Format: json, arrow (IPC stream) or parquet"),
     session: AsyncSession = Depends(get_session),
 ):
     """Get company highlights for multiple symbols in a single DB query.
@@ -2222,7 +2513,9 @@ async def get_cpi_series(start: str, end: str, series: str = "CPIAUCSL"):
 @router.get("/server-status")
 async def get_server_status():
     """Get data server status including EODHD API call statistics."""
+    from data_server.workers.price_worker import get_price_worker_stats
     from data_server.workers.scheduler import get_scheduler_status
+    from data_server.ws.manager import manager as ws_manager
 
     eodhd_stats = get_eodhd_stats()
     scheduler_status = get_scheduler_status()
@@ -2236,5 +2529,11 @@ async def get_server_status():
         "eodhd_daily_remaining": eodhd_stats["daily_remaining"],
         "server_start_time": eodhd_stats["server_start_time"],
         "uptime_seconds": eodhd_stats["uptime_seconds"],
+        "eodhd_singleflight": eodhd_stats["singleflight"],
+        "request_budgets": get_request_scheduler_stats(),
         "scheduler": scheduler_status,
+        "price_tick": get_price_worker_stats(),
+        "daily_bar_cache": daily_bar_cache.stats(),
+        "resampled_bar_cache": resampled_bar_cache.stats(),
+        "websocket": ws_manager.stats(),
     }
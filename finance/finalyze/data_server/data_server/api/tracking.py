@@ -7,16 +7,17 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from pydantic import BaseModel
-from sqlalchemy import select, delete, func, update
+from sqlalchemy import select, delete, func, tuple_, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from data_server.api.responses import FastJSONRoute
 from data_server.db.database import get_session, async_session_factory
 from data_server.db.models import TrackedStock, DailyPrice
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 # Years of historical data to fetch for new stocks
 HISTORICAL_YEARS = 5
@@ -264,6 +265,24 @@ async def update_price_timestamp(session: AsyncSession, ticker: str):
     await session.execute(stmt)
 
 
+async def update_price_timestamps(session: AsyncSession, tickers: list[str]):
+    """Update last price update timestamp for many tickers in one statement.
+
+    Ticker params include exchange suffix (e.g., AAPL.US).
+    """
+    pairs = {
+        (t.split(".")[0], t.split(".")[-1] if "." in t else "US")
+        for t in tickers
+    }
+    if not pairs:
+        return
+
+    stmt = update(TrackedStock).where(
+        tuple_(TrackedStock.ticker, TrackedStock.exchange).in_(sorted(pairs))
+    ).values(last_price_update=datetime.utcnow())
+    await session.execute(stmt)
+
+
 async def update_news_timestamp(session: AsyncSession, ticker: str):
     """Update last news update timestamp for a ticker.
 
@@ -31,6 +31,24 @@ class Settings(BaseSettings):
     cache_company_info: int = 604800  # 7 days
     cache_search: int = 3600  # 1 hour
 
+    # In-process daily bar cache (NumPy arrays per ticker, LRU by memory)
+    daily_bar_cache_mb: int = 64
+
+    # Intraday retention (days). Raw 1m bars older than this are compacted
+    # into intraday_rollups; rollup tiers are pruned separately (0 = keep)
+    intraday_raw_retention_days: int = 7
+    intraday_5m_retention_days: int = 180
+    intraday_1h_retention_days: int = 730
+    # Daily bars are kept for this many whole years (0 = keep); older
+    # yearly partitions of daily_prices are dropped by the daily worker
+    daily_prices_retention_years: int = 0
+
+    # yfinance worker pool. Live quotes are downloaded in one batch per
+    # tick; a download slower than yfinance_live_timeout finishes in the
+    # background and is served from cache on the next tick
+    yfinance_max_workers: int = 4
+    yfinance_live_timeout: float = 20.0
+
     # FRED API (for CPI/inflation data)
     fred_api_key: str = ""
 
@@ -38,6 +56,12 @@ class Settings(BaseSettings):
     sec_edgar_user_agent: str = "FinalyzeApp admin@finalyze.local"
     sec_edgar_rate_limit: float = 0.15  # seconds between requests
 
+    # Upstream request budgets (see services/request_scheduler.py).
+    # EODHD budgets are in weighted calls
+    eodhd_budget_per_minute: int = 1000
+    eodhd_daily_limit: int = 100_000
+    yfinance_budget_per_minute: int = 120
+
     # Worker intervals (seconds)
     worker_price_interval: int = 30
     worker_news_interval: int = 3600  # 1 hour
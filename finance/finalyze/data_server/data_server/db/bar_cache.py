@@ -0,0 +1,300 @@
+"""In-process columnar cache of daily bars in front of PostgreSQL.
+
+Each ticker's full daily history is held as NumPy arrays (one per OHLCV
+column), so a date-range request is two binary searches and a slice instead
+of an ORM SELECT that builds one Python object per bar. Entries are evicted
+least-recently-used once the configured memory budget is exceeded.
+
+The cache is invalidated whenever daily_prices is written for a ticker
+(see cache.store_daily_prices_batch), and again after the writing session
+commits, so a read that raced the write cannot leave stale bars behind.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from data_server import metrics
+from data_server.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# session.info key collecting tickers written during a transaction
+_PENDING_KEY = "daily_bar_cache_pending"
+
+
+@dataclass
+class DailyBars:
+    """Columnar daily bars for one ticker, sorted by date ascending.
+
+    Price columns use NaN for missing values; volume is float64 so that
+    missing volumes can be NaN as well (exact for any realistic volume).
+    """
+
+    dates: np.ndarray  # datetime64[D]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    adjusted_close: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            a.nbytes for a in (
+                self.dates, self.open, self.high, self.low,
+                self.close, self.adjusted_close, self.volume,
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def range_slice(
+        self, from_date: Optional[date] = None, to_date: Optional[date] = None
+    ) -> slice:
+        """Index slice covering from_date..to_date (inclusive)."""
+        lo = 0
+        hi = len(self.dates)
+        if from_date is not None:
+            lo = int(np.searchsorted(self.dates, np.datetime64(from_date, "D"), side="left"))
+        if to_date is not None:
+            hi = int(np.searchsorted(self.dates, np.datetime64(to_date, "D"), side="right"))
+        return slice(lo, max(lo, hi))
+
+    def to_dicts(
+        self, from_date: Optional[date] = None, to_date: Optional[date] = None
+    ) -> list[dict]:
+        """Materialize the requested range in the cache.get_daily_prices format."""
+        s = self.range_slice(from_date, to_date)
+        if s.stop <= s.start:
+            return []
+
+        def _col(arr: np.ndarray) -> list:
+            part = arr[s]
+            return np.where(np.isnan(part), None, part).tolist()
+
+        vol = self.volume[s]
+        volumes = np.where(np.isnan(vol), None, np.nan_to_num(vol).astype(np.int64)).tolist()
+
+        return [
+            {
+                "date": d,
+                "open": o,
+                "high": h,
+                "low": lo,
+                "close": c,
+                "adjusted_close": ac,
+                "volume": v,
+            }
+            for d, o, h, lo, c, ac, v in zip(
+                np.datetime_as_string(self.dates[s], unit="D").tolist(),
+                _col(self.open),
+                _col(self.high),
+                _col(self.low),
+                _col(self.close),
+                _col(self.adjusted_close),
+                volumes,
+            )
+        ]
+
+
+def _price_array(values: list) -> np.ndarray:
+    # Matches the previous `float(x) if x else None` semantics (0 -> missing)
+    return np.array([float(v) if v else np.nan for v in values], dtype=np.float64)
+
+
+async def load_daily_bars(session: AsyncSession, ticker: str) -> DailyBars:
+    """Load a ticker's full daily history from PostgreSQL into columnar form."""
+    from data_server.db.models import DailyPrice
+
+    result = await session.execute(
+        select(
+            DailyPrice.date,
+            DailyPrice.open,
+            DailyPrice.high,
+            DailyPrice.low,
+            DailyPrice.close,
+            DailyPrice.adjusted_close,
+            DailyPrice.volume,
+        )
+        .where(DailyPrice.ticker == ticker)
+        .order_by(DailyPrice.date.asc())
+    )
+    return _to_daily_bars(result.all())
+
+
+async def load_daily_bars_batch(
+    session: AsyncSession,
+    tickers: Iterable[str],
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+) -> dict[str, DailyBars]:
+    """Load the daily bars of many tickers in from_date..to_date with one query.
+
+    Without a range the full history is loaded. Tickers without stored
+    bars map to empty DailyBars, as with load_daily_bars.
+    """
+    from data_server.db.models import DailyPrice
+
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+
+    query = (
+        select(
+            DailyPrice.ticker,
+            DailyPrice.date,
+            DailyPrice.open,
+            DailyPrice.high,
+            DailyPrice.low,
+            DailyPrice.close,
+            DailyPrice.adjusted_close,
+            DailyPrice.volume,
+        )
+        .where(DailyPrice.ticker.in_(tickers))
+        .order_by(DailyPrice.ticker, DailyPrice.date.asc())
+    )
+    if from_date is not None:
+        query = query.where(DailyPrice.date >= from_date)
+    if to_date is not None:
+        query = query.where(DailyPrice.date <= to_date)
+    result = await session.execute(query)
+    grouped: dict[str, list] = {ticker: [] for ticker in tickers}
+    for ticker, *bar in result.all():
+        grouped[ticker].append(bar)
+    return {ticker: _to_daily_bars(rows) for ticker, rows in grouped.items()}
+
+
+def _to_daily_bars(rows: list) -> DailyBars:
+    """DailyBars from (date, open, high, low, close, adjusted_close, volume) rows."""
+    if rows:
+        dates, opens, highs, lows, closes, adj, vols = zip(*rows)
+    else:
+        dates = opens = highs = lows = closes = adj = vols = ()
+
+    return DailyBars(
+        dates=np.array(dates, dtype="datetime64[D]"),
+        open=_price_array(opens),
+        high=_price_array(highs),
+        low=_price_array(lows),
+        close=_price_array(closes),
+        adjusted_close=_price_array(adj),
+        volume=np.array([np.nan if v is None else v for v in vols], dtype=np.float64),
+    )
+
+
+class DailyBarCache:
+    """LRU cache of DailyBars keyed by ticker, bounded by total array bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, DailyBars] = OrderedDict()
+        self._bytes = 0
+        # Bumped on every invalidation; loads that straddle one are not cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, ticker: str) -> Optional[DailyBars]:
+        bars = self._entries.get(ticker)
+        if bars is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(ticker)
+        self.hits += 1
+        return bars
+
+    def put(self, ticker: str, bars: DailyBars, generation: Optional[int] = None):
+        """Cache bars for ticker.
+
+        Pass the generation observed before loading; if an invalidation
+        happened meanwhile the bars may predate a write and are dropped.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        if self.max_bytes <= 0 or bars.nbytes > self.max_bytes:
+            return
+        self._discard(ticker)
+        self._entries[ticker] = bars
+        self._bytes += bars.nbytes
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def _discard(self, ticker: str):
+        old = self._entries.pop(ticker, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+
+    def invalidate(self, tickers: Iterable[str]):
+        """Drop cached bars for the given tickers."""
+        self.generation += 1
+        for ticker in tickers:
+            self._discard(ticker)
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Drop all tickers starting with prefix. Returns number dropped."""
+        matched = [t for t in self._entries if t.startswith(prefix)]
+        self.invalidate(matched)
+        return len(matched)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "tickers": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+# Global cache instance
+daily_bar_cache = DailyBarCache(settings.daily_bar_cache_mb * 1024 * 1024)
+
+metrics.Counter(
+    "daily_bar_cache_requests_total", "Lookups in the in-process daily bar cache.", ("result",),
+    collect=lambda: {"hit": daily_bar_cache.hits, "miss": daily_bar_cache.misses},
+)
+metrics.Gauge(
+    "daily_bar_cache_bytes", "Memory held by the in-process daily bar cache.",
+    collect=lambda: daily_bar_cache._bytes,
+)
+
+
+def mark_daily_prices_written(session: AsyncSession, tickers: Iterable[str]):
+    """Invalidate tickers now and again once the writing session commits."""
+    tickers = set(tickers)
+    daily_bar_cache.invalidate(tickers)
+    session.sync_session.info.setdefault(_PENDING_KEY, set()).update(tickers)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        daily_bar_cache.invalidate(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_on_rollback(session: Session):
+    session.info.pop(_PENDING_KEY, None)
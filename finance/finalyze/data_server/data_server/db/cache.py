@@ -3,17 +3,28 @@
 import hashlib
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any, Optional
 
-from sqlalchemy import select, delete, func
+from sqlalchemy import select, delete, func, or_, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from data_server.config import get_settings
+from data_server.db.bar_cache import (
+    DailyBars,
+    daily_bar_cache,
+    load_daily_bars,
+    load_daily_bars_batch,
+    mark_daily_prices_written,
+)
+from data_server.db.partitions import DAILY_PRICES, drop_partitions_before
+from data_server.db.rollups import TIER_WIDTHS, floor_to_tier, update_rollups
 from data_server.db.models import (
     DailyPrice,
+    DailyCoverage,
     IntradayPrice,
+    IntradayRollup,
     Content,
     News,
     NewsTicker,
@@ -147,6 +158,113 @@ async def get_intraday_coverage(
     }
 
 
+# Daily coverage index
+def merge_date_ranges(ranges: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    """Merge overlapping or adjacent inclusive date ranges."""
+    merged: list[tuple[date, date]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_date_ranges(
+    covered: list[tuple[date, date]], start: date, end: date
+) -> list[tuple[date, date]]:
+    """Sub-ranges of start..end (inclusive) not inside any covered range."""
+    gaps = []
+    cursor = start
+    for c_start, c_end in merge_date_ranges(covered):
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start - timedelta(days=1)))
+        if c_end >= end:
+            return gaps
+        cursor = c_end + timedelta(days=1)
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+async def get_daily_coverage_ranges(
+    session: AsyncSession, ticker: str
+) -> list[tuple[date, date]]:
+    """Known-complete daily ranges for a ticker, merged and sorted.
+
+    Tickers cached before the coverage index existed have no ranges yet;
+    their stored min..max span (see get_daily_coverage) is assumed
+    complete, which is what the date-slack cache check already did.
+    """
+    result = await session.execute(
+        select(DailyCoverage.start_date, DailyCoverage.end_date)
+        .where(DailyCoverage.ticker == ticker)
+    )
+    ranges = [(row.start_date, row.end_date) for row in result]
+    if ranges:
+        return merge_date_ranges(ranges)
+
+    span = (await get_daily_coverage(session, [ticker])).get(ticker)
+    if span and span["min_date"] and span["max_date"]:
+        return [(date.fromisoformat(span["min_date"]), date.fromisoformat(span["max_date"]))]
+    return []
+
+
+async def add_daily_coverage(
+    session: AsyncSession, ticker: str, ranges: list[tuple[date, date]]
+):
+    """Record ranges as complete, merging them with the ticker's existing ones.
+
+    Callers hold the ticker's fetch lock, so the read-merge-rewrite is not
+    raced by another writer for the same ticker.
+    """
+    if not ranges:
+        return
+    merged = merge_date_ranges(await get_daily_coverage_ranges(session, ticker) + ranges)
+    now = datetime.utcnow()
+    await session.execute(delete(DailyCoverage).where(DailyCoverage.ticker == ticker))
+    await bulk_upsert(
+        session,
+        DailyCoverage,
+        [
+            {"ticker": ticker, "start_date": start, "end_date": end, "updated_at": now}
+            for start, end in merged
+        ],
+        ["ticker", "start_date"],
+    )
+
+
+async def clear_daily_coverage(session: AsyncSession, ticker_prefix: str = "") -> int:
+    """Forget coverage for tickers starting with ticker_prefix (all if empty)."""
+    stmt = delete(DailyCoverage)
+    if ticker_prefix:
+        stmt = stmt.where(DailyCoverage.ticker.startswith(ticker_prefix))
+    result = await session.execute(stmt)
+    return result.rowcount
+
+
+async def expire_daily_prices(session: AsyncSession, cutoff: date) -> int:
+    """Drop daily prices before cutoff (a year start) and trim coverage to match.
+
+    Whole yearly partitions are dropped; rows of older years that were
+    written since (they wait in the default partition) are deleted. The
+    caller clears the in-process bar cache after committing. Returns the
+    number of partitions dropped.
+    """
+    dropped = await drop_partitions_before(await session.connection(), DAILY_PRICES, cutoff)
+    await session.execute(delete(DailyPrice).where(DailyPrice.date < cutoff))
+    await session.execute(delete(DailyCoverage).where(DailyCoverage.end_date < cutoff))
+    await session.execute(
+        update(DailyCoverage).where(DailyCoverage.start_date < cutoff).values(start_date=cutoff)
+    )
+    return dropped
+
+
 # Daily Prices
 async def get_daily_prices(
     session: AsyncSession,
@@ -154,30 +272,130 @@ async def get_daily_prices(
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
 ) -> list[dict]:
-    """Get cached daily prices for a ticker."""
-    query = select(DailyPrice).where(DailyPrice.ticker == ticker)
+    """Get cached daily prices for a ticker.
+
+    Served from the in-process columnar bar cache; the ticker's history is
+    loaded from PostgreSQL only on a cold miss.
+    """
+    bars = daily_bar_cache.get(ticker)
+    if bars is None:
+        generation = daily_bar_cache.generation
+        bars = await load_daily_bars(session, ticker)
+        daily_bar_cache.put(ticker, bars, generation)
+
+    return bars.to_dicts(
+        from_date.date() if from_date else None,
+        to_date.date() if to_date else None,
+    )
+
+
+async def get_daily_bars_batch(
+    session: AsyncSession,
+    tickers: list[str],
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+) -> dict[str, DailyBars]:
+    """Columnar daily bars for many tickers, covering at least from_date..to_date.
+
+    Bar cache hits (full histories) are served in-process; all misses are
+    loaded from PostgreSQL with a single query. With a range only that
+    range is loaded and the bars are not cached, since the cache holds
+    full histories; without one, the histories are cached if they fit the
+    cache's budget together, so one large batch cannot flush it.
+    """
+    results: dict[str, DailyBars] = {}
+    missing = []
+    for ticker in dict.fromkeys(tickers):
+        bars = daily_bar_cache.get(ticker)
+        if bars is None:
+            missing.append(ticker)
+        else:
+            results[ticker] = bars
+
+    if missing:
+        generation = daily_bar_cache.generation
+        loaded = await load_daily_bars_batch(session, missing, from_date, to_date)
+        cacheable = (
+            from_date is None and to_date is None
+            and sum(bars.nbytes for bars in loaded.values()) <= daily_bar_cache.max_bytes
+        )
+        for ticker in missing:
+            if cacheable:
+                daily_bar_cache.put(ticker, loaded[ticker], generation)
+            results[ticker] = loaded[ticker]
+
+    return results
+
+
+async def get_daily_change_windows(
+    session: AsyncSession,
+    tickers: list[str],
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    tail_size: int = 7,
+) -> dict[str, dict]:
+    """Summarize each ticker's daily bars in a date range with one windowed query.
 
+    Instead of loading every bar per ticker, PostgreSQL ranks bars within
+    each ticker and returns only the first bar, the last `tail_size` bars,
+    and per-ticker count/volume aggregates. That is enough to compute
+    period and 1-day changes (including the phantom-today-bar check) for
+    thousands of symbols in a single round-trip.
+
+    Returns:
+        {ticker: {"count", "volume_sum", "volume_count", "head": bar, "tail": [bars]}}
+        where each bar is {"date", "close", "adjusted_close", "volume"}.
+    """
+    if not tickers:
+        return {}
+
+    by_ticker = {"partition_by": DailyPrice.ticker}
+    ranked = select(
+        DailyPrice.ticker,
+        DailyPrice.date,
+        DailyPrice.close,
+        DailyPrice.adjusted_close,
+        DailyPrice.volume,
+        func.row_number().over(order_by=DailyPrice.date.asc(), **by_ticker).label("rn_asc"),
+        func.row_number().over(order_by=DailyPrice.date.desc(), **by_ticker).label("rn_desc"),
+        func.count().over(**by_ticker).label("n"),
+        func.sum(DailyPrice.volume).over(**by_ticker).label("vol_sum"),
+        func.count(DailyPrice.volume).over(**by_ticker).label("vol_count"),
+    ).where(DailyPrice.ticker.in_(tickers))
     if from_date:
-        query = query.where(DailyPrice.date >= from_date.date())
+        ranked = ranked.where(DailyPrice.date >= from_date.date())
     if to_date:
-        query = query.where(DailyPrice.date <= to_date.date())
+        ranked = ranked.where(DailyPrice.date <= to_date.date())
+    ranked = ranked.subquery()
 
-    query = query.order_by(DailyPrice.date.asc())
+    query = (
+        select(ranked)
+        .where(or_(ranked.c.rn_asc == 1, ranked.c.rn_desc <= tail_size))
+        .order_by(ranked.c.ticker, ranked.c.date.asc())
+    )
     result = await session.execute(query)
-    prices = result.scalars().all()
 
-    return [
-        {
-            "date": p.date.isoformat(),
-            "open": float(p.open) if p.open else None,
-            "high": float(p.high) if p.high else None,
-            "low": float(p.low) if p.low else None,
-            "close": float(p.close) if p.close else None,
-            "adjusted_close": float(p.adjusted_close) if p.adjusted_close else None,
-            "volume": p.volume,
+    windows: dict[str, dict] = {}
+    for row in result:
+        bar = {
+            "date": row.date.isoformat(),
+            "close": float(row.close) if row.close else None,
+            "adjusted_close": float(row.adjusted_close) if row.adjusted_close else None,
+            "volume": row.volume,
         }
-        for p in prices
-    ]
+        window = windows.get(row.ticker)
+        if window is None:
+            window = windows[row.ticker] = {
+                "count": row.n,
+                "volume_sum": int(row.vol_sum) if row.vol_sum is not None else 0,
+                "volume_count": row.vol_count,
+                "head": bar,
+                "tail": [],
+            }
+        if row.rn_desc <= tail_size:
+            window["tail"].append(bar)
+
+    return windows
 
 
 def parse_date_str(date_str: str) -> datetime:
@@ -187,44 +405,89 @@ def parse_date_str(date_str: str) -> datetime:
     return datetime.strptime(date_str, "%Y-%m-%d")
 
 
+# PostgreSQL caps a single statement at 32767 bind parameters
+_MAX_BIND_PARAMS = 32767
+
+
+async def bulk_upsert(
+    session: AsyncSession,
+    model,
+    rows: list[dict],
+    index_elements: list[str],
+    update_columns: Optional[list[str]] = None,
+) -> int:
+    """Upsert rows with one multi-row INSERT ... ON CONFLICT per chunk.
+
+    Rows sharing a primary key are collapsed (last one wins), since
+    ON CONFLICT DO UPDATE cannot touch the same row twice in one statement.
+    Chunks are sized to stay under the bind parameter limit, so a 10-year
+    daily backfill goes out as a single statement.
+
+    On conflict, update_columns (default: every non-key column in the rows)
+    are overwritten with the incoming values.
+    """
+    if not rows:
+        return 0
+
+    deduped = {tuple(r[k] for k in index_elements): r for r in rows}
+    rows = list(deduped.values())
+
+    columns = list(rows[0].keys())
+    update_cols = update_columns or [c for c in columns if c not in index_elements]
+    chunk_size = max(1, _MAX_BIND_PARAMS // len(columns))
+
+    for i in range(0, len(rows), chunk_size):
+        stmt = insert(model).values(rows[i:i + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={c: stmt.excluded[c] for c in update_cols},
+        )
+        await session.execute(stmt)
+
+    return len(rows)
+
+
 async def store_daily_prices(
     session: AsyncSession, ticker: str, prices: list[dict]
 ) -> int:
     """Store daily prices in cache."""
-    if not prices:
-        return 0
+    return await store_daily_prices_batch(session, {ticker: prices})
 
-    for price in prices:
-        date_val = price.get("date")
-        if isinstance(date_val, str):
-            date_val = parse_date_str(date_val)
 
-        stmt = insert(DailyPrice).values(
-            ticker=ticker,
-            date=date_val,
-            open=price.get("open"),
-            high=price.get("high"),
-            low=price.get("low"),
-            close=price.get("close"),
-            adjusted_close=price.get("adjusted_close"),
-            volume=price.get("volume"),
-            fetched_at=datetime.utcnow(),
-        )
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["ticker", "date"],
-            set_={
+async def store_daily_prices_batch(
+    session: AsyncSession, prices_by_ticker: dict[str, list[dict]]
+) -> int:
+    """Store daily prices for many tickers in as few statements as possible.
+
+    Args:
+        session: Database session
+        prices_by_ticker: {ticker: [price dicts with date, open, high, low, close, ...]}
+    """
+    now = datetime.utcnow()
+    rows = []
+    for ticker, prices in prices_by_ticker.items():
+        for price in prices or []:
+            date_val = price.get("date")
+            if isinstance(date_val, str):
+                date_val = parse_date_str(date_val)
+            if date_val is None:
+                continue
+            rows.append({
+                "ticker": ticker,
+                "date": date_val,
                 "open": price.get("open"),
                 "high": price.get("high"),
                 "low": price.get("low"),
                 "close": price.get("close"),
                 "adjusted_close": price.get("adjusted_close"),
                 "volume": price.get("volume"),
-                "fetched_at": datetime.utcnow(),
-            },
-        )
-        await session.execute(stmt)
+                "fetched_at": now,
+            })
 
-    return len(prices)
+    count = await bulk_upsert(session, DailyPrice, rows, ["ticker", "date"])
+    if count:
+        mark_daily_prices_written(session, prices_by_ticker.keys())
+    return count
 
 
 # Intraday Prices
@@ -234,7 +497,11 @@ async def get_intraday_prices(
     from_timestamp: Optional[datetime] = None,
     to_timestamp: Optional[datetime] = None,
 ) -> list[dict]:
-    """Get cached intraday prices for a ticker."""
+    """Get cached intraday prices for a ticker.
+
+    The timestamp bounds are compared against the bare partition key, so
+    PostgreSQL only scans the monthly partitions the range overlaps.
+    """
     query = select(IntradayPrice).where(IntradayPrice.ticker == ticker)
 
     if from_timestamp:
@@ -279,6 +546,52 @@ async def get_intraday_source(
     return source
 
 
+async def get_intraday_rollups(
+    session: AsyncSession,
+    ticker: str,
+    tier: str,
+    from_timestamp: Optional[datetime] = None,
+    to_timestamp: Optional[datetime] = None,
+) -> dict:
+    """Get aggregated intraday bars for a ticker from a rollup tier.
+
+    Returns:
+        {"bars": [...], "minutes": int, "source": "eodhd" | "live" | None}
+        where bars use the get_intraday_prices format, minutes is the number
+        of 1-minute bars they cover and source is "eodhd" only if all were.
+    """
+    query = select(IntradayRollup).where(
+        IntradayRollup.ticker == ticker, IntradayRollup.tier == tier
+    )
+
+    if from_timestamp:
+        # Include the bucket containing from_timestamp
+        query = query.where(IntradayRollup.timestamp >= floor_to_tier(from_timestamp, tier))
+    if to_timestamp:
+        query = query.where(IntradayRollup.timestamp <= to_timestamp)
+
+    query = query.order_by(IntradayRollup.timestamp.asc())
+    result = await session.execute(query)
+    rows = result.scalars().all()
+
+    sources = {r.source for r in rows}
+    return {
+        "bars": [
+            {
+                "timestamp": r.timestamp.isoformat(),
+                "open": float(r.open) if r.open else None,
+                "high": float(r.high) if r.high else None,
+                "low": float(r.low) if r.low else None,
+                "close": float(r.close) if r.close else None,
+                "volume": r.volume,
+            }
+            for r in rows
+        ],
+        "minutes": sum(r.minutes or 0 for r in rows),
+        "source": None if not rows else ("eodhd" if sources == {"eodhd"} else "live"),
+    }
+
+
 def parse_timestamp(ts) -> datetime:
     """Parse timestamp (Unix int or ISO string) to datetime object."""
     if isinstance(ts, datetime):
@@ -301,40 +614,76 @@ async def store_intraday_prices(
         prices: List of price dicts with timestamp, open, high, low, close, volume
         source: Data source - 'live' (price worker) or 'eodhd' (EODHD API)
     """
-    if not prices:
-        return 0
+    return await store_intraday_prices_batch(session, {ticker: prices}, source=source)
 
-    for price in prices:
-        ts_val = price.get("timestamp")
-        if ts_val is not None:
-            ts_val = parse_timestamp(ts_val)
 
-        stmt = insert(IntradayPrice).values(
-            ticker=ticker,
-            timestamp=ts_val,
-            open=price.get("open"),
-            high=price.get("high"),
-            low=price.get("low"),
-            close=price.get("close"),
-            volume=price.get("volume"),
-            source=source,
-            fetched_at=datetime.utcnow(),
-        )
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["ticker", "timestamp"],
-            set_={
+async def store_intraday_prices_batch(
+    session: AsyncSession,
+    prices_by_ticker: dict[str, list[dict]],
+    source: str = "live",
+) -> int:
+    """Store intraday bars for many tickers in as few statements as possible."""
+    now = datetime.utcnow()
+    rows = []
+    for ticker, prices in prices_by_ticker.items():
+        for price in prices or []:
+            ts_val = price.get("timestamp")
+            if ts_val is None:
+                continue
+            rows.append({
+                "ticker": ticker,
+                "timestamp": parse_timestamp(ts_val),
                 "open": price.get("open"),
                 "high": price.get("high"),
                 "low": price.get("low"),
                 "close": price.get("close"),
                 "volume": price.get("volume"),
                 "source": source,
-                "fetched_at": datetime.utcnow(),
-            },
+                "fetched_at": now,
+            })
+
+    count = await bulk_upsert(session, IntradayPrice, rows, ["ticker", "timestamp"])
+    if count:
+        timestamps = [r["timestamp"] for r in rows]
+        await update_rollups(
+            session, min(timestamps), max(timestamps), {r["ticker"] for r in rows}
         )
-        await session.execute(stmt)
+    return count
+
+
+async def store_intraday_rollup_bars(
+    session: AsyncSession, ticker: str, tier: str, bars: list[dict], source: str = "eodhd"
+) -> int:
+    """Store upstream bars as wide as a rollup tier (e.g. 5m or 1h bars).
 
-    return len(prices)
+    Used for history older than the upstream keeps 1-minute bars for, so
+    intraday_prices stays 1m-only. Each bar counts as a full bucket of
+    minutes; the tiers above are refreshed from it.
+    """
+    now = datetime.utcnow()
+    minutes = int(TIER_WIDTHS[tier].total_seconds() // 60)
+    rows = [
+        {
+            "ticker": ticker,
+            "tier": tier,
+            "timestamp": floor_to_tier(parse_timestamp(bar["timestamp"]), tier),
+            "open": bar.get("open"),
+            "high": bar.get("high"),
+            "low": bar.get("low"),
+            "close": bar.get("close"),
+            "volume": bar.get("volume"),
+            "minutes": minutes,
+            "source": source,
+            "updated_at": now,
+        }
+        for bar in bars or []
+        if bar.get("timestamp") is not None
+    ]
+    count = await bulk_upsert(session, IntradayRollup, rows, ["ticker", "tier", "timestamp"])
+    if count:
+        timestamps = [r["timestamp"] for r in rows]
+        await update_rollups(session, min(timestamps), max(timestamps), [ticker], above=tier)
+    return count
 
 
 # News
@@ -6,6 +6,7 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
+from data_server import metrics
 from data_server.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,18 @@ engine = create_async_engine(
     pool_pre_ping=True,
 )
 
+metrics.Gauge(
+    "db_pool_connections",
+    "Database pool connections by state; capacity is pool size plus max overflow.",
+    ("state",),
+    collect=lambda: {
+        "checked_out": engine.pool.checkedout(),
+        "idle": engine.pool.checkedin(),
+        "overflow": max(0, engine.pool.overflow()),
+        "capacity": engine.pool.size() + engine.pool._max_overflow,
+    },
+)
+
 # Create async session factory
 async_session_factory = async_sessionmaker(
     engine,
@@ -48,6 +61,7 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 async def init_db():
     """Initialize database and create tables."""
     from data_server.db import models  # noqa: F401
+    from data_server.db import partitions
     from sqlalchemy import text
 
     logger.info("Initializing database...")
@@ -76,8 +90,16 @@ async def init_db():
             await conn.execute(text("DROP TABLE tracked_stocks"))
             logger.info("Migrating tracked_stocks to (ticker, exchange) composite PK")
 
+        # Migrate price tables: plain heap tables -> native range partitioning
+        await partitions.rename_unpartitioned(conn)
+
         await conn.run_sync(Base.metadata.create_all)
 
+        # Copy price rows from the renamed plain tables, then make sure the
+        # current and upcoming partitions exist
+        await partitions.restore_unpartitioned(conn)
+        await partitions.ensure_partitions(conn)
+
         # Restore tracked_stocks data from backup if migration happened
         result = await conn.execute(text(
             "SELECT EXISTS (SELECT 1 FROM information_schema.tables "
@@ -22,9 +22,10 @@ from data_server.db.database import Base
 
 
 class DailyPrice(Base):
-    """Cached daily prices."""
+    """Cached daily prices (range partitioned by year, see db/partitions.py)."""
 
     __tablename__ = "daily_prices"
+    __table_args__ = {"postgresql_partition_by": "RANGE (date)"}
 
     ticker: Mapped[str] = mapped_column(String(20), primary_key=True)
     date: Mapped[datetime] = mapped_column(Date, primary_key=True)
@@ -37,10 +38,27 @@ class DailyPrice(Base):
     fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
+class DailyCoverage(Base):
+    """Date ranges of daily prices known to be complete for a ticker.
+
+    A range is recorded once the upstream answered for it, so weekends,
+    holidays and pre-listing dates inside it count as covered even though
+    they have no daily_prices rows. Ranges are kept merged per ticker.
+    """
+
+    __tablename__ = "daily_coverage"
+
+    ticker: Mapped[str] = mapped_column(String(20), primary_key=True)
+    start_date: Mapped[date_type] = mapped_column(Date, primary_key=True)
+    end_date: Mapped[date_type] = mapped_column(Date)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class IntradayPrice(Base):
-    """Cached intraday prices."""
+    """Cached intraday prices (range partitioned by month, see db/partitions.py)."""
 
     __tablename__ = "intraday_prices"
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
 
     ticker: Mapped[str] = mapped_column(String(20), primary_key=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
@@ -53,6 +71,24 @@ class IntradayPrice(Base):
     fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
+class IntradayRollup(Base):
+    """Intraday bars aggregated from intraday_prices (5m, 1h and 1d tiers)."""
+
+    __tablename__ = "intraday_rollups"
+
+    ticker: Mapped[str] = mapped_column(String(20), primary_key=True)
+    tier: Mapped[str] = mapped_column(String(4), primary_key=True)  # '5m', '1h' or '1d'
+    timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True)  # bucket start (UTC)
+    open: Mapped[Optional[Decimal]] = mapped_column(Numeric(18, 6))
+    high: Mapped[Optional[Decimal]] = mapped_column(Numeric(18, 6))
+    low: Mapped[Optional[Decimal]] = mapped_column(Numeric(18, 6))
+    close: Mapped[Optional[Decimal]] = mapped_column(Numeric(18, 6))
+    volume: Mapped[Optional[int]] = mapped_column(BigInteger)
+    minutes: Mapped[int] = mapped_column(Integer, default=0)  # 1-minute bars aggregated
+    source: Mapped[Optional[str]] = mapped_column(String(20))  # 'eodhd' only if every minute was
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class Content(Base):
     """Shared content storage for news, YouTube, etc."""
 
@@ -213,7 +249,7 @@ class LivePrice(Base):
     volume: Mapped[Optional[int]] = mapped_column(BigInteger)
     market_timestamp: Mapped[Optional[datetime]] = mapped_column(DateTime)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    data_source: Mapped[Optional[str]] = mapped_column(String(30))  # eodhd, yfinance_fast_info, yfinance_eod_batch
+    data_source: Mapped[Optional[str]] = mapped_column(String(30))  # eodhd, yfinance_download, yfinance_eod_batch
 
 
 class QuarterlyFinancial(Base):
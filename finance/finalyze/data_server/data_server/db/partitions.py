@@ -0,0 +1,223 @@
+"""Native range partitioning of the price tables.
+
+intraday_prices is partitioned by month on timestamp and daily_prices by
+year on date, so range queries only scan the partitions they overlap and
+retention drops whole partitions instead of deleting rows one by one.
+
+Partitions are named <table>_<yyyy>_<mm> (monthly) or <table>_<yyyy>
+(yearly) and are created ahead of time by ensure_partitions, at startup
+and from the daily worker. Rows outside every partition (e.g. a backfill
+of years no partition exists for yet) land in the <table>_default
+partition; ensure_partitions creates their partitions and moves them out.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    """How one table is partitioned."""
+
+    table: str
+    column: str
+    period: str  # "month" or "year"
+    ahead: int  # Partitions kept ready after the current one
+
+    @property
+    def default(self) -> str:
+        return f"{self.table}_default"
+
+    def start_of(self, day: date) -> date:
+        """First day of the period containing day."""
+        return date(day.year, day.month if self.period == "month" else 1, 1)
+
+    def next_start(self, start: date) -> date:
+        if self.period == "year":
+            return date(start.year + 1, 1, 1)
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+    def name_of(self, start: date) -> str:
+        if self.period == "year":
+            return f"{self.table}_{start.year:04d}"
+        return f"{self.table}_{start.year:04d}_{start.month:02d}"
+
+    def start_from_name(self, name: str) -> Optional[date]:
+        """Period start of a partition named by name_of (None for others)."""
+        match = re.fullmatch(rf"{self.table}_(\d{{4}})(?:_(\d{{2}}))?", name)
+        if match is None:
+            return None
+        return date(int(match.group(1)), int(match.group(2) or 1), 1)
+
+
+INTRADAY_PRICES = PartitionSpec("intraday_prices", "timestamp", "month", ahead=2)
+DAILY_PRICES = PartitionSpec("daily_prices", "date", "year", ahead=1)
+
+PARTITIONED_TABLES = (INTRADAY_PRICES, DAILY_PRICES)
+
+
+async def _relkind(conn: AsyncConnection, table: str) -> Optional[str]:
+    """'p' for a partitioned table, 'r' for a plain one, None if missing."""
+    result = await conn.execute(
+        text(
+            "SELECT c.relkind::text FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = :table AND n.nspname = current_schema()"
+        ),
+        {"table": table},
+    )
+    return result.scalar()
+
+
+async def _partition_names(conn: AsyncConnection, spec: PartitionSpec) -> set[str]:
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": spec.table},
+    )
+    return {row[0] for row in result}
+
+
+async def _periods_in(conn: AsyncConnection, spec: PartitionSpec, table: str) -> set[date]:
+    """Period starts that have rows in table."""
+    result = await conn.execute(text(
+        f"SELECT DISTINCT date_trunc('{spec.period}', \"{spec.column}\"::timestamp)::date FROM {table}"
+    ))
+    return {row[0] for row in result if row[0] is not None}
+
+
+async def _create_partition(conn: AsyncConnection, spec: PartitionSpec, start: date) -> int:
+    """Create the partition for the period starting at start.
+
+    Rows of that period waiting in the default partition are moved in
+    before the partition is attached (attaching fails while the default
+    still holds rows of its range). Returns the number of rows moved.
+    """
+    name = spec.name_of(start)
+    lower, upper = start.isoformat(), spec.next_start(start).isoformat()
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {spec.table} INCLUDING DEFAULTS)"))
+    result = await conn.execute(text(
+        f"WITH moved AS ("
+        f"DELETE FROM {spec.default} WHERE \"{spec.column}\" >= '{lower}' AND \"{spec.column}\" < '{upper}' "
+        f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+    ))
+    await conn.execute(text(
+        f"ALTER TABLE {spec.table} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    ))
+    return result.rowcount
+
+
+async def ensure_partitions(
+    conn: AsyncConnection,
+    spec: Optional[PartitionSpec] = None,
+    today: Optional[date] = None,
+) -> int:
+    """Create missing partitions of the partitioned price tables.
+
+    Covers the current period, spec.ahead periods after it, and every
+    period with rows in the default partition. Returns the number of
+    partitions created.
+
+    Args:
+        conn: Database connection (caller commits)
+        spec: Table to maintain; None maintains all partitioned tables
+        today: Reference date for the current period (default: UTC today)
+    """
+    today = today or datetime.utcnow().date()
+    created = 0
+    for spec in (spec,) if spec is not None else PARTITIONED_TABLES:
+        existing = await _partition_names(conn, spec)
+        if spec.default not in existing:
+            await conn.execute(text(f"CREATE TABLE {spec.default} PARTITION OF {spec.table} DEFAULT"))
+            existing.add(spec.default)
+
+        wanted = await _periods_in(conn, spec, spec.default)
+        start = spec.start_of(today)
+        for _ in range(spec.ahead + 1):
+            wanted.add(start)
+            start = spec.next_start(start)
+
+        for start in sorted(wanted):
+            if spec.name_of(start) in existing:
+                continue
+            moved = await _create_partition(conn, spec, start)
+            created += 1
+            if moved:
+                logger.info(f"Created partition {spec.name_of(start)} ({moved} rows moved from default)")
+            else:
+                logger.debug(f"Created partition {spec.name_of(start)}")
+    return created
+
+
+async def drop_partitions_before(conn: AsyncConnection, spec: PartitionSpec, cutoff: date) -> int:
+    """Drop the partitions holding only rows older than cutoff.
+
+    The partition containing cutoff (and the default partition) are kept;
+    their expired rows are left to the caller. Returns the number of
+    partitions dropped.
+    """
+    dropped = 0
+    for name in sorted(await _partition_names(conn, spec)):
+        start = spec.start_from_name(name)
+        if start is not None and spec.next_start(start) <= cutoff:
+            await conn.execute(text(f"DROP TABLE {name}"))
+            dropped += 1
+    if dropped:
+        logger.info(f"Dropped {dropped} {spec.table} partitions before {cutoff}")
+    return dropped
+
+
+async def rename_unpartitioned(conn: AsyncConnection) -> None:
+    """Move plain (pre-partitioning) price tables out of create_all's way.
+
+    Each plain table is renamed to _<table>_unpartitioned, together with its
+    primary key index, so create_all can create the partitioned table;
+    restore_unpartitioned then copies the rows over.
+    """
+    for spec in PARTITIONED_TABLES:
+        if await _relkind(conn, spec.table) != "r":
+            continue
+        backup = f"_{spec.table}_unpartitioned"
+        await conn.execute(text(f"ALTER TABLE {spec.table} RENAME TO {backup}"))
+        await conn.execute(text(f"ALTER INDEX IF EXISTS {spec.table}_pkey RENAME TO {backup}_pkey"))
+        logger.info(f"Migrating {spec.table} to {spec.period}ly range partitions")
+
+
+async def restore_unpartitioned(conn: AsyncConnection) -> None:
+    """Copy rows from renamed plain tables into their partitioned tables."""
+    for spec in PARTITIONED_TABLES:
+        backup = f"_{spec.table}_unpartitioned"
+        if await _relkind(conn, backup) is None:
+            continue
+        await ensure_partitions(conn, spec)
+        # Partitions first, so rows are routed once instead of via the default
+        existing = await _partition_names(conn, spec)
+        for start in sorted(await _periods_in(conn, spec, backup)):
+            if spec.name_of(start) not in existing:
+                await _create_partition(conn, spec, start)
+
+        columns = await conn.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = :table AND table_schema = current_schema() "
+                "ORDER BY ordinal_position"
+            ),
+            {"table": spec.table},
+        )
+        column_list = ", ".join(f'"{row[0]}"' for row in columns)
+        result = await conn.execute(text(
+            f"INSERT INTO {spec.table} ({column_list}) SELECT {column_list} FROM {backup}"
+        ))
+        await conn.execute(text(f"DROP TABLE {backup}"))
+        logger.info(f"Moved {result.rowcount} rows into partitioned {spec.table}")
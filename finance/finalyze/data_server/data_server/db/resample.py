@@ -0,0 +1,188 @@
+"""Server-side OHLCV resampling of 1-minute intraday bars.
+
+intraday_prices stores 1-minute bars. Clients asking for coarser intervals
+get buckets aggregated here (open=first, high=max, low=min, close=last,
+volume=sum), so a 1W chart downloads ~130 15-minute bars instead of ~2000
+raw minutes. Aggregated series are kept in a small LRU keyed by request and
+validated against a fingerprint of the source bars, so a changed minute
+(e.g. a new price worker bar) recomputes the series.
+"""
+
+import calendar
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from data_server import metrics
+
+logger = logging.getLogger(__name__)
+
+# Supported output intervals (bucket width in seconds)
+INTERVAL_SECONDS = {
+    "1m": 60,
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "1h": 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+
+# Maximum number of aggregated series kept in memory
+_MAX_CACHED_SERIES = 512
+
+
+def _epoch_seconds(ts) -> int:
+    """Convert a bar timestamp (Unix int or naive-UTC ISO string) to epoch seconds."""
+    if isinstance(ts, (int, float)):
+        return int(ts)
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    if ts.tzinfo is not None:
+        return int(ts.timestamp())
+    return calendar.timegm(ts.timetuple())
+
+
+def _column(bars: list[dict], key: str) -> np.ndarray:
+    return np.array(
+        [np.nan if b.get(key) is None else b[key] for b in bars], dtype=np.float64
+    )
+
+
+def resample_bars(bars: list[dict], interval: str) -> list[dict]:
+    """Aggregate bars (sorted by timestamp) into interval buckets.
+
+    Buckets are aligned to UTC (midnight for "1d"). Missing values are
+    skipped, matching pandas resample().agg(first/max/min/last/sum).
+    Output uses the cache format: naive-UTC ISO "timestamp" strings.
+    """
+    step = INTERVAL_SECONDS[interval]
+    if not bars:
+        return []
+
+    ts = np.array([_epoch_seconds(b.get("timestamp")) for b in bars], dtype=np.int64)
+    buckets = ts // step * step
+
+    # Bucket boundaries; input is sorted so equal buckets are contiguous
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)]
+
+    opens = _column(bars, "open")
+    highs = _column(bars, "high")
+    lows = _column(bars, "low")
+    closes = _column(bars, "close")
+    volumes = _column(bars, "volume")
+
+    # First valid open / last valid close within each bucket
+    valid_open = np.flatnonzero(~np.isnan(opens))
+    first = np.searchsorted(valid_open, starts, side="left")
+    has_open = first < len(valid_open)
+    has_open[has_open] = valid_open[first[has_open]] < ends[has_open]
+    bucket_open = np.full(len(starts), np.nan)
+    bucket_open[has_open] = opens[valid_open[first[has_open]]]
+
+    valid_close = np.flatnonzero(~np.isnan(closes))
+    last = np.searchsorted(valid_close, ends, side="left") - 1
+    has_close = last >= 0
+    has_close[has_close] = valid_close[last[has_close]] >= starts[has_close]
+    bucket_close = np.full(len(starts), np.nan)
+    bucket_close[has_close] = closes[valid_close[last[has_close]]]
+
+    bucket_high = np.maximum.reduceat(np.nan_to_num(highs, nan=-np.inf), starts)
+    bucket_low = np.minimum.reduceat(np.nan_to_num(lows, nan=np.inf), starts)
+    bucket_volume = np.add.reduceat(np.nan_to_num(volumes), starts)
+
+    def _prices(arr: np.ndarray) -> list:
+        return np.where(np.isfinite(arr), arr, None).tolist()
+
+    timestamps = np.datetime_as_string(buckets[starts].astype("datetime64[s]"), unit="s")
+
+    return [
+        {
+            "timestamp": t,
+            "open": o,
+            "high": h,
+            "low": lo,
+            "close": c,
+            "volume": v,
+        }
+        for t, o, h, lo, c, v in zip(
+            timestamps.tolist(),
+            _prices(bucket_open),
+            _prices(bucket_high),
+            _prices(bucket_low),
+            _prices(bucket_close),
+            bucket_volume.astype(np.int64).tolist(),
+        )
+    ]
+
+
+def _fingerprint(bars: list[dict]) -> tuple:
+    """Cheap identity of a source series: its bounds plus close/volume checksums."""
+    return (
+        len(bars),
+        bars[0].get("timestamp"),
+        bars[-1].get("timestamp"),
+        sum(b.get("close") or 0 for b in bars),
+        sum(b.get("volume") or 0 for b in bars),
+    )
+
+
+class ResampledBarCache:
+    """LRU of aggregated series keyed by (ticker, interval, from, to)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[tuple, list[dict]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def resample(
+        self,
+        ticker: str,
+        interval: str,
+        bars: list[dict],
+        from_ts: Optional[int] = None,
+        to_ts: Optional[int] = None,
+    ) -> list[dict]:
+        """Return bars aggregated to interval, reusing a cached series if unchanged."""
+        if interval == "1m" or not bars:
+            return bars
+
+        key = (ticker, interval, from_ts, to_ts)
+        fingerprint = _fingerprint(bars)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == fingerprint:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        result = resample_bars(bars, interval)
+        self._entries[key] = (fingerprint, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "series": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+# Global cache instance
+resampled_bar_cache = ResampledBarCache(_MAX_CACHED_SERIES)
+
+metrics.Counter(
+    "resampled_bar_cache_requests_total", "Lookups in the resampled intraday series cache.", ("result",),
+    collect=lambda: {"hit": resampled_bar_cache.hits, "miss": resampled_bar_cache.misses},
+)
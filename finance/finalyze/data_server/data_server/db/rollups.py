@@ -0,0 +1,188 @@
+"""Incremental rollups of 1-minute intraday bars into 5m, 1h and 1d tiers.
+
+Each tier is derived from the one below it (raw minutes -> 5m -> 1h -> 1d),
+so refreshing the buckets touched by a new minute reads at most 5 raw rows,
+12 five-minute rows and 24 hourly rows. Buckets are recomputed rather than
+merged, so re-writing a minute (e.g. EODHD replacing a price worker bar) is
+idempotent. Buckets are aligned to UTC midnight.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import case, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from data_server.config import get_settings
+from data_server.db.models import IntradayPrice, IntradayRollup
+from data_server.db.partitions import INTRADAY_PRICES, drop_partitions_before
+from data_server.db.resample import INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# (tier, bucket width, source tier); None means raw intraday_prices
+ROLLUP_TIERS = [
+    ("5m", timedelta(minutes=5), None),
+    ("1h", timedelta(hours=1), "5m"),
+    ("1d", timedelta(days=1), "1h"),
+]
+TIER_WIDTHS = {tier: width for tier, width, _ in ROLLUP_TIERS}
+
+# Origin for date_bin(); any UTC midnight keeps 5m/1h/1d buckets aligned
+_BIN_ORIGIN = datetime(2000, 1, 1)
+
+
+def floor_to_tier(ts: datetime, tier: str) -> datetime:
+    """Start of the tier bucket containing ts."""
+    width = TIER_WIDTHS[tier]
+    return ts - (ts - _BIN_ORIGIN) % width
+
+
+def rollup_tier_for(interval: str) -> Optional[str]:
+    """Coarsest rollup tier whose buckets evenly divide interval (None for 1m)."""
+    seconds = INTERVAL_SECONDS.get(interval)
+    if seconds is None:
+        return None
+    best = None
+    for tier, width, _ in ROLLUP_TIERS:
+        if seconds % int(width.total_seconds()) == 0:
+            best = tier
+    return best
+
+
+def _first(col, order_col):
+    return func.array_agg(aggregate_order_by(col, order_col.asc())).filter(col.isnot(None))[1]
+
+
+def _last(col, order_col):
+    return func.array_agg(aggregate_order_by(col, order_col.desc())).filter(col.isnot(None))[1]
+
+
+def _rollup_insert(
+    tier: str,
+    width: timedelta,
+    source_tier: Optional[str],
+    start: datetime,
+    end: datetime,
+    tickers: Optional[list[str]],
+):
+    """INSERT ... SELECT recomputing tier buckets in [start, end) from the tier below."""
+    if source_tier is None:
+        src = IntradayPrice
+        minutes = func.count()
+    else:
+        src = IntradayRollup
+        minutes = func.sum(src.minutes)
+
+    bucket = func.date_bin(literal(width), src.timestamp, literal(_BIN_ORIGIN)).label("bucket")
+    query = (
+        select(
+            src.ticker,
+            literal(tier),
+            bucket,
+            _first(src.open, src.timestamp),
+            func.max(src.high),
+            func.min(src.low),
+            _last(src.close, src.timestamp),
+            func.sum(src.volume),
+            minutes,
+            case((func.bool_and(src.source == "eodhd"), "eodhd"), else_="live"),
+            func.timezone("utc", func.now()),
+        )
+        .where(src.timestamp >= start, src.timestamp < end)
+        .group_by(src.ticker, bucket)
+    )
+    if source_tier is not None:
+        query = query.where(src.tier == source_tier)
+    if tickers is not None:
+        query = query.where(src.ticker.in_(tickers))
+
+    stmt = insert(IntradayRollup).from_select(
+        ["ticker", "tier", "timestamp", "open", "high", "low", "close",
+         "volume", "minutes", "source", "updated_at"],
+        query,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=["ticker", "tier", "timestamp"],
+        set_={
+            c: stmt.excluded[c]
+            for c in ("open", "high", "low", "close", "volume", "minutes", "source", "updated_at")
+        },
+    )
+
+
+async def update_rollups(
+    session: AsyncSession,
+    start: datetime,
+    end: datetime,
+    tickers: Optional[Iterable[str]] = None,
+    above: Optional[str] = None,
+):
+    """Recompute every rollup bucket touching minutes start..end (inclusive).
+
+    Args:
+        session: Database session (caller commits)
+        start: First 1-minute bar timestamp written
+        end: Last 1-minute bar timestamp written
+        tickers: Tickers written; None refreshes all tickers in the range
+        above: Only refresh the tiers above this one (its rows were written
+            directly, e.g. coarse upstream bars older than 1m history)
+    """
+    tickers = sorted(set(tickers)) if tickers is not None else None
+    if tickers is not None and not tickers:
+        return
+
+    tiers = ROLLUP_TIERS
+    if above is not None:
+        tiers = tiers[[tier for tier, _, _ in tiers].index(above) + 1:]
+    for tier, width, source_tier in tiers:
+        bucket_start = floor_to_tier(start, tier)
+        bucket_end = floor_to_tier(end, tier) + width
+        await session.execute(
+            _rollup_insert(tier, width, source_tier, bucket_start, bucket_end, tickers)
+        )
+
+
+async def compact_intraday(session: AsyncSession) -> dict:
+    """Fold raw minutes past retention into the rollups, then prune old rows.
+
+    Rollups are refreshed for the expiring range first, so minutes written
+    by paths that predate rollups are not lost when they are deleted.
+    Expired monthly partitions of intraday_prices are dropped whole; only
+    the expired days of the partition containing the cutoff are deleted.
+    """
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    cutoff = today - timedelta(days=settings.intraday_raw_retention_days)
+
+    oldest = await session.scalar(
+        select(func.min(IntradayPrice.timestamp)).where(IntradayPrice.timestamp < cutoff)
+    )
+    stats = {"raw_deleted": 0, "raw_partitions_dropped": 0}
+    if oldest is not None:
+        await update_rollups(session, oldest, cutoff - timedelta(minutes=1))
+        stats["raw_partitions_dropped"] = await drop_partitions_before(
+            await session.connection(), INTRADAY_PRICES, cutoff.date(),
+        )
+        result = await session.execute(
+            delete(IntradayPrice).where(IntradayPrice.timestamp < cutoff)
+        )
+        stats["raw_deleted"] = result.rowcount
+
+    for tier, days in (
+        ("5m", settings.intraday_5m_retention_days),
+        ("1h", settings.intraday_1h_retention_days),
+    ):
+        stats[f"{tier}_deleted"] = 0
+        if days > 0:
+            result = await session.execute(
+                delete(IntradayRollup).where(
+                    IntradayRollup.tier == tier,
+                    IntradayRollup.timestamp < today - timedelta(days=days),
+                )
+            )
+            stats[f"{tier}_deleted"] = result.rowcount
+
+    return stats
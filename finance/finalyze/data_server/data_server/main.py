@@ -4,8 +4,11 @@ import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from data_server import metrics
+from data_server.api.responses import ETagMiddleware
 from data_server.api.routes import router as api_router
 from data_server.api.tracking import router as tracking_router
 from data_server.db.database import init_db, close_db
@@ -78,17 +81,17 @@ async def _refresh_stale_live_prices():
                 try:
                     from data_server.services.eodhd_client import get_eodhd_client
                     client = await get_eodhd_client()
-                    fetched = 0
+                    fetched = {}
                     for symbol in tracked:
                         try:
                             data = await client.get_eod(symbol, from_date=from_date)
                             if data:
-                                await cache.store_daily_prices(session, symbol, data)
-                                fetched += 1
+                                fetched[symbol] = data
                         except Exception as e:
                             logger.debug(f"Startup fetch failed for {symbol}: {e}")
+                    await cache.store_daily_prices_batch(session, fetched)
                     await session.commit()
-                    logger.info(f"Startup: fetched recent daily prices for {fetched}/{len(tracked)} stocks")
+                    logger.info(f"Startup: fetched recent daily prices for {len(fetched)}/{len(tracked)} stocks")
                 except Exception as e:
                     logger.error(f"Startup: daily price fetch failed: {e}")
 
@@ -252,6 +255,13 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# ETag / If-None-Match revalidation for GET JSON responses (inside CORS so
+# 304s still carry the CORS headers)
+app.add_middleware(ETagMiddleware)
+
+# Request latency per route template (includes ETag hashing)
+app.add_middleware(metrics.MetricsMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -273,6 +283,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
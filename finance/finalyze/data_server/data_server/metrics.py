@@ -0,0 +1,365 @@
+"""In-process metrics served in the Prometheus text format at GET /metrics.
+
+Counters and histograms are recorded where the work happens: the HTTP
+middleware times every route, cache lookups count hits and misses per data
+type, upstream clients time their calls per provider and the scheduler
+times its jobs. Gauges over state that already has its own bookkeeping
+(DB pool, WebSocket queues, bar caches, request budgets) are read at
+scrape time through callbacks, so they cost nothing between scrapes.
+
+Recording is a dict lookup plus an add, cheap enough for hot paths; use
+timed() as a decorator or context manager, sync or async.
+"""
+
+import asyncio
+import bisect
+import functools
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits (ms) up to slow upstream fetches
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Seconds; scheduled jobs run from a second up to tens of minutes
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0, 1800.0, 3600.0)
+
+LabelValues = Tuple[str, ...]
+
+_metrics: list["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base of the metric types.
+
+    With collect, the metric is read at scrape time instead of recorded:
+    collect returns a number for an unlabelled metric, or a mapping of
+    label values (a tuple, or a string for a single label) to numbers.
+    """
+
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        collect: Optional[Callable[[], object]] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labels)
+        self._collect = collect
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()  # yfinance calls record from pool threads
+        _metrics.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _collected(self) -> list[tuple[LabelValues, float]]:
+        try:
+            collected = self._collect()
+        except Exception:
+            # A failing collector must not break the whole scrape
+            return []
+        if collected is None:
+            return []
+        if not isinstance(collected, dict):
+            collected = {(): collected}
+        return [
+            ((key,) if isinstance(key, str) else tuple(key), value)
+            for key, value in collected.items()
+            if value is not None
+        ]
+
+    def _samples(self) -> list[str]:
+        if self._collect is not None:
+            values = self._collected()
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in values]
+
+    def render(self) -> list[str]:
+        samples = self._samples()
+        if not samples:
+            return []
+        return [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+            *samples,
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf)..., sum]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        lines = []
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f"{self.name}_bucket{self._labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class timed:
+    """Time a block or function into a histogram.
+
+    Usable as a decorator on sync or async functions, or as a context
+    manager. If errors is given it is incremented (with the same labels)
+    when the block raises.
+
+        @timed(JOB_DURATION, errors=JOB_FAILURES, job="news")
+        async def update_news(): ...
+
+        with timed(UPSTREAM_REQUEST_DURATION, provider="sec_edgar", endpoint="companyfacts"):
+            ...
+    """
+
+    __slots__ = ("histogram", "errors", "labels", "_started")
+
+    def __init__(self, histogram: Histogram, errors: Optional[Counter] = None, **labels):
+        self.histogram = histogram
+        self.errors = errors
+        self.labels = labels
+        self._started = 0.0
+
+    def __enter__(self) -> "timed":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.histogram.observe(time.perf_counter() - self._started, **self.labels)
+        if exc_type is not None and self.errors is not None:
+            self.errors.inc(**self.labels)
+        return False
+
+    def __call__(self, fn):
+        histogram, errors, labels = self.histogram, self.errors, self.labels
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with timed(histogram, errors, **labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(histogram, errors, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    lines.append("")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Metrics shared across api/, services/ and workers/
+# ---------------------------------------------------------------------------
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status.",
+    ("method", "route", "status"),
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Data requests answered from the database cache (hit) or upstream (miss), by data type.",
+    ("data_type", "result"),
+)
+
+UPSTREAM_REQUEST_DURATION = Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of calls to upstream data providers.",
+    ("provider", "endpoint"),
+)
+
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total",
+    "Calls to upstream data providers by outcome (ok, retry or error).",
+    ("provider", "endpoint", "outcome"),
+)
+
+JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds",
+    "Run time of scheduled background jobs.",
+    ("job",),
+    buckets=JOB_BUCKETS,
+)
+
+JOB_FAILURES = Counter(
+    "scheduler_job_failures_total",
+    "Scheduled background job runs that raised.",
+    ("job",),
+)
+
+
+def record_cache(data_type: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(data_type=data_type, result="hit" if hit else "miss")
+
+
+def record_upstream(provider: str, endpoint: str, seconds: float, outcome: str) -> None:
+    UPSTREAM_REQUEST_DURATION.observe(seconds, provider=provider, endpoint=endpoint)
+    UPSTREAM_REQUESTS.inc(provider=provider, endpoint=endpoint, outcome=outcome)
+
+
+class upstream_call:
+    """Context manager timing one upstream call; raising counts as an error."""
+
+    __slots__ = ("provider", "endpoint", "_started")
+
+    def __init__(self, provider: str, endpoint: str):
+        self.provider = provider
+        self.endpoint = endpoint
+        self._started = 0.0
+
+    def __enter__(self) -> "upstream_call":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        outcome = "ok" if exc_type is None else "error"
+        record_upstream(self.provider, self.endpoint, time.perf_counter() - self._started, outcome)
+        return False
+
+
+def _route_label(scope: Scope) -> str:
+    """Full path template of the matched route, e.g. "/api/eod/{symbol}".
+
+    The route in the scope may carry only the path it was declared with
+    on its router ("/eod/{symbol}"); the include prefix is the part of the
+    request path before the point the route's own pattern matches.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    regex = getattr(route, "path_regex", None)
+    path = scope.get("path", "")
+    if regex is not None:
+        for i, char in enumerate(path):
+            if char == "/" and regex.fullmatch(path[i:]):
+                return path[:i] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Record the latency of every HTTP request by route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; templates
+            # ("/api/eod/{symbol}") keep the label set bounded
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=_route_label(scope),
+                status=status,
+            )
@@ -13,15 +13,20 @@ EODHD API Call Cost Reference (https://eodhd.com/pricing):
     Live API batch: 1 call per symbol in the request.
 """
 
+import asyncio
+import importlib.util
 import logging
+import random
 import time
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any, Optional
 
 import httpx
 from sqlalchemy import select
 
+from data_server import metrics
 from data_server.config import get_settings
+from data_server.services.request_scheduler import Ticket, current_priority, get_budget
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -45,7 +50,7 @@ API_COST = {
     "calendar":      1,
     "bulk":          100,  # Bulk (entire exchange); +N if symbols param
 }
-DAILY_LIMIT = 100_000
+DAILY_LIMIT = settings.eodhd_daily_limit
 
 # Global counters (since server startup)
 _eodhd_call_count = 0          # raw HTTP requests
@@ -54,8 +59,35 @@ _daily_weighted_calls = 0       # weighted calls today (resets at midnight UTC)
 _daily_reset_date = datetime.utcnow().date()
 _server_start_time = datetime.utcnow()
 
-# Tickers that returned 404 on individual real-time requests (skip in future batches)
-_bad_realtime_tickers: set[str] = set()
+# Tickers that failed individual real-time requests -> monotonic time they were marked.
+# Skipped in batches until the TTL expires, so recovered symbols come back on their own.
+_bad_realtime_tickers: dict[str, float] = {}
+_BAD_REALTIME_TTL = 3600  # 1 hour
+
+# Upstream HTTP transport: pooled keep-alive connections, HTTP/2 when the
+# h2 package is installed (httpx[http2]), retries with exponential backoff
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+_MAX_ATTEMPTS = 3
+_RETRY_BACKOFF = 0.5  # seconds, doubled per attempt (with jitter)
+_RETRY_STATUSES = {429, 502, 503, 504}
+
+# Request coalescing counters (see EODHDClient._request / get_eod)
+_singleflight_stats = {
+    "requests": 0,      # calls into _request
+    "merged": 0,        # served by an identical in-flight request
+    "range_merged": 0,  # EOD ranges served by an in-flight superset range
+    "retries": 0,       # upstream attempts retried after a transient failure
+}
+
+# Real-time batch tuning: chunks are fetched concurrently and the chunk size
+# adapts to observed latency and URL-length rejections
+_REALTIME_CONCURRENCY = 4
+_REALTIME_CHUNK_MIN = 5
+_REALTIME_CHUNK_MAX = 100
+_REALTIME_TARGET_SECONDS = 2.0  # grow chunks while requests are faster than this
+_realtime_chunk_size = 25
 
 
 def _get_endpoint_cost(endpoint: str, params: dict = None) -> int:
@@ -106,6 +138,7 @@ def get_eodhd_stats() -> dict:
         "daily_remaining": max(0, DAILY_LIMIT - _daily_weighted_calls),
         "server_start_time": _server_start_time.isoformat(),
         "uptime_seconds": (datetime.utcnow() - _server_start_time).total_seconds(),
+        "singleflight": dict(_singleflight_stats),
     }
 
 
@@ -127,13 +160,67 @@ def _log_eodhd_request(endpoint: str, params: dict, response_size: int = 0, erro
         pass  # Don't fail if logging fails
 
 
+def _is_bad_realtime(symbol: str) -> bool:
+    """Check the bad-ticker cache, expiring entries older than the TTL."""
+    marked = _bad_realtime_tickers.get(symbol)
+    if marked is None:
+        return False
+    if time.monotonic() - marked > _BAD_REALTIME_TTL:
+        del _bad_realtime_tickers[symbol]
+        return False
+    return True
+
+
+def _adapt_realtime_chunk_size(chunk_len: int, elapsed: float, shrink: bool = False):
+    """Adjust the real-time chunk size after a batch request.
+
+    Halves when asked to (URL too long, timeouts, upstream errors) or on slow
+    responses, and grows gradually while full-size chunks come back well
+    within the latency target.
+    """
+    global _realtime_chunk_size
+
+    size = _realtime_chunk_size
+    if shrink:
+        size = min(size, chunk_len) // 2
+    elif elapsed > 2 * _REALTIME_TARGET_SECONDS:
+        size = size // 2
+    elif elapsed < _REALTIME_TARGET_SECONDS and chunk_len >= size:
+        size = size + max(1, size // 4)
+    size = max(_REALTIME_CHUNK_MIN, min(_REALTIME_CHUNK_MAX, size))
+
+    if size != _realtime_chunk_size:
+        logger.info(f"Real-time chunk size {_realtime_chunk_size} -> {size} "
+                    f"(chunk={chunk_len}, {elapsed:.2f}s{', failed' if shrink else ''})")
+        _realtime_chunk_size = size
+
+
+def _copy_result(data: Any) -> Any:
+    """Copy a shared response so callers can't mutate each other's results."""
+    if isinstance(data, list):
+        return [dict(item) if isinstance(item, dict) else item for item in data]
+    if isinstance(data, dict):
+        return dict(data)
+    return data
+
+
 class EODHDClient:
     """Client for EODHD API."""
 
     def __init__(self):
         self.base_url = settings.eodhd_base_url
         self.api_key = settings.eodhd_api_key
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            limits=_HTTP_LIMITS,
+            timeout=_HTTP_TIMEOUT,
+        )
+        # In-flight upstream calls: (endpoint, params) -> task, and the
+        # ticket carrying the call's priority in the request budget
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._inflight_tickets: dict[tuple, Ticket] = {}
+        # In-flight daily EOD calls: symbol -> [(from, to, task)]
+        self._inflight_eod: dict[str, list[tuple[date, date, asyncio.Task]]] = {}
 
     async def close(self):
         """Close the HTTP client."""
@@ -148,32 +235,98 @@ class EODHDClient:
         endpoint: str,
         params: Optional[dict] = None,
     ) -> Any:
-        """Make a request to EODHD API."""
+        """Make a request to EODHD API.
+
+        Concurrent identical requests (same endpoint and params) share a
+        single upstream call; later callers get a copy of the result, and a
+        more urgent caller promotes the shared call in the request budget.
+        """
+        params = dict(params or {})
+        key = (endpoint, tuple(sorted((k, str(v)) for k, v in params.items())))
+        _singleflight_stats["requests"] += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            _singleflight_stats["merged"] += 1
+            logger.debug(f"EODHD request merged with in-flight call: {endpoint}")
+            self._inflight_tickets[key].promote(current_priority())
+            return _copy_result(await asyncio.shield(task))
+
+        ticket = Ticket()
+        task = asyncio.ensure_future(self._send(endpoint, params, ticket))
+        self._inflight[key] = task
+        self._inflight_tickets[key] = ticket
+
+        def _done(_, k=key):
+            self._inflight.pop(k, None)
+            self._inflight_tickets.pop(k, None)
+
+        task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    async def _send(self, endpoint: str, params: dict, ticket: Ticket) -> Any:
+        """Send a request upstream, retrying transient failures with backoff.
+
+        Each attempt first takes its weighted cost from the EODHD budget.
+        """
         url = self._build_url(endpoint)
-        params = params or {}
         params["api_token"] = self.api_key
         params["fmt"] = "json"
 
         logger.debug(f"EODHD request: {endpoint} with params {params}")
+        # Metrics label: the API name without the symbol ("eod", "fundamentals", ...)
+        api = endpoint.split("/", 1)[0]
 
-        _track_cost(endpoint, params)
+        for attempt in range(_MAX_ATTEMPTS):
+            await get_budget("eodhd").acquire(_get_endpoint_cost(endpoint, params), ticket)
+            _track_cost(endpoint, params)
+            retry = attempt + 1 < _MAX_ATTEMPTS
 
-        try:
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            # Log successful request
-            response_size = len(data) if isinstance(data, list) else 1
-            _log_eodhd_request(endpoint, params, response_size=response_size)
-            return data
-        except httpx.HTTPStatusError as e:
-            logger.error(f"EODHD HTTP error: {e.response.status_code} - {e.response.text}")
-            _log_eodhd_request(endpoint, params, error=f"HTTP {e.response.status_code}")
-            raise
-        except Exception as e:
-            logger.error(f"EODHD request error: {e}")
-            _log_eodhd_request(endpoint, params, error=str(e))
-            raise
+            started = time.perf_counter()
+            try:
+                response = await self.client.get(url, params=params)
+                if response.status_code < 400:
+                    outcome = "ok"
+                elif retry and response.status_code in _RETRY_STATUSES:
+                    outcome = "retry"
+                else:
+                    outcome = "error"
+                metrics.record_upstream("eodhd", api, time.perf_counter() - started, outcome)
+                if retry and response.status_code in _RETRY_STATUSES:
+                    logger.warning(f"EODHD HTTP {response.status_code} for {endpoint}, retrying")
+                    _log_eodhd_request(endpoint, params, error=f"HTTP {response.status_code} (retrying)")
+                    await self._backoff(attempt)
+                    continue
+                response.raise_for_status()
+                data = response.json()
+                # Log successful request
+                response_size = len(data) if isinstance(data, list) else 1
+                _log_eodhd_request(endpoint, params, response_size=response_size)
+                return data
+            except httpx.HTTPStatusError as e:
+                logger.error(f"EODHD HTTP error: {e.response.status_code} - {e.response.text}")
+                _log_eodhd_request(endpoint, params, error=f"HTTP {e.response.status_code}")
+                raise
+            except httpx.TransportError as e:
+                metrics.record_upstream(
+                    "eodhd", api, time.perf_counter() - started, "retry" if retry else "error",
+                )
+                if retry:
+                    logger.warning(f"EODHD transport error for {endpoint} ({e!r}), retrying")
+                    await self._backoff(attempt)
+                    continue
+                logger.error(f"EODHD request error: {e!r}")
+                _log_eodhd_request(endpoint, params, error=repr(e))
+                raise
+            except Exception as e:
+                logger.error(f"EODHD request error: {e}")
+                _log_eodhd_request(endpoint, params, error=str(e))
+                raise
+
+    @staticmethod
+    async def _backoff(attempt: int):
+        _singleflight_stats["retries"] += 1
+        await asyncio.sleep(_RETRY_BACKOFF * (2 ** attempt) * (0.5 + random.random()))
 
     # Daily Prices
     async def get_eod(
@@ -183,7 +336,50 @@ class EODHDClient:
         to_date: Optional[str] = None,
         period: str = "d",
     ) -> list[dict]:
-        """Get end-of-day prices."""
+        """Get end-of-day prices.
+
+        Daily requests whose range lies inside an in-flight request for the
+        same symbol (e.g. 2023..2024 while 2020..2024 is loading) are served
+        from that call instead of hitting the API again.
+        """
+        if period != "d":
+            return await self._get_eod(symbol, from_date, to_date, period)
+
+        start = date.fromisoformat(from_date) if from_date else date.min
+        end = date.fromisoformat(to_date) if to_date else date.max
+
+        for in_start, in_end, task in self._inflight_eod.get(symbol, []):
+            if in_start <= start and end <= in_end:
+                _singleflight_stats["range_merged"] += 1
+                logger.debug(f"EOD {symbol} {from_date}..{to_date} merged with in-flight "
+                             f"{in_start}..{in_end}")
+                data = await asyncio.shield(task)
+                return [
+                    dict(bar) for bar in data
+                    if start.isoformat() <= str(bar.get("date", ""))[:10] <= end.isoformat()
+                ]
+
+        task = asyncio.ensure_future(self._get_eod(symbol, from_date, to_date, period))
+        entry = (start, end, task)
+        self._inflight_eod.setdefault(symbol, []).append(entry)
+
+        def _done(_):
+            entries = self._inflight_eod.get(symbol, [])
+            if entry in entries:
+                entries.remove(entry)
+            if not entries:
+                self._inflight_eod.pop(symbol, None)
+
+        task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    async def _get_eod(
+        self,
+        symbol: str,
+        from_date: Optional[str],
+        to_date: Optional[str],
+        period: str,
+    ) -> list[dict]:
         params = {"period": period}
         if from_date:
             params["from"] = from_date
@@ -217,64 +413,95 @@ class EODHDClient:
         data = await self._request("real-time/" + symbol, {})
         return data if isinstance(data, dict) else {}
 
-    async def get_real_time_batch(self, symbols: list[str], chunk_size: int = 25) -> list[dict]:
+    async def get_real_time_batch(self, symbols: list[str], chunk_size: Optional[int] = None) -> list[dict]:
         """Get real-time quotes for multiple symbols in chunked batch requests.
 
         EODHD batch endpoint: /real-time/{first_symbol}?s=sym1,sym2,sym3
         Sends symbols in chunks to avoid URL length limits and isolate
-        failures from bad/delisted tickers. Failed chunks fall back to
-        individual requests; tickers that 404 individually are cached to
-        avoid retrying every 15 seconds.
+        failures from bad/delisted tickers. Chunks are fetched concurrently
+        (bounded by _REALTIME_CONCURRENCY) and, unless chunk_size is given,
+        sized adaptively. A chunk rejected by the API is bisected until the
+        bad symbols are isolated; those are skipped for _BAD_REALTIME_TTL.
         """
-        global _bad_realtime_tickers
-
         if not symbols:
             return []
 
         # Filter out known-bad tickers
-        good_symbols = [s for s in symbols if s not in _bad_realtime_tickers]
+        good_symbols = [s for s in symbols if not _is_bad_realtime(s)]
         if not good_symbols:
             return []
 
-        if len(good_symbols) == 1:
-            quote = await self.get_real_time(good_symbols[0])
-            return [quote] if quote else []
+        size = chunk_size or _realtime_chunk_size
+        chunks = [good_symbols[i:i + size] for i in range(0, len(good_symbols), size)]
+        semaphore = asyncio.Semaphore(_REALTIME_CONCURRENCY)
+        bad_before = len(_bad_realtime_tickers)
 
-        # Split into chunks to avoid URL length limits and isolate bad tickers
-        all_quotes = []
-        failed_symbols = []
-        for i in range(0, len(good_symbols), chunk_size):
-            chunk = good_symbols[i:i + chunk_size]
-            try:
-                first_symbol = chunk[0]
-                params = {"s": ",".join(chunk)}
-                data = await self._request(f"real-time/{first_symbol}", params)
-
-                if isinstance(data, list):
-                    all_quotes.extend(data)
-                elif isinstance(data, dict):
-                    all_quotes.append(data)
-            except Exception as e:
-                logger.warning(f"Batch chunk failed ({len(chunk)} symbols), falling back to individual")
-                failed_symbols.extend(chunk)
-
-        # Retry failed symbols individually so valid tickers still get updates
-        if failed_symbols:
-            recovered = 0
-            for sym in failed_symbols:
-                try:
-                    quote = await self.get_real_time(sym)
-                    if quote:
-                        all_quotes.append(quote)
-                        recovered += 1
-                except Exception:
-                    _bad_realtime_tickers.add(sym)
-                    logger.info(f"Marked {sym} as bad for real-time (will skip in future batches)")
-            logger.info(f"Recovered {recovered}/{len(failed_symbols)} quotes via individual fallback "
-                       f"({len(_bad_realtime_tickers)} total bad tickers cached)")
+        results = await asyncio.gather(
+            *(self._fetch_real_time_chunk(chunk, semaphore, adapt=chunk_size is None) for chunk in chunks)
+        )
+        all_quotes = [quote for chunk_quotes in results for quote in chunk_quotes]
+
+        newly_bad = len(_bad_realtime_tickers) - bad_before
+        if newly_bad > 0:
+            logger.info(f"Marked {newly_bad} tickers as bad for real-time "
+                        f"({len(_bad_realtime_tickers)} total bad tickers cached)")
 
         return all_quotes
 
+    async def _fetch_real_time_chunk(
+        self, chunk: list[str], semaphore: asyncio.Semaphore, adapt: bool = True
+    ) -> list[dict]:
+        """Fetch one chunk of real-time quotes, bisecting it on API errors."""
+        try:
+            async with semaphore:
+                start = time.monotonic()
+                if len(chunk) == 1:
+                    data = await self._request(f"real-time/{chunk[0]}", {})
+                else:
+                    data = await self._request(f"real-time/{chunk[0]}", {"s": ",".join(chunk)})
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            elapsed = time.monotonic() - start
+            if status >= 500 or status == 429:
+                # Upstream trouble, not the symbols' fault: retry next tick
+                if adapt:
+                    _adapt_realtime_chunk_size(len(chunk), elapsed, shrink=True)
+                logger.warning(f"Batch chunk failed ({len(chunk)} symbols): HTTP {status}")
+                return []
+            url_too_long = status == 414
+            if adapt and url_too_long:
+                _adapt_realtime_chunk_size(len(chunk), elapsed, shrink=True)
+            if len(chunk) == 1:
+                if not url_too_long:
+                    _bad_realtime_tickers[chunk[0]] = time.monotonic()
+                return []
+            # Bisect so one bad ticker costs log2(n) extra requests, not n
+            mid = len(chunk) // 2
+            logger.warning(f"Batch chunk failed ({len(chunk)} symbols, HTTP {status}), bisecting")
+            left, right = await asyncio.gather(
+                self._fetch_real_time_chunk(chunk[:mid], semaphore, adapt),
+                self._fetch_real_time_chunk(chunk[mid:], semaphore, adapt),
+            )
+            return left + right
+        except httpx.TimeoutException as e:
+            if adapt:
+                _adapt_realtime_chunk_size(len(chunk), time.monotonic() - start, shrink=True)
+            logger.warning(f"Batch chunk timed out ({len(chunk)} symbols): {e}")
+            return []
+        except Exception as e:
+            # Connection errors etc.: not the symbols' fault, retry next tick
+            logger.warning(f"Batch chunk failed ({len(chunk)} symbols): {e}")
+            return []
+
+        if adapt and len(chunk) > 1:
+            _adapt_realtime_chunk_size(len(chunk), time.monotonic() - start)
+
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict) and data:
+            return [data]
+        return []
+
     # Fundamentals
     async def get_fundamentals(self, symbol: str) -> dict:
         """Get company fundamentals."""
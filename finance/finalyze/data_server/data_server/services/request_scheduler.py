@@ -0,0 +1,337 @@
+"""Priority scheduling of upstream API calls against per-provider budgets.
+
+Every upstream request (EODHD, yfinance, SEC EDGAR) takes its cost from
+its provider's token bucket before it is sent. Requests are granted in
+priority order:
+
+    INTERACTIVE  on-demand API routes, a user is waiting (the default)
+    LIVE         live price polling
+    BACKFILL     scheduled refreshes and backfills
+
+Lower classes may only draw the bucket down to a reserve that is kept
+for the classes above them, so backfills wait (are deferred) while the
+budget is tight and interactive requests keep getting served. A daily
+quota, where the provider has one, is shared the same way: once a class's
+share is used up its requests raise BudgetExhausted instead of waiting
+until the next UTC day.
+
+Usage is kept in memory only: a restart starts every provider with a
+full bucket and nothing spent of its daily quota, so the daily shares
+only hold within one server run. The provider still enforces its own
+limit (EODHD answers 429 and the client backs off).
+
+Background jobs declare their class with run_at_priority (or the
+request_priority context manager); the class is a context variable, so
+it follows the job into the tasks it creates.
+"""
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from enum import IntEnum
+from typing import Optional
+
+from data_server import metrics
+from data_server.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class Priority(IntEnum):
+    """Request classes, most urgent first."""
+    INTERACTIVE = 0
+    LIVE = 1
+    BACKFILL = 2
+
+
+# Share of the bucket that must remain after a grant, per class
+_BUCKET_RESERVE = {
+    Priority.INTERACTIVE: 0.0,
+    Priority.LIVE: 0.2,
+    Priority.BACKFILL: 0.5,
+}
+
+# Share of the daily quota a class may use
+_DAILY_SHARE = {
+    Priority.INTERACTIVE: 1.0,
+    Priority.LIVE: 0.95,
+    Priority.BACKFILL: 0.8,
+}
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "upstream_priority", default=Priority.INTERACTIVE,
+)
+
+
+def current_priority() -> Priority:
+    """Priority class of upstream requests made from the current context."""
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(level: Priority):
+    """Make upstream requests in this block (and tasks it creates) at level."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def run_at_priority(level: Priority):
+    """Decorator for background jobs whose upstream requests run at level."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with request_priority(level):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class BudgetExhausted(Exception):
+    """The daily quota share of a request's priority class is used up."""
+
+    def __init__(self, provider: str, priority: Priority):
+        self.provider = provider
+        self.priority = priority
+        super().__init__(f"{provider} daily budget for {priority.name.lower()} requests is used up")
+
+
+class Ticket:
+    """Priority of one logical upstream request.
+
+    Shared by the request's retries and by identical callers merged into
+    it, so an interactive caller joining a queued backfill promotes it.
+    """
+
+    __slots__ = ("priority", "_waiter", "_budget")
+
+    def __init__(self, priority: Optional[Priority] = None):
+        self.priority = current_priority() if priority is None else priority
+        self._waiter: Optional[_Waiter] = None
+        self._budget: Optional[ProviderBudget] = None
+
+    def promote(self, priority: Priority) -> None:
+        """Raise the ticket to a more urgent class (no-op otherwise)."""
+        if priority >= self.priority:
+            return
+        self.priority = priority
+        if self._waiter is not None and not self._waiter.future.done():
+            self._budget._requeue(self._waiter, priority)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "cost", "future")
+
+    def __init__(self, priority: Priority, seq: int, cost: float, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.cost = cost
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ProviderBudget:
+    """Token bucket for one upstream provider, granted in priority order.
+
+    The bucket holds up to burst tokens and refills at rate tokens per
+    second; a request costing more than burst waits for a full bucket and
+    leaves it in debt. daily_limit (None for no quota) counts granted cost
+    per UTC day.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, daily_limit: Optional[int] = None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.daily_limit = daily_limit
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._day = datetime.utcnow().date()
+        self._daily_used = 0.0
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._granted = {p: 0 for p in Priority}
+        self._deferred = {p: 0 for p in Priority}
+        self._rejected = {p: 0 for p in Priority}
+        self._wait_seconds = {p: 0.0 for p in Priority}
+
+    async def acquire(self, cost: float = 1, ticket: Optional[Ticket] = None) -> None:
+        """Wait until cost can be spent at the ticket's (or context's) priority.
+
+        Raises:
+            BudgetExhausted: The class's share of the daily quota is used up
+        """
+        ticket = ticket or Ticket()
+        self._roll_day()
+        if self.daily_limit is not None:
+            share = _DAILY_SHARE[ticket.priority] * self.daily_limit
+            if ticket.priority != Priority.INTERACTIVE and self._daily_used + cost > share:
+                self._rejected[ticket.priority] += 1
+                raise BudgetExhausted(self.name, ticket.priority)
+
+        waiter = _Waiter(
+            ticket.priority, next(self._seq), cost, asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._waiters, waiter)
+        self._dispatch()
+        if waiter.future.done():
+            return
+
+        self._deferred[waiter.priority] += 1
+        ticket._waiter, ticket._budget = waiter, self
+        started = time.monotonic()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # Drop the entry so it doesn't hold up the queue
+            waiter.future.cancel()
+            self._dispatch()
+            raise
+        finally:
+            ticket._waiter = None
+            self._wait_seconds[ticket.priority] += time.monotonic() - started
+
+    def _requeue(self, waiter: _Waiter, priority: Priority) -> None:
+        waiter.priority = priority
+        heapq.heapify(self._waiters)
+        self._dispatch()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _roll_day(self) -> None:
+        today = datetime.utcnow().date()
+        if today != self._day:
+            self._day = today
+            self._daily_used = 0.0
+
+    def _shortfall(self, waiter: _Waiter) -> float:
+        """Tokens still missing before waiter can be granted."""
+        needed = waiter.cost + _BUCKET_RESERVE[waiter.priority] * self.burst
+        return min(needed, self.burst) - self._tokens
+
+    def _dispatch(self) -> None:
+        """Grant queued requests in priority order while tokens allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._refill()
+        while self._waiters:
+            waiter = self._waiters[0]
+            if waiter.future.done():
+                heapq.heappop(self._waiters)
+                continue
+            shortfall = self._shortfall(waiter)
+            if shortfall > 0:
+                # Strict priority: nothing behind the head may overtake it
+                delay = shortfall / self.rate
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._tokens -= waiter.cost
+            self._daily_used += waiter.cost
+            self._granted[waiter.priority] += 1
+            waiter.future.set_result(None)
+
+    def stats(self) -> dict:
+        self._refill()
+        self._roll_day()
+        waiting = {p: 0 for p in Priority}
+        for waiter in self._waiters:
+            if not waiter.future.done():
+                waiting[waiter.priority] += 1
+        return {
+            "tokens": round(self._tokens, 2),
+            "burst": self.burst,
+            "rate_per_second": self.rate,
+            "daily_used": self._daily_used,
+            "daily_limit": self.daily_limit,
+            "classes": {
+                p.name.lower(): {
+                    "granted": self._granted[p],
+                    "deferred": self._deferred[p],
+                    "rejected": self._rejected[p],
+                    "waiting": waiting[p],
+                    "wait_seconds": round(self._wait_seconds[p], 3),
+                }
+                for p in Priority
+            },
+        }
+
+
+_budgets: dict[str, ProviderBudget] = {}
+
+
+def get_budget(provider: str) -> ProviderBudget:
+    """Budget of an upstream provider ("eodhd", "yfinance" or "sec_edgar")."""
+    budget = _budgets.get(provider)
+    if budget is None:
+        if provider == "eodhd":
+            budget = ProviderBudget(
+                "eodhd",
+                rate=settings.eodhd_budget_per_minute / 60,
+                burst=settings.eodhd_budget_per_minute,
+                daily_limit=settings.eodhd_daily_limit,
+            )
+        elif provider == "yfinance":
+            budget = ProviderBudget(
+                "yfinance",
+                rate=settings.yfinance_budget_per_minute / 60,
+                burst=max(1, settings.yfinance_budget_per_minute // 6),
+            )
+        elif provider == "sec_edgar":
+            # One request per sec_edgar_rate_limit seconds, no bursts
+            budget = ProviderBudget("sec_edgar", rate=1 / settings.sec_edgar_rate_limit, burst=1)
+        else:
+            raise ValueError(f"Unknown provider: {provider}")
+        _budgets[provider] = budget
+    return budget
+
+
+def get_request_scheduler_stats() -> dict:
+    """Budget and queue statistics per provider."""
+    return {name: budget.stats() for name, budget in _budgets.items()}
+
+
+def _class_samples(key: str) -> dict:
+    return {
+        (name, priority): counts[key]
+        for name, stats in get_request_scheduler_stats().items()
+        for priority, counts in stats["classes"].items()
+    }
+
+
+metrics.Gauge(
+    "upstream_budget_tokens", "Tokens left in each provider's request budget.", ("provider",),
+    collect=lambda: {name: stats["tokens"] for name, stats in get_request_scheduler_stats().items()},
+)
+metrics.Gauge(
+    "upstream_budget_daily_used", "Upstream request cost spent today, per provider.", ("provider",),
+    collect=lambda: {name: stats["daily_used"] for name, stats in get_request_scheduler_stats().items()},
+)
+metrics.Gauge(
+    "upstream_budget_waiting", "Upstream requests queued for budget.", ("provider", "priority"),
+    collect=lambda: _class_samples("waiting"),
+)
+metrics.Counter(
+    "upstream_budget_deferred_total", "Upstream requests that had to wait for budget.", ("provider", "priority"),
+    collect=lambda: _class_samples("deferred"),
+)
+metrics.Counter(
+    "upstream_budget_rejected_total", "Upstream requests refused by a daily quota share.", ("provider", "priority"),
+    collect=lambda: _class_samples("rejected"),
+)
@@ -1,6 +1,5 @@
 """SEC EDGAR client for fetching shares outstanding data from SEC filings."""
 
-import asyncio
 import logging
 import time
 from datetime import datetime, date
@@ -8,7 +7,9 @@ from typing import Optional
 
 import httpx
 
+from data_server import metrics
 from data_server.config import get_settings
+from data_server.services.request_scheduler import get_budget
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -23,7 +24,6 @@ class SECEdgarClient:
     """Client for SEC EDGAR Company Facts API."""
 
     def __init__(self):
-        self._last_request_time: float = 0
         self._client: Optional[httpx.AsyncClient] = None
 
     async def _get_client(self) -> httpx.AsyncClient:
@@ -35,12 +35,8 @@ class SECEdgarClient:
         return self._client
 
     async def _rate_limit(self) -> None:
-        """Enforce SEC EDGAR rate limit (10 req/sec)."""
-        elapsed = time.monotonic() - self._last_request_time
-        delay = settings.sec_edgar_rate_limit - elapsed
-        if delay > 0:
-            await asyncio.sleep(delay)
-        self._last_request_time = time.monotonic()
+        """Enforce SEC EDGAR rate limit (10 req/sec) through the request budget."""
+        await get_budget("sec_edgar").acquire()
 
     async def _refresh_cik_cache(self) -> None:
         """Fetch ticker->CIK mapping from SEC."""
@@ -54,9 +50,10 @@ class SECEdgarClient:
         client = await self._get_client()
 
         try:
-            resp = await client.get("https://www.sec.gov/files/company_tickers.json")
-            resp.raise_for_status()
-            data = resp.json()
+            with metrics.upstream_call("sec_edgar", "company_tickers"):
+                resp = await client.get("https://www.sec.gov/files/company_tickers.json")
+                resp.raise_for_status()
+                data = resp.json()
 
             new_cache: dict[str, str] = {}
             for entry in data.values():
@@ -98,9 +95,10 @@ class SECEdgarClient:
         client = await self._get_client()
 
         try:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
+            with metrics.upstream_call("sec_edgar", "companyfacts"):
+                resp = await client.get(url)
+                resp.raise_for_status()
+                data = resp.json()
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 logger.debug(f"No SEC EDGAR data for {ticker} (CIK {cik})")
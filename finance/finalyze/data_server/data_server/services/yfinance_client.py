@@ -1,11 +1,41 @@
 """yfinance fallback for shares outstanding, intraday prices, and search."""
 
 import asyncio
+import functools
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from typing import Optional
 
+from data_server import metrics
+from data_server.config import get_settings
+from data_server.services.request_scheduler import get_budget
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# yfinance is blocking; it gets its own bounded pool so a slow exchange
+# cannot occupy the default executor used by asyncio.to_thread elsewhere
+_executor = ThreadPoolExecutor(
+    max_workers=settings.yfinance_max_workers, thread_name_prefix="yfinance"
+)
+
+# Live quotes per (symbol, regular_session_only): (monotonic time, quote)
+_live_quotes: dict[tuple[str, bool], tuple[float, dict]] = {}
+# Symbols with a live fetch still running in the pool
+_live_inflight: set[tuple[str, bool]] = set()
+# Quotes this old are no longer served while a refresh is still running
+_LIVE_STALE_SECONDS = 300
+
+# yf.download() resets and reads yfinance's module-level result dicts, so
+# overlapping downloads lose or mix each other's tickers; one at a time
+_download_lock = threading.Lock()
+
+# Per pool thread: whether the current call logged an error (the fetch
+# functions catch their exceptions, so this is how metrics see failures)
+_call_state = threading.local()
 
 # File logger for yfinance requests - can be watched with tail -f
 # Mounted volume: ./logs:/tmp/logs in docker-compose.yml
@@ -22,13 +52,43 @@ def get_yfinance_stats() -> dict:
         "api_calls": _yfinance_call_count,
         "server_start_time": _yf_server_start_time.isoformat(),
         "uptime_seconds": (datetime.utcnow() - _yf_server_start_time).total_seconds(),
+        "pool_workers": settings.yfinance_max_workers,
+        "live_quotes_cached": len(_live_quotes),
+        "live_fetches_inflight": len(_live_inflight),
     }
 
 
+async def _run_in_pool(fn, *args):
+    """Run a blocking yfinance call on the dedicated pool.
+
+    The call first takes a request from the yfinance budget.
+    """
+    await get_budget("yfinance").acquire()
+    loop = asyncio.get_running_loop()
+    # "get_daily_prices.<locals>._fetch" -> "get_daily_prices"
+    operation = fn.__qualname__.split(".", 1)[0].lstrip("_")
+    return await loop.run_in_executor(_executor, functools.partial(_timed_call, operation, fn, *args))
+
+
+def _timed_call(operation: str, fn, *args):
+    """Run fn on a pool thread, recording its latency and outcome."""
+    _call_state.failed = False
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = fn(*args)
+        outcome = "error" if _call_state.failed else "ok"
+        return result
+    finally:
+        metrics.record_upstream("yfinance", operation, time.perf_counter() - started, outcome)
+
+
 def _log_yfinance_request(operation: str, symbol: str, params: dict = None, response_size: int = 0, error: str = None):
     """Log yfinance request to file for monitoring."""
     global _yfinance_call_count
     _yfinance_call_count += 1
+    if error:
+        _call_state.failed = True
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     params_str = f" params={params}" if params else ""
     if error:
@@ -88,6 +148,9 @@ _YF_EXCHANGE_TO_EODHD = {
 # Reverse mapping: yfinance symbol suffix → EODHD exchange code
 _YF_SUFFIX_TO_EODHD = {v: k for k, v in _EODHD_TO_YF_EXCHANGE.items()}
 
+# Longest history period yfinance serves per intraday interval
+_INTRADAY_PERIODS = {"1m": "5d", "5m": "60d", "15m": "60d", "1h": "730d"}
+
 
 def _to_yfinance_symbol(ticker: str, exchange: str) -> str:
     """Convert EODHD ticker+exchange to yfinance symbol."""
@@ -125,7 +188,7 @@ async def get_shares_outstanding(ticker: str, exchange: str = "US") -> Optional[
             _log_yfinance_request("shares_outstanding", f"{ticker}.{exchange}", error=str(e))
             return None
 
-    return await asyncio.to_thread(_fetch)
+    return await _run_in_pool(_fetch)
 
 
 async def get_shares_history_entry(ticker: str, exchange: str = "US") -> Optional[dict]:
@@ -153,17 +216,20 @@ async def get_intraday_prices(
     exchange: str = "US",
     interval: str = "1m",
     target_date: Optional[date] = None,
+    end_date: Optional[date] = None,
 ) -> list[dict]:
     """Get intraday prices from yfinance as a fallback when EODHD is unavailable.
 
-    yfinance provides 1-minute data for the last 7 days, available immediately
-    after market close (unlike EODHD which can take hours).
+    yfinance provides 1-minute data for the last 7 days, 5-minute data for
+    60 days and hourly data for 730 days, available immediately after market
+    close (unlike EODHD which can take hours).
 
     Args:
         ticker: Stock ticker (e.g., "NVDA")
         exchange: Exchange code (e.g., "US")
         interval: Bar interval (default "1m")
         target_date: Specific date to fetch. If None, fetches most recent day.
+        end_date: Last date of a multi-day range starting at target_date
 
     Returns:
         List of dicts with timestamp, open, high, low, close, volume
@@ -176,8 +242,8 @@ async def get_intraday_prices(
             symbol = _to_yfinance_symbol(ticker, exchange)
             t = yf.Ticker(symbol)
 
-            # yfinance 1m data: need period="5d" (max for 1m), then filter to target_date
-            df = t.history(period="5d", interval=interval)
+            # Fetch the longest period the interval allows, then filter to the dates
+            df = t.history(period=_INTRADAY_PERIODS.get(interval, "5d"), interval=interval)
 
             if df is None or df.empty:
                 logger.warning(f"yfinance returned no intraday data for {symbol}")
@@ -187,7 +253,10 @@ async def get_intraday_prices(
             if target_date is not None:
                 # yfinance returns timezone-aware timestamps
                 df_dates = df.index.date
-                df = df[df_dates == target_date]
+                if end_date is not None:
+                    df = df[(df_dates >= target_date) & (df_dates <= end_date)]
+                else:
+                    df = df[df_dates == target_date]
 
                 if df.empty:
                     logger.info(f"yfinance has no data for {symbol} on {target_date}")
@@ -220,7 +289,7 @@ async def get_intraday_prices(
             _log_yfinance_request("intraday", f"{ticker}.{exchange}", {"interval": interval}, error=str(e))
             return []
 
-    return await asyncio.to_thread(_fetch)
+    return await _run_in_pool(_fetch)
 
 
 async def get_daily_prices(
@@ -276,7 +345,7 @@ async def get_daily_prices(
             _log_yfinance_request("daily", f"{ticker}.{exchange}", {"from": from_date, "to": to_date}, error=str(e))
             return []
 
-    return await asyncio.to_thread(_fetch)
+    return await _run_in_pool(_fetch)
 
 
 async def get_fundamentals(ticker: str, exchange: str = "US") -> Optional[dict]:
@@ -358,7 +427,7 @@ async def get_fundamentals(ticker: str, exchange: str = "US") -> Optional[dict]:
             _log_yfinance_request("fundamentals", f"{ticker}.{exchange}", error=str(e))
             return None
 
-    return await asyncio.to_thread(_fetch)
+    return await _run_in_pool(_fetch)
 
 
 def _yf_symbol_to_eodhd(symbol: str) -> tuple[str, str]:
@@ -430,7 +499,7 @@ async def search(query: str, max_results: int = 15, exchange: str = None) -> lis
             _log_yfinance_request("search", query, {"exchange": exchange}, error=str(e))
             return []
 
-    return await asyncio.to_thread(_fetch)
+    return await _run_in_pool(_fetch)
 
 
 def _build_financial_record(col_date, income_df, balance_df, cashflow_df) -> dict:
@@ -568,7 +637,7 @@ async def get_quarterly_financials(ticker: str, exchange: str = "US") -> list[di
             _log_yfinance_request("quarterly_financials", f"{ticker}.{exchange}", error=str(e))
             return []
 
-    return await asyncio.to_thread(_fetch)
+    return await _run_in_pool(_fetch)
 
 
 # Exchanges where EODHD real-time prices are stale/unreliable
@@ -587,174 +656,250 @@ def is_realtime_supported_by_eodhd(exchange: str) -> bool:
     return exchange.upper() not in EODHD_REALTIME_UNSUPPORTED_EXCHANGES
 
 
+def _download_quotes(tickers: list[str], operation: str) -> list[dict]:
+    """Quotes for many tickers from one yf.download() of recent daily bars.
+
+    During a session the last daily bar is the in-progress one, so its
+    close is the current price. Returns data in EODHD real-time format.
+    Blocking; run it on the yfinance pool.
+    """
+    try:
+        import yfinance as yf
+
+        # Convert EODHD symbols to yfinance symbols
+        eodhd_to_yf = {}
+        for eodhd_symbol in tickers:
+            parts = eodhd_symbol.split(".")
+            ticker = parts[0]
+            exchange = parts[-1] if len(parts) > 1 else "US"
+            yf_symbol = _to_yfinance_symbol(ticker, exchange)
+            eodhd_to_yf[yf_symbol] = eodhd_symbol
+
+        yf_symbols = list(eodhd_to_yf.keys())
+        with _download_lock:
+            df = yf.download(yf_symbols, period="5d", interval="1d", progress=False, threads=True)
+
+        if df is None or df.empty:
+            logger.warning(f"yf.download returned no data for {operation}")
+            return []
+
+        results = []
+        # Handle single vs multi-ticker DataFrame structure
+        is_multi = isinstance(df.columns, __import__('pandas').MultiIndex)
+
+        for yf_sym, eodhd_sym in eodhd_to_yf.items():
+            try:
+                if is_multi:
+                    close_series = df[("Close", yf_sym)].dropna()
+                else:
+                    close_series = df["Close"].dropna()
+
+                if len(close_series) < 1:
+                    continue
+
+                last_close = float(close_series.iloc[-1])
+                prev_close = float(close_series.iloc[-2]) if len(close_series) >= 2 else None
+
+                # Get OHLCV for the last day
+                last_idx = close_series.index[-1]
+                if is_multi:
+                    open_price = float(df[("Open", yf_sym)].loc[last_idx]) if ("Open", yf_sym) in df.columns else None
+                    high_price = float(df[("High", yf_sym)].loc[last_idx]) if ("High", yf_sym) in df.columns else None
+                    low_price = float(df[("Low", yf_sym)].loc[last_idx]) if ("Low", yf_sym) in df.columns else None
+                    volume = int(df[("Volume", yf_sym)].loc[last_idx]) if ("Volume", yf_sym) in df.columns else None
+                else:
+                    open_price = float(df["Open"].loc[last_idx]) if "Open" in df.columns else None
+                    high_price = float(df["High"].loc[last_idx]) if "High" in df.columns else None
+                    low_price = float(df["Low"].loc[last_idx]) if "Low" in df.columns else None
+                    volume = int(df["Volume"].loc[last_idx]) if "Volume" in df.columns else None
+
+                change = None
+                change_p = None
+                if prev_close and prev_close > 0:
+                    change = round(last_close - prev_close, 4)
+                    change_p = round((change / prev_close) * 100, 4)
+
+                results.append({
+                    "code": eodhd_sym,
+                    "timestamp": int(datetime.utcnow().timestamp()),
+                    "open": open_price,
+                    "high": high_price,
+                    "low": low_price,
+                    "close": last_close,
+                    "volume": volume,
+                    "previousClose": prev_close,
+                    "change": change,
+                    "change_p": change_p,
+                })
+            except Exception as e:
+                logger.debug(f"yf.download {operation} parse error for {yf_sym}: {e}")
+
+        logger.info(f"yf.download {operation} returned {len(results)}/{len(tickers)} prices")
+        _log_yfinance_request(operation, f"batch({len(tickers)})", response_size=len(results))
+        return results
+
+    except Exception as e:
+        logger.error(f"yf.download {operation} error: {e}")
+        _log_yfinance_request(operation, "batch", error=str(e))
+        return []
+
+
 async def get_eod_batch(tickers: list[str]) -> list[dict]:
     """Batch-fetch last few days of daily close prices via yf.download().
 
     Returns data in EODHD real-time format with regular-session-only prices.
     Uses a single batch download (fast) instead of per-ticker t.info calls.
     """
-    def _fetch() -> list[dict]:
-        try:
-            import yfinance as yf
+    return await _run_in_pool(_download_quotes, tickers, "eod_batch")
+
+
+def _info_quotes(tickers: list[str]) -> list[dict]:
+    """Regular-session quotes via per-ticker t.info (slow; one request each)."""
+    try:
+        import yfinance as yf
 
-            # Convert EODHD symbols to yfinance symbols
-            eodhd_to_yf = {}
-            for eodhd_symbol in tickers:
+        results = []
+        for eodhd_symbol in tickers:
+            try:
                 parts = eodhd_symbol.split(".")
                 ticker = parts[0]
                 exchange = parts[-1] if len(parts) > 1 else "US"
                 yf_symbol = _to_yfinance_symbol(ticker, exchange)
-                eodhd_to_yf[yf_symbol] = eodhd_symbol
 
-            yf_symbols = list(eodhd_to_yf.keys())
-            df = yf.download(yf_symbols, period="5d", interval="1d", progress=False, threads=True)
+                full_info = yf.Ticker(yf_symbol).info
+                price = full_info.get("regularMarketPrice")
+                open_price = full_info.get("regularMarketOpen")
+                day_high = full_info.get("regularMarketDayHigh")
+                day_low = full_info.get("regularMarketDayLow")
+                prev_close = full_info.get("regularMarketPreviousClose")
+                volume = full_info.get("regularMarketVolume")
 
-            if df is None or df.empty:
-                logger.warning("yf.download returned no data for EOD batch")
-                return []
+                if price is None:
+                    continue
 
-            results = []
-            # Handle single vs multi-ticker DataFrame structure
-            is_multi = isinstance(df.columns, __import__('pandas').MultiIndex)
+                change = None
+                change_p = None
+                if prev_close and prev_close > 0:
+                    change = price - prev_close
+                    change_p = (change / prev_close) * 100
+
+                quote = {
+                    "code": eodhd_symbol,
+                    "timestamp": int(datetime.utcnow().timestamp()),
+                    "open": open_price,
+                    "high": day_high,
+                    "low": day_low,
+                    "close": price,
+                    "volume": int(volume) if volume else None,
+                    "previousClose": prev_close,
+                    "change": round(change, 4) if change is not None else None,
+                    "change_p": round(change_p, 4) if change_p is not None else None,
+                }
+                results.append(quote)
+                logger.debug(f"yfinance live price for {eodhd_symbol}: {price}")
 
-            for yf_sym, eodhd_sym in eodhd_to_yf.items():
-                try:
-                    if is_multi:
-                        close_series = df[("Close", yf_sym)].dropna()
-                    else:
-                        close_series = df["Close"].dropna()
-
-                    if len(close_series) < 1:
-                        continue
-
-                    last_close = float(close_series.iloc[-1])
-                    prev_close = float(close_series.iloc[-2]) if len(close_series) >= 2 else None
-
-                    # Get OHLCV for the last day
-                    last_idx = close_series.index[-1]
-                    if is_multi:
-                        open_price = float(df[("Open", yf_sym)].loc[last_idx]) if ("Open", yf_sym) in df.columns else None
-                        high_price = float(df[("High", yf_sym)].loc[last_idx]) if ("High", yf_sym) in df.columns else None
-                        low_price = float(df[("Low", yf_sym)].loc[last_idx]) if ("Low", yf_sym) in df.columns else None
-                        volume = int(df[("Volume", yf_sym)].loc[last_idx]) if ("Volume", yf_sym) in df.columns else None
-                    else:
-                        open_price = float(df["Open"].loc[last_idx]) if "Open" in df.columns else None
-                        high_price = float(df["High"].loc[last_idx]) if "High" in df.columns else None
-                        low_price = float(df["Low"].loc[last_idx]) if "Low" in df.columns else None
-                        volume = int(df["Volume"].loc[last_idx]) if "Volume" in df.columns else None
-
-                    change = None
-                    change_p = None
-                    if prev_close and prev_close > 0:
-                        change = round(last_close - prev_close, 4)
-                        change_p = round((change / prev_close) * 100, 4)
-
-                    results.append({
-                        "code": eodhd_sym,
-                        "timestamp": int(datetime.utcnow().timestamp()),
-                        "open": open_price,
-                        "high": high_price,
-                        "low": low_price,
-                        "close": last_close,
-                        "volume": volume,
-                        "previousClose": prev_close,
-                        "change": change,
-                        "change_p": change_p,
-                    })
-                except Exception as e:
-                    logger.debug(f"yf.download EOD parse error for {yf_sym}: {e}")
-
-            logger.info(f"yf.download EOD batch returned {len(results)}/{len(tickers)} prices")
-            _log_yfinance_request("eod_batch", f"batch({len(tickers)})", response_size=len(results))
-            return results
+            except Exception as e:
+                logger.warning(f"yfinance live price error for {eodhd_symbol}: {e}")
 
-        except Exception as e:
-            logger.error(f"yf.download EOD batch error: {e}")
-            _log_yfinance_request("eod_batch", "batch", error=str(e))
-            return []
+        if results:
+            _log_yfinance_request("live_prices", f"batch({len(tickers)})", response_size=len(results))
+        return results
+
+    except Exception as e:
+        logger.error(f"yfinance batch live price error: {e}")
+        _log_yfinance_request("live_prices", "batch", error=str(e))
+        return []
 
-    return await asyncio.to_thread(_fetch)
+
+def _store_live_quotes(keys: list[tuple[str, bool]], regular_session_only: bool, future):
+    """Done-callback: cache a finished chunk, even if its caller stopped waiting."""
+    _live_inflight.difference_update(keys)
+    if future.cancelled() or future.exception() is not None:
+        return
+    fetched_at = time.monotonic()
+    for quote in future.result():
+        _live_quotes[(quote["code"], regular_session_only)] = (fetched_at, quote)
 
 
 async def get_live_prices(tickers: list[str], regular_session_only: bool = False) -> list[dict]:
     """Get live prices from yfinance for a batch of tickers.
 
+    Quotes are fetched with one multi-ticker yf.download() per tick (the
+    last daily bar's close, so extended-hours prices are not included) and
+    cached for cache_live_quotes seconds. yf.download() is not thread-safe,
+    so downloads never overlap: a download still running after
+    yfinance_live_timeout keeps going in the background, its symbols are
+    answered from the previous quote (if any), and no new download is
+    started until it finishes, so one slow exchange does not stall the
+    price worker. Only the per-ticker t.info path is spread across the pool.
+
     Args:
         tickers: List of EODHD-format symbols (e.g., ["005930.KO", "7203.TSE"])
         regular_session_only: If True, use regularMarketPrice (excludes pre/post-market).
-                              Slower (uses t.info instead of t.fast_info).
+                              Slower (uses per-ticker t.info instead of a batch download).
 
     Returns:
         List of dicts in EODHD real-time format (code, close, open, high, low, volume, etc.)
     """
-    def _fetch() -> list[dict]:
-        try:
-            import yfinance as yf
-
-            results = []
-            for eodhd_symbol in tickers:
-                try:
-                    parts = eodhd_symbol.split(".")
-                    ticker = parts[0]
-                    exchange = parts[-1] if len(parts) > 1 else "US"
-                    yf_symbol = _to_yfinance_symbol(ticker, exchange)
-
-                    t = yf.Ticker(yf_symbol)
-
-                    if regular_session_only:
-                        full_info = t.info
-                        price = full_info.get("regularMarketPrice")
-                        open_price = full_info.get("regularMarketOpen")
-                        day_high = full_info.get("regularMarketDayHigh")
-                        day_low = full_info.get("regularMarketDayLow")
-                        prev_close = full_info.get("regularMarketPreviousClose")
-                        volume = full_info.get("regularMarketVolume")
-                    else:
-                        info = t.fast_info
-                        price = getattr(info, "last_price", None)
-                        open_price = getattr(info, "open", None)
-                        day_high = getattr(info, "day_high", None)
-                        day_low = getattr(info, "day_low", None)
-                        prev_close = getattr(info, "previous_close", None)
-                        volume = getattr(info, "last_volume", None)
-
-                    if price is None:
-                        continue
-
-                    change = None
-                    change_p = None
-                    if prev_close and prev_close > 0:
-                        change = price - prev_close
-                        change_p = (change / prev_close) * 100
-
-                    quote = {
-                        "code": eodhd_symbol,
-                        "timestamp": int(datetime.utcnow().timestamp()),
-                        "open": open_price,
-                        "high": day_high,
-                        "low": day_low,
-                        "close": price,
-                        "volume": int(volume) if volume else None,
-                        "previousClose": prev_close,
-                        "change": round(change, 4) if change is not None else None,
-                        "change_p": round(change_p, 4) if change_p is not None else None,
-                    }
-                    results.append(quote)
-                    logger.debug(f"yfinance live price for {eodhd_symbol}: {price}")
-
-                except Exception as e:
-                    logger.warning(f"yfinance live price error for {eodhd_symbol}: {e}")
-
-            if results:
-                _log_yfinance_request("live_prices", f"batch({len(tickers)})", response_size=len(results))
-            return results
-
-        except Exception as e:
-            logger.error(f"yfinance batch live price error: {e}")
-            _log_yfinance_request("live_prices", "batch", error=str(e))
-            return []
-
-    return await asyncio.to_thread(_fetch)
+    now = time.monotonic()
+    symbols = list(dict.fromkeys(tickers))
+    pending = []
+    for symbol in symbols:
+        key = (symbol, regular_session_only)
+        cached = _live_quotes.get(key)
+        if cached and now - cached[0] < settings.cache_live_quotes:
+            continue
+        if key not in _live_inflight:
+            pending.append(symbol)
+
+    if pending and not regular_session_only and _download_lock.locked():
+        # A download (the previous tick's or get_eod_batch's) is still
+        # running; queueing behind it would only tie up a pool thread
+        logger.info(f"yfinance live prices: download in progress, serving cached quotes for {len(pending)} symbols")
+        pending = []
+
+    if pending:
+        if regular_session_only:
+            # One request per ticker: spread them evenly across the pool
+            size = -(-len(pending) // settings.yfinance_max_workers)
+            fetch = _info_quotes
+        else:
+            size = len(pending)
+            fetch = functools.partial(_download_quotes, operation="live_prices")
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        _live_inflight.update((symbol, regular_session_only) for symbol in pending)
+        for i in range(0, len(pending), size):
+            chunk = pending[i:i + size]
+            keys = [(symbol, regular_session_only) for symbol in chunk]
+            try:
+                # Per-ticker info requests cost one each, a batch download one
+                await get_budget("yfinance").acquire(len(chunk) if regular_session_only else 1)
+            except BaseException:
+                _live_inflight.difference_update((symbol, regular_session_only) for symbol in pending[i:])
+                raise
+            future = loop.run_in_executor(_executor, _timed_call, "live_prices", fetch, chunk)
+            future.add_done_callback(
+                functools.partial(_store_live_quotes, keys, regular_session_only)
+            )
+            futures.append(future)
+
+        # Our done-callbacks were registered first, so finished chunks are cached
+        _, still_running = await asyncio.wait(futures, timeout=settings.yfinance_live_timeout)
+        if still_running:
+            logger.warning(
+                f"yfinance live prices: {len(still_running)}/{len(futures)} fetches still "
+                f"running after {settings.yfinance_live_timeout}s, serving cached quotes"
+            )
+
+    now = time.monotonic()
+    results = []
+    for symbol in symbols:
+        cached = _live_quotes.get((symbol, regular_session_only))
+        if cached and now - cached[0] < _LIVE_STALE_SECONDS:
+            results.append(cached[1])
+    return results
 
 
 # Exchanges not fully supported by EODHD (will use yfinance fallback)
@@ -849,7 +994,7 @@ async def get_news(ticker: str, exchange: str = "US", limit: int = 50) -> list[d
             _log_yfinance_request("news", f"{ticker}.{exchange}", {"limit": limit}, error=str(e))
             return []
 
-    return await asyncio.to_thread(_fetch)
+    return await _run_in_pool(_fetch)
 
 
 def _simple_sentiment(text: str) -> dict:
@@ -944,4 +1089,4 @@ async def get_next_earnings_date(ticker: str, exchange: str = "US") -> Optional[
             _log_yfinance_request("earnings_date", f"{ticker}.{exchange}", {}, error=str(e))
             return None
 
-    return await asyncio.to_thread(_fetch)
+    return await _run_in_pool(_fetch)
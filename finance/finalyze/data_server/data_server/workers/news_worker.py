@@ -4,10 +4,12 @@ import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 
+from data_server import metrics
 from data_server.db.database import async_session_factory
 from data_server.db import cache
 from data_server.api.tracking import get_tracked_tickers_for_news, update_news_timestamp
 from data_server.services.eodhd_client import get_eodhd_client
+from data_server.services.request_scheduler import BudgetExhausted, Priority, run_at_priority
 from data_server.services.yfinance_client import (
     get_news as yf_get_news,
     is_news_supported_by_eodhd,
@@ -34,13 +36,17 @@ async def fetch_news_for_single_ticker(symbol: str, from_date: str, to_date: str
             if is_news_supported_by_eodhd(exchange):
                 client = await get_eodhd_client()
                 # Fetch 100 news articles from EODHD
-                news_data = await client.get_news(
-                    symbol=symbol,
-                    from_date=from_date,
-                    to_date=to_date,
-                    limit=100,
-                    offset=0
-                )
+                try:
+                    news_data = await client.get_news(
+                        symbol=symbol,
+                        from_date=from_date,
+                        to_date=to_date,
+                        limit=100,
+                        offset=0
+                    )
+                except BudgetExhausted as e:
+                    # Left for the next sweep (yfinance still serves below)
+                    logger.info(f"Deferring EODHD news for {symbol}: {e}")
 
             # Fallback to yfinance if EODHD returned no data or doesn't support exchange
             if not news_data:
@@ -114,6 +120,8 @@ async def fetch_news_for_single_ticker(symbol: str, from_date: str, to_date: str
             return 0
 
 
+@metrics.timed(metrics.JOB_DURATION, errors=metrics.JOB_FAILURES, job="news_worker")
+@run_at_priority(Priority.BACKFILL)
 async def update_news():
     """Update news for all tracked stocks.
 
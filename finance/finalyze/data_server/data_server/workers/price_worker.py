@@ -1,15 +1,21 @@
 """Background worker for price updates."""
 
+import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 
 from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import insert
 
+from data_server import metrics
+from data_server.db import cache
 from data_server.db.database import async_session_factory
 from data_server.db.models import LivePrice, IntradayPrice
-from data_server.api.tracking import get_tracked_tickers, update_price_timestamp
+from data_server.db.rollups import update_rollups
+from data_server.api.tracking import get_tracked_tickers, update_price_timestamps
 from data_server.services.eodhd_client import get_eodhd_client
+from data_server.services.request_scheduler import BudgetExhausted, Priority, run_at_priority
 from data_server.ws.manager import manager
 from data_server.utils.exchange_hours import is_market_open as is_exchange_open
 from data_server.services.yfinance_client import is_realtime_supported_by_eodhd
@@ -31,6 +37,9 @@ _prev_cumulative_volume: dict[str, int] = {}
 # Flag to avoid running stale-sync every 15 seconds when markets are closed
 _stale_sync_done = False
 
+# Timing breakdown of the most recent live price tick (see get_price_worker_stats)
+_last_tick: dict = {}
+
 
 async def _sync_stale_live_prices_from_daily(session, tickers: set[str]):
     """One-time sync of stale LivePrice entries from daily_prices DB.
@@ -166,7 +175,7 @@ def to_int(val):
         return None
 
 
-async def _update_minute_bar(session, ticker: str, price: float, cumulative_volume: int | None):
+def _update_minute_bar(ticker: str, price: float, cumulative_volume: int | None, now: datetime) -> dict | None:
     """Aggregate 15-second price snapshots into 1-minute OHLC bars.
 
     Called every 15 seconds per ticker. Builds OHLC bars by:
@@ -176,11 +185,12 @@ async def _update_minute_bar(session, ticker: str, price: float, cumulative_volu
     - Close: last price (updated each call)
     - Volume: delta from previous cumulative (not cumulative itself)
 
-    When a new minute starts, the previous minute's bar is stored to IntradayPrice.
+    When a new minute starts, the previous minute's bar is returned as an
+    IntradayPrice row so the caller can store all completed bars in one
+    statement. Returns None while the current minute is still open.
     """
     global _minute_bars, _prev_cumulative_volume
 
-    now = datetime.utcnow()
     current_minute = now.replace(second=0, microsecond=0)
 
     # Calculate volume delta from cumulative
@@ -200,52 +210,135 @@ async def _update_minute_bar(session, ticker: str, price: float, cumulative_volu
         existing_bar["low"] = min(existing_bar["low"], price)
         existing_bar["close"] = price
         existing_bar["volume"] = (existing_bar["volume"] or 0) + volume_delta
-    else:
-        # New minute - store previous bar if exists, then start new bar
-        if existing_bar:
-            # Store completed bar to IntradayPrice
-            stmt = insert(IntradayPrice).values(
-                ticker=ticker,
-                timestamp=existing_bar["minute"],
-                open=existing_bar["open"],
-                high=existing_bar["high"],
-                low=existing_bar["low"],
-                close=existing_bar["close"],
-                volume=existing_bar["volume"],
-                source="live",
-                fetched_at=datetime.utcnow(),
-            ).on_conflict_do_update(
-                index_elements=["ticker", "timestamp"],
-                set_={
-                    # Only update if source is 'live' (don't overwrite eodhd data)
-                    "open": existing_bar["open"],
-                    "high": existing_bar["high"],
-                    "low": existing_bar["low"],
-                    "close": existing_bar["close"],
-                    "volume": existing_bar["volume"],
-                    "fetched_at": datetime.utcnow(),
-                }
-            )
-            await session.execute(stmt)
-            logger.debug(f"Stored 1-min bar for {ticker} at {existing_bar['minute']}: "
-                        f"O={existing_bar['open']:.2f} H={existing_bar['high']:.2f} "
-                        f"L={existing_bar['low']:.2f} C={existing_bar['close']:.2f}")
-
-        # Start new bar for current minute
-        # Open = first price reading of the minute
-        # High/low will be updated via max/min as more readings come in
-        _minute_bars[ticker] = {
-            "minute": current_minute,
-            "open": price,
-            "high": price,
-            "low": price,
-            "close": price,
-            "volume": volume_delta,
-        }
+        return None
 
+    # Start new bar for current minute
+    # Open = first price reading of the minute
+    # High/low will be updated via max/min as more readings come in
+    _minute_bars[ticker] = {
+        "minute": current_minute,
+        "open": price,
+        "high": price,
+        "low": price,
+        "close": price,
+        "volume": volume_delta,
+    }
+
+    if not existing_bar:
+        return None
 
+    # Previous minute is complete
+    return {
+        "ticker": ticker,
+        "timestamp": existing_bar["minute"],
+        "open": existing_bar["open"],
+        "high": existing_bar["high"],
+        "low": existing_bar["low"],
+        "close": existing_bar["close"],
+        "volume": existing_bar["volume"],
+        "source": "live",
+        "fetched_at": now,
+    }
+
+
+async def store_quotes(session, quotes: list[dict], now: datetime) -> tuple[dict[str, dict], int]:
+    """Write one tick of real-time quotes with a fixed number of statements.
+
+    Builds LivePrice rows and completed 1-minute bars in memory, then issues
+    one bulk LivePrice upsert, one bulk IntradayPrice upsert (plus rollup
+    refresh) and one tracking timestamp update. The caller commits.
+
+    Returns:
+        ({ticker: websocket price payload}, number of completed minute bars)
+    """
+    live_rows = []
+    minute_rows = []
+    broadcasts = {}
+    for quote in quotes:
+        try:
+            if not quote:
+                continue
+
+            # Get ticker from quote response (EODHD returns 'code' field)
+            ticker = quote.get("code")
+            if not ticker:
+                logger.warning(f"Quote missing 'code' field: {quote}")
+                continue
+
+            exchange = ticker.split(".")[1] if "." in ticker else "US"
+
+            market_ts = None
+            ts = quote.get("timestamp")
+            if ts and ts != 'NA':
+                try:
+                    market_ts = datetime.utcfromtimestamp(int(ts))
+                except (ValueError, TypeError):
+                    pass
+
+            # Skip if no valid price data
+            price_val = to_decimal(quote.get("close"))
+            if price_val is None:
+                logger.debug(f"Skipping {ticker} - no valid price data")
+                continue
+
+            # LivePrice row (latest price only)
+            live_row = {
+                "ticker": ticker,
+                "exchange": exchange,
+                "price": price_val,
+                "open": to_decimal(quote.get("open")),
+                "high": to_decimal(quote.get("high")),
+                "low": to_decimal(quote.get("low")),
+                "previous_close": to_decimal(quote.get("previousClose")),
+                "change": to_decimal(quote.get("change")),
+                "change_percent": to_decimal(quote.get("change_p")),
+                "volume": to_int(quote.get("volume")),
+                "market_timestamp": market_ts,
+                "updated_at": now,
+                "data_source": quote.get("_data_source", "eodhd"),
+            }
+            live_rows.append(live_row)
+
+            # Aggregate into 1-minute OHLC bars
+            completed = _update_minute_bar(ticker, price_val, to_int(quote.get("volume")), now)
+            if completed:
+                minute_rows.append(completed)
+
+            # Normalized values: EODHD sends "NA" or numeric strings at times
+            broadcasts[ticker] = {
+                "price": price_val,
+                "change": live_row["change"],
+                "change_percent": live_row["change_percent"],
+                "volume": live_row["volume"],
+                "timestamp": to_int(ts),
+            }
+
+        except Exception as e:
+            ticker_name = quote.get("code", "unknown") if quote else "unknown"
+            logger.error(f"Error updating price for {ticker_name}: {e}")
+
+    # One statement each for live prices, completed minute bars (plus
+    # their rollups) and tracking timestamps, instead of ~4 per quote
+    await cache.bulk_upsert(session, LivePrice, live_rows, ["ticker"])
+    if minute_rows:
+        # Don't overwrite the source of bars EODHD has already replaced
+        await cache.bulk_upsert(
+            session, IntradayPrice, minute_rows, ["ticker", "timestamp"],
+            update_columns=["open", "high", "low", "close", "volume", "fetched_at"],
+        )
+        minutes = [r["timestamp"] for r in minute_rows]
+        await update_rollups(
+            session, min(minutes), max(minutes), {r["ticker"] for r in minute_rows}
+        )
+    await update_price_timestamps(session, list(broadcasts))
+    return broadcasts, len(minute_rows)
+
+
+@metrics.timed(metrics.JOB_DURATION, errors=metrics.JOB_FAILURES, job="price_worker")
+@run_at_priority(Priority.LIVE)
 async def update_prices():
     """Update prices for all tracked stocks using batch API."""
+    start_time = time.perf_counter()
     async with async_session_factory() as session:
         # Get tracked tickers
         tickers = await get_tracked_tickers(session)
@@ -289,121 +382,73 @@ async def update_prices():
         logger.info(f"Updating live prices for {len(open_tickers)}/{len(tickers)} stocks "
                      f"(EODHD: {len(eodhd_tickers)}, yfinance: {len(yf_tickers)})")
 
-        # Fetch from EODHD for supported exchanges
-        quotes = []
-        if eodhd_tickers:
+        async def _fetch_eodhd() -> list[dict]:
+            if not eodhd_tickers:
+                return []
             client = await get_eodhd_client()
             try:
                 eodhd_quotes = await client.get_real_time_batch(list(eodhd_tickers))
                 for q in eodhd_quotes:
                     q["_data_source"] = "eodhd"
-                quotes.extend(eodhd_quotes)
                 logger.info(f"EODHD batch response: {len(eodhd_quotes)} quotes received")
+                return eodhd_quotes
             except Exception as e:
                 logger.error(f"EODHD batch price fetch failed: {e}")
+                return []
 
-        # Fetch from yfinance for unsupported exchanges
-        if yf_tickers:
+        async def _fetch_yfinance() -> list[dict]:
+            if not yf_tickers:
+                return []
             try:
                 from data_server.services.yfinance_client import get_live_prices
                 yf_quotes = await get_live_prices(list(yf_tickers))
                 if yf_quotes:
                     for q in yf_quotes:
-                        q["_data_source"] = "yfinance_fast_info"
-                    quotes.extend(yf_quotes)
+                        q["_data_source"] = "yfinance_download"
                     logger.info(f"yfinance live prices: {len(yf_quotes)} quotes received")
+                return yf_quotes or []
             except Exception as e:
                 logger.error(f"yfinance batch price fetch failed: {e}")
+                return []
+
+        # Fetch EODHD-supported and yfinance-only exchanges concurrently
+        eodhd_quotes, yf_quotes = await asyncio.gather(_fetch_eodhd(), _fetch_yfinance())
+        quotes = eodhd_quotes + yf_quotes
 
         if not quotes:
             return
 
-        for quote in quotes:
-            try:
-                if not quote:
-                    continue
-
-                # Get ticker from quote response (EODHD returns 'code' field)
-                ticker = quote.get("code")
-                if not ticker:
-                    logger.warning(f"Quote missing 'code' field: {quote}")
-                    continue
+        fetch_time = time.perf_counter()
 
-                exchange = ticker.split(".")[1] if "." in ticker else "US"
-
-                # Store live price in database (upsert)
-                market_ts = None
-                ts = quote.get("timestamp")
-                if ts and ts != 'NA':
-                    try:
-                        market_ts = datetime.utcfromtimestamp(int(ts))
-                    except (ValueError, TypeError):
-                        pass
-
-                # Skip if no valid price data
-                price_val = to_decimal(quote.get("close"))
-                if price_val is None:
-                    logger.debug(f"Skipping {ticker} - no valid price data")
-                    continue
-
-                # Update LivePrice (latest price only)
-                source = quote.get("_data_source", "eodhd")
-                stmt = insert(LivePrice).values(
-                    ticker=ticker,
-                    exchange=exchange,
-                    price=price_val,
-                    open=to_decimal(quote.get("open")),
-                    high=to_decimal(quote.get("high")),
-                    low=to_decimal(quote.get("low")),
-                    previous_close=to_decimal(quote.get("previousClose")),
-                    change=to_decimal(quote.get("change")),
-                    change_percent=to_decimal(quote.get("change_p")),
-                    volume=to_int(quote.get("volume")),
-                    market_timestamp=market_ts,
-                    updated_at=datetime.utcnow(),
-                    data_source=source,
-                ).on_conflict_do_update(
-                    index_elements=["ticker"],
-                    set_={
-                        "price": price_val,
-                        "open": to_decimal(quote.get("open")),
-                        "high": to_decimal(quote.get("high")),
-                        "low": to_decimal(quote.get("low")),
-                        "previous_close": to_decimal(quote.get("previousClose")),
-                        "change": to_decimal(quote.get("change")),
-                        "change_percent": to_decimal(quote.get("change_p")),
-                        "volume": to_int(quote.get("volume")),
-                        "market_timestamp": market_ts,
-                        "updated_at": datetime.utcnow(),
-                        "data_source": source,
-                    }
-                )
-                await session.execute(stmt)
-
-                # Aggregate into 1-minute OHLC bars
-                await _update_minute_bar(session, ticker, price_val, to_int(quote.get("volume")))
-
-                # Update tracking timestamp
-                await update_price_timestamp(session, ticker)
-
-                # Broadcast to WebSocket subscribers
-                price_data = {
-                    "price": quote.get("close"),
-                    "change": quote.get("change"),
-                    "change_percent": quote.get("change_p"),
-                    "volume": quote.get("volume"),
-                    "timestamp": quote.get("timestamp"),
-                }
-                await manager.broadcast_price_update(ticker, price_data)
-
-                logger.debug(f"Updated live price for {ticker}: ${quote.get('close')}")
+        now = datetime.utcnow()
+        broadcasts, minute_count = await store_quotes(session, quotes, now)
+        await session.commit()
+        db_time = time.perf_counter()
+
+        # Fan out to WebSocket subscribers concurrently
+        await manager.broadcast_price_updates(broadcasts)
+        end_time = time.perf_counter()
+
+        _last_tick.update({
+            "at": now.isoformat(),
+            "tickers": len(open_tickers),
+            "quotes": len(broadcasts),
+            "minute_bars": minute_count,
+            "fetch_ms": round((fetch_time - start_time) * 1000, 1),
+            "db_ms": round((db_time - fetch_time) * 1000, 1),
+            "broadcast_ms": round((end_time - db_time) * 1000, 1),
+            "total_ms": round((end_time - start_time) * 1000, 1),
+        })
+        logger.info(
+            f"Live price update complete for {len(open_tickers)} stocks in "
+            f"{_last_tick['total_ms']:.0f}ms (fetch {_last_tick['fetch_ms']:.0f}ms, "
+            f"db {_last_tick['db_ms']:.0f}ms, broadcast {_last_tick['broadcast_ms']:.0f}ms)"
+        )
 
-            except Exception as e:
-                ticker_name = quote.get("code", "unknown") if quote else "unknown"
-                logger.error(f"Error updating price for {ticker_name}: {e}")
 
-        await session.commit()
-        logger.info(f"Live price update complete for {len(open_tickers)} stocks")
+def get_price_worker_stats() -> dict:
+    """Timing breakdown of the most recent live price tick."""
+    return dict(_last_tick)
 
 
 async def update_intraday_delayed():
@@ -493,16 +538,19 @@ async def update_intraday_delayed():
             except Exception as e:
                 logger.error(f"Error fetching delayed intraday for {ticker}: {e}")
 
+        if fetched_count > 0:
+            await update_rollups(
+                session, target_minute, target_minute + timedelta(minutes=1), open_tickers
+            )
         await session.commit()
         if fetched_count > 0:
             logger.info(f"Stored {fetched_count} delayed intraday bars")
 
 
+@run_at_priority(Priority.BACKFILL)
 async def update_daily_prices():
     """Update daily prices for all tracked stocks (called after market close)."""
     async with async_session_factory() as session:
-        from data_server.db import cache
-
         tickers = await get_tracked_tickers(session)
 
         if not tickers:
@@ -512,17 +560,22 @@ async def update_daily_prices():
 
         client = await get_eodhd_client()
 
+        prices_by_symbol = {}
         for symbol in tickers:
             try:
                 # Fetch recent daily prices
                 data = await client.get_eod(symbol)
 
                 if data:
-                    ticker = symbol.split(".")[0]
-                    count = await cache.store_daily_prices(session, symbol, data)
-                    logger.info(f"Stored {count} daily prices for {ticker}")
+                    prices_by_symbol[symbol] = data
 
+            except BudgetExhausted as e:
+                logger.warning(f"Deferring remaining daily price updates: {e}")
+                break
             except Exception as e:
                 logger.error(f"Error updating daily prices for {symbol}: {e}")
 
+        # Single bulk upsert for all tickers instead of one INSERT per bar
+        count = await cache.store_daily_prices_batch(session, prices_by_symbol)
         await session.commit()
+        logger.info(f"Stored {count} daily prices for {len(prices_by_symbol)} stocks")
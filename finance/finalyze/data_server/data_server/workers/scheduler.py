@@ -1,7 +1,7 @@
 """APScheduler setup for background workers."""
 
 import logging
-from datetime import datetime
+from datetime import date as date_type, datetime
 from typing import Optional
 
 try:
@@ -17,7 +17,9 @@ from apscheduler.triggers.cron import CronTrigger
 
 ET_TZ = ZoneInfo("America/New_York")
 
+from data_server import metrics
 from data_server.config import get_settings
+from data_server.services.request_scheduler import BudgetExhausted, Priority, run_at_priority
 from data_server.workers.price_worker import update_prices
 from data_server.workers.news_worker import update_news
 
@@ -138,37 +140,61 @@ async def stop_scheduler():
         logger.info("Background scheduler stopped")
 
 
+@metrics.timed(metrics.JOB_DURATION, errors=metrics.JOB_FAILURES, job="daily_worker")
 async def daily_cleanup():
-    """Daily cleanup task - remove old intraday data."""
-    from sqlalchemy import delete
-    from datetime import timedelta
+    """Daily cleanup task - compact old intraday data into rollups.
+
+    Also applies daily_prices retention and creates the price table
+    partitions for the upcoming periods.
+    """
+    from data_server.db import cache
+    from data_server.db.bar_cache import daily_bar_cache
     from data_server.db.database import async_session_factory
-    from data_server.db.models import IntradayPrice
+    from data_server.db.partitions import ensure_partitions
+    from data_server.db.rollups import compact_intraday
 
     logger.info("Running daily cleanup...")
 
     async with async_session_factory() as session:
-        # Delete intraday data older than 7 days
-        cutoff = datetime.utcnow() - timedelta(days=7)
-        result = await session.execute(
-            delete(IntradayPrice).where(IntradayPrice.timestamp < cutoff)
-        )
+        # Fold raw minutes past retention into 5m/1h/1d rollups, then prune
+        stats = await compact_intraday(session)
         await session.commit()
 
-        logger.info(f"Deleted {result.rowcount} old intraday records")
+        logger.info(
+            f"Deleted {stats['raw_deleted']} old intraday records, dropped "
+            f"{stats['raw_partitions_dropped']} partitions "
+            f"(rollups pruned: 5m={stats['5m_deleted']}, 1h={stats['1h_deleted']})"
+        )
+
+        years = settings.daily_prices_retention_years
+        if years > 0:
+            cutoff = date_type(datetime.utcnow().year - years, 1, 1)
+            await cache.expire_daily_prices(session, cutoff)
+            await session.commit()
+            daily_bar_cache.clear()
+
+        # After retention, so expired rows don't get partitions recreated
+        created = await ensure_partitions(await session.connection())
+        await session.commit()
+        if created:
+            logger.info(f"Created {created} price table partitions")
 
 
+@metrics.timed(metrics.JOB_DURATION, errors=metrics.JOB_FAILURES, job="eod_refresh_worker")
+@run_at_priority(Priority.BACKFILL)
 async def refresh_eod_caches():
     """Fetch fresh daily prices, invalidate caches, and sync LivePrice.
 
     Runs after US market close. Three steps:
     1. Fetch fresh EOD daily prices for all tracked stocks from EODHD API.
-    2. Invalidate daily price cache metadata so next request fetches fresh data.
+    2. Invalidate daily price cache metadata and the in-process bar cache
+       so next request fetches fresh data.
     3. Update LivePrice table from daily_prices so live data reflects final closes.
     """
     from datetime import datetime, date as date_type
     from decimal import Decimal
     from sqlalchemy import delete, select, func, and_
+    from data_server.db.bar_cache import daily_bar_cache
     from data_server.db.database import async_session_factory
     from data_server.db.models import CacheMetadata, LivePrice, DailyPrice
     from data_server.workers.price_worker import update_daily_prices
@@ -187,6 +213,7 @@ async def refresh_eod_caches():
             delete(CacheMetadata).where(CacheMetadata.cache_key.startswith("eod:"))
         )
         deleted = result.rowcount
+        daily_bar_cache.clear()
         logger.info(f"Invalidated {deleted} EOD cache entries")
 
         # Step 3: Update LivePrice from latest daily_prices
@@ -259,6 +286,8 @@ async def refresh_eod_caches():
             logger.info(f"EOD refresh: synced {updated_count} LivePrice entries with daily closes")
 
 
+@metrics.timed(metrics.JOB_DURATION, errors=metrics.JOB_FAILURES, job="fundamentals_worker")
+@run_at_priority(Priority.BACKFILL)
 async def update_fundamentals():
     """Update fundamentals (shares outstanding, etc.) for all tracked stocks.
 
@@ -315,6 +344,10 @@ async def update_fundamentals():
             updated_count += 1
             logger.debug(f"Updated EODHD fundamentals for {symbol}")
 
+        except BudgetExhausted as e:
+            # The rest are picked up by tomorrow's run
+            logger.warning(f"Deferring remaining fundamentals updates: {e}")
+            break
         except Exception as e:
             logger.error(f"Error updating fundamentals for {symbol}: {e}")
 
@@ -0,0 +1,131 @@
+"""Compact binary encoding of price updates for WebSocket clients.
+
+Clients opt in with {"type": "set_protocol", "protocol": "binary"}. Each
+subscribed ticker is then given a small integer id (returned in the
+"protocol" and "subscribed" replies as {"ids": {ticker: id}}), and price
+updates arrive as binary frames instead of JSON. Control messages stay
+JSON text frames.
+
+Frame layout (little-endian):
+
+    header  B kind (1 = price updates), B version, H entry count
+    entry   H ticker id, B field mask, then one value per set mask bit:
+            bit 0 price d, bit 1 change d, bit 2 change_percent d,
+            bit 3 volume q, bit 4 timestamp I
+
+Only fields that changed since the last frame sent to that client are
+included; clients keep the previous value for the rest. A field that
+becomes null, or cannot be coerced to its type (e.g. "NA"), is not sent.
+"""
+
+import struct
+
+FRAME_PRICE_UPDATES = 1
+PROTOCOL_VERSION = 1
+
+# (field name, struct code) in mask bit order
+FIELDS = (
+    ("price", "d"),
+    ("change", "d"),
+    ("change_percent", "d"),
+    ("volume", "q"),
+    ("timestamp", "I"),
+)
+
+_HEADER = struct.Struct("<BBH")
+_ENTRY = struct.Struct("<HB")
+_MAX_ENTRIES = 0xFFFF
+_MAX_TICKER_ID = 0xFFFF
+
+# Value layout for every field mask
+_VALUES = {
+    mask: struct.Struct("<" + "".join(code for bit, (_, code) in enumerate(FIELDS) if mask >> bit & 1))
+    for mask in range(1 << len(FIELDS))
+}
+# Accepted range per integer struct code
+_INTEGER_RANGES = {"q": (-(1 << 63), (1 << 63) - 1), "I": (0, (1 << 32) - 1)}
+
+
+def _coerce(value, code: str):
+    """value as the field's struct type, or None if it can't be packed."""
+    if value is None:
+        return None
+    try:
+        if code == "d":
+            return float(value)
+        value = int(float(value)) if isinstance(value, str) else int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    low, high = _INTEGER_RANGES[code]
+    return value if low <= value <= high else None
+
+
+class PriceDeltaEncoder:
+    """Per-connection ticker ids and last-sent values."""
+
+    def __init__(self):
+        self.ticker_ids: dict[str, int] = {}
+        self._last: dict[str, tuple] = {}
+
+    def assign_ids(self, tickers) -> dict[str, int]:
+        """Ids for tickers, allocating new ones as needed (ids are never reused)."""
+        ids = {}
+        for ticker in tickers:
+            if ticker not in self.ticker_ids:
+                if len(self.ticker_ids) > _MAX_TICKER_ID:
+                    continue
+                self.ticker_ids[ticker] = len(self.ticker_ids)
+            ids[ticker] = self.ticker_ids[ticker]
+        return ids
+
+    def encode(self, updates: dict[str, dict]) -> list[bytes]:
+        """Encode updates as frames, skipping tickers without changes."""
+        entries = []
+        for ticker, data in updates.items():
+            ticker_id = self.ticker_ids.get(ticker)
+            if ticker_id is None:
+                continue
+
+            values = [_coerce(data.get(name), code) for name, code in FIELDS]
+
+            last = self._last.get(ticker, (None,) * len(FIELDS))
+            mask = 0
+            changed = []
+            for bit, (value, previous) in enumerate(zip(values, last)):
+                if value is not None and value != previous:
+                    mask |= 1 << bit
+                    changed.append(value)
+            if not mask:
+                continue
+
+            self._last[ticker] = tuple(
+                value if value is not None else previous for value, previous in zip(values, last)
+            )
+            entries.append(_ENTRY.pack(ticker_id, mask) + _VALUES[mask].pack(*changed))
+
+        return [
+            _HEADER.pack(FRAME_PRICE_UPDATES, PROTOCOL_VERSION, len(entries[i:i + _MAX_ENTRIES]))
+            + b"".join(entries[i:i + _MAX_ENTRIES])
+            for i in range(0, len(entries), _MAX_ENTRIES)
+        ]
+
+
+def decode_price_frame(frame: bytes) -> list[tuple[int, dict]]:
+    """Decode a price frame into [(ticker id, {changed field: value})]."""
+    kind, version, count = _HEADER.unpack_from(frame, 0)
+    if kind != FRAME_PRICE_UPDATES or version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported frame kind={kind} version={version}")
+
+    offset = _HEADER.size
+    result = []
+    for _ in range(count):
+        ticker_id, mask = _ENTRY.unpack_from(frame, offset)
+        offset += _ENTRY.size
+        layout = _VALUES[mask]
+        values = iter(layout.unpack_from(frame, offset))
+        offset += layout.size
+        result.append((
+            ticker_id,
+            {name: next(values) for bit, (name, _) in enumerate(FIELDS) if mask >> bit & 1},
+        ))
+    return result
@@ -51,13 +51,14 @@ async def handle_message(client_id: str, data: dict):
         tickers = data.get("tickers", [])
         if tickers:
             await manager.subscribe(client_id, tickers)
-            await manager.send_personal(
-                client_id,
-                {
-                    "type": "subscribed",
-                    "tickers": tickers,
-                },
-            )
+            message = {
+                "type": "subscribed",
+                "tickers": tickers,
+            }
+            ids = await manager.get_ticker_ids(client_id, tickers)
+            if ids is not None:
+                message["ids"] = ids
+            await manager.send_personal(client_id, message)
             logger.info(f"Client {client_id} subscribed to: {tickers}")
 
     elif msg_type == "unsubscribe":
@@ -73,6 +74,29 @@ async def handle_message(client_id: str, data: dict):
             )
             logger.info(f"Client {client_id} unsubscribed from: {tickers}")
 
+    elif msg_type == "set_protocol":
+        protocol = data.get("protocol", "json")
+        if protocol not in ("json", "binary"):
+            await manager.send_personal(
+                client_id,
+                {
+                    "type": "error",
+                    "message": f"Unknown protocol: {protocol}",
+                },
+            )
+            return
+        ids = await manager.set_protocol(client_id, protocol)
+        message = {
+            "type": "protocol",
+            "protocol": protocol,
+        }
+        if ids is not None:
+            from data_server.ws.binary import PROTOCOL_VERSION
+            message["version"] = PROTOCOL_VERSION
+            message["ids"] = ids
+        await manager.send_personal(client_id, message)
+        logger.info(f"Client {client_id} switched to {protocol} protocol")
+
     elif msg_type == "ping":
         await manager.send_personal(client_id, {"type": "pong"})
 
@@ -1,15 +1,32 @@
-"""WebSocket connection manager."""
+"""WebSocket connection manager.
+
+Every connection has its own outbound queue drained by a writer task, so
+broadcasting never awaits a socket: a slow client only delays itself.
+Price updates are coalesced per ticker until the writer catches up (a
+slow consumer skips intermediate prices and gets the latest), then sent
+as one multi-ticker "price_updates" message. Other messages are queued in
+order, dropping the oldest once the queue is full. Clients that opted in
+to the binary protocol (see ws/binary.py) get price updates as compact
+delta-encoded frames instead.
+"""
 
 import asyncio
 import json
 import logging
+from collections import deque
 from typing import Any, Optional
 from dataclasses import dataclass, field
 
 from fastapi import WebSocket, WebSocketDisconnect
 
+from data_server import metrics
+from data_server.ws.binary import PriceDeltaEncoder
+
 logger = logging.getLogger(__name__)
 
+# Non-price messages buffered per client before the oldest are dropped
+_MAX_QUEUED_MESSAGES = 256
+
 
 @dataclass
 class Connection:
@@ -17,6 +34,34 @@ class Connection:
 
     websocket: WebSocket
     subscribed_tickers: set[str] = field(default_factory=set)
+    # Outbound messages in send order (bounded, drop-oldest)
+    queue: deque = field(default_factory=lambda: deque(maxlen=_MAX_QUEUED_MESSAGES))
+    # Latest unsent price update per ticker
+    pending_prices: dict[str, dict] = field(default_factory=dict)
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    writer: Optional[asyncio.Task] = None
+    # Set when the client uses the binary price protocol
+    encoder: Optional[PriceDeltaEncoder] = None
+    closed: bool = False
+    dropped: int = 0
+    coalesced: int = 0
+
+    def enqueue(self, message: dict):
+        if self.closed:
+            return
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(message)
+        self.wakeup.set()
+
+    def enqueue_prices(self, updates: dict[str, dict]):
+        if self.closed:
+            return
+        for ticker, data in updates.items():
+            if ticker in self.pending_prices:
+                self.coalesced += 1
+            self.pending_prices[ticker] = data
+        self.wakeup.set()
 
 
 class ConnectionManager:
@@ -24,31 +69,80 @@ class ConnectionManager:
 
     def __init__(self):
         self.connections: dict[str, Connection] = {}
+        # Reverse index: ticker -> subscribed client ids
+        self._subscribers: dict[str, set[str]] = {}
         self._lock = asyncio.Lock()
 
     async def connect(self, websocket: WebSocket, client_id: str):
         """Accept a new WebSocket connection."""
         await websocket.accept()
+        conn = Connection(websocket=websocket)
+        conn.writer = asyncio.create_task(self._write_loop(client_id, conn))
         async with self._lock:
-            self.connections[client_id] = Connection(websocket=websocket)
+            self.connections[client_id] = conn
         logger.info(f"WebSocket connected: {client_id}")
 
+    async def _write_loop(self, client_id: str, conn: Connection):
+        """Drain a client's queue: ordered messages first, then coalesced prices."""
+        try:
+            while True:
+                await conn.wakeup.wait()
+                conn.wakeup.clear()
+                while conn.queue or conn.pending_prices:
+                    if conn.queue:
+                        await conn.websocket.send_json(conn.queue.popleft())
+                        continue
+                    prices, conn.pending_prices = conn.pending_prices, {}
+                    if conn.encoder is None:
+                        await conn.websocket.send_json({"type": "price_updates", "data": prices})
+                    else:
+                        for frame in conn.encoder.encode(prices):
+                            await conn.websocket.send_bytes(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The socket may still be healthy (e.g. an encode error): close it
+            # so the client sees the drop and reconnects, and unregister it
+            logger.error(f"Error sending to {client_id}: {e}")
+            conn.closed = True
+            conn.queue.clear()
+            conn.pending_prices.clear()
+            try:
+                await conn.websocket.close(code=1011)
+            except Exception:
+                pass
+            await self.disconnect(client_id)
+
+    def _unindex(self, client_id: str, tickers):
+        for ticker in tickers:
+            subscribers = self._subscribers.get(ticker)
+            if subscribers is not None:
+                subscribers.discard(client_id)
+                if not subscribers:
+                    del self._subscribers[ticker]
+
     async def disconnect(self, client_id: str):
         """Remove a WebSocket connection."""
         async with self._lock:
-            if client_id in self.connections:
-                del self.connections[client_id]
+            conn = self.connections.pop(client_id, None)
+            if conn is not None:
+                self._unindex(client_id, conn.subscribed_tickers)
+        if conn is not None and conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
         logger.info(f"WebSocket disconnected: {client_id}")
 
     async def disconnect_all(self):
         """Disconnect all WebSocket connections."""
         async with self._lock:
             for client_id, conn in list(self.connections.items()):
+                if conn.writer is not None:
+                    conn.writer.cancel()
                 try:
                     await conn.websocket.close()
                 except Exception:
                     pass
             self.connections.clear()
+            self._subscribers.clear()
         logger.info("All WebSocket connections closed")
 
     async def subscribe(self, client_id: str, tickers: list[str]):
@@ -56,15 +150,45 @@ class ConnectionManager:
         async with self._lock:
             if client_id in self.connections:
                 self.connections[client_id].subscribed_tickers.update(tickers)
+                for ticker in tickers:
+                    self._subscribers.setdefault(ticker, set()).add(client_id)
                 logger.debug(f"Client {client_id} subscribed to: {tickers}")
 
     async def unsubscribe(self, client_id: str, tickers: list[str]):
         """Unsubscribe a client from tickers."""
         async with self._lock:
             if client_id in self.connections:
-                self.connections[client_id].subscribed_tickers.difference_update(tickers)
+                conn = self.connections[client_id]
+                conn.subscribed_tickers.difference_update(tickers)
+                for ticker in tickers:
+                    conn.pending_prices.pop(ticker, None)
+                self._unindex(client_id, tickers)
                 logger.debug(f"Client {client_id} unsubscribed from: {tickers}")
 
+    async def set_protocol(self, client_id: str, protocol: str) -> Optional[dict[str, int]]:
+        """Switch a client between "json" and "binary" price updates.
+
+        Returns ticker ids for the current subscriptions when binary.
+        """
+        async with self._lock:
+            conn = self.connections.get(client_id)
+            if conn is None:
+                return None
+            if protocol != "binary":
+                conn.encoder = None
+                return None
+            if conn.encoder is None:
+                conn.encoder = PriceDeltaEncoder()
+            return conn.encoder.assign_ids(sorted(conn.subscribed_tickers))
+
+    async def get_ticker_ids(self, client_id: str, tickers: list[str]) -> Optional[dict[str, int]]:
+        """Binary-protocol ids for tickers (None for JSON clients)."""
+        async with self._lock:
+            conn = self.connections.get(client_id)
+            if conn is None or conn.encoder is None:
+                return None
+            return conn.encoder.assign_ids(tickers)
+
     async def get_subscriptions(self, client_id: str) -> set[str]:
         """Get subscribed tickers for a client."""
         async with self._lock:
@@ -72,42 +196,42 @@ class ConnectionManager:
                 return self.connections[client_id].subscribed_tickers.copy()
             return set()
 
+    # Sending only enqueues (no awaits), so it needs no lock and never blocks
+
     async def send_personal(self, client_id: str, message: dict):
         """Send a message to a specific client."""
-        async with self._lock:
-            if client_id in self.connections:
-                try:
-                    await self.connections[client_id].websocket.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending to {client_id}: {e}")
+        conn = self.connections.get(client_id)
+        if conn is not None:
+            conn.enqueue(message)
 
     async def broadcast(self, message: dict):
         """Broadcast a message to all connected clients."""
-        async with self._lock:
-            for client_id, conn in list(self.connections.items()):
-                try:
-                    await conn.websocket.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to {client_id}: {e}")
+        for conn in self.connections.values():
+            conn.enqueue(message)
 
     async def broadcast_to_ticker(self, ticker: str, message: dict):
         """Broadcast a message to clients subscribed to a ticker."""
-        async with self._lock:
-            for client_id, conn in list(self.connections.items()):
-                if ticker in conn.subscribed_tickers:
-                    try:
-                        await conn.websocket.send_json(message)
-                    except Exception as e:
-                        logger.error(f"Error sending to {client_id}: {e}")
+        for client_id in self._subscribers.get(ticker, ()):
+            self.connections[client_id].enqueue(message)
 
     async def broadcast_price_update(self, ticker: str, data: dict):
         """Broadcast a price update to subscribed clients."""
-        message = {
-            "type": "price_update",
-            "ticker": ticker,
-            "data": data,
-        }
-        await self.broadcast_to_ticker(ticker, message)
+        await self.broadcast_price_updates({ticker: data})
+
+    async def broadcast_price_updates(self, updates: dict[str, dict]):
+        """Broadcast price updates for many tickers to subscribed clients.
+
+        Each client receives the updates for its subscribed tickers as a
+        single {"type": "price_updates", "data": {ticker: data}} message.
+        Work is proportional to the subscribers of the updated tickers.
+        """
+        per_client: dict[str, dict[str, dict]] = {}
+        for ticker, data in updates.items():
+            for client_id in self._subscribers.get(ticker, ()):
+                per_client.setdefault(client_id, {})[ticker] = data
+
+        for client_id, client_updates in per_client.items():
+            self.connections[client_id].enqueue_prices(client_updates)
 
     async def broadcast_news_update(self, ticker: str, data: dict):
         """Broadcast a news update to subscribed clients."""
@@ -133,11 +257,36 @@ class ConnectionManager:
 
     def get_all_subscribed_tickers(self) -> set[str]:
         """Get all tickers that have at least one subscriber."""
-        tickers = set()
-        for conn in self.connections.values():
-            tickers.update(conn.subscribed_tickers)
-        return tickers
+        return set(self._subscribers)
+
+    def stats(self) -> dict:
+        """Connection and outbound queue statistics."""
+        conns = list(self.connections.values())
+        return {
+            "connections": len(conns),
+            "subscribed_tickers": len(self._subscribers),
+            "queued_messages": sum(len(c.queue) for c in conns),
+            "max_queued_messages": max((len(c.queue) for c in conns), default=0),
+            "pending_prices": sum(len(c.pending_prices) for c in conns),
+            "dropped_messages": sum(c.dropped for c in conns),
+            "coalesced_prices": sum(c.coalesced for c in conns),
+        }
 
 
 # Global manager instance
 manager = ConnectionManager()
+
+metrics.Gauge(
+    "websocket_connections", "Open WebSocket connections.",
+    collect=lambda: len(manager.connections),
+)
+metrics.Gauge(
+    "websocket_queue_depth",
+    "Messages waiting in WebSocket outbound queues (total, and the deepest single queue).",
+    ("queue",),
+    collect=lambda: {
+        "total": sum(len(c.queue) for c in manager.connections.values()),
+        "max": max((len(c.queue) for c in manager.connections.values()), default=0),
+        "pending_prices": sum(len(c.pending_prices) for c in manager.connections.values()),
+    },
+)
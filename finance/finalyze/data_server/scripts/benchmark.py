@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""Performance benchmarks for the data server.
+
+Usage:
+    cd /Users/jmahe/projects/python/finance/finalyze/data_server
+    source .venv/bin/activate
+
+    # Price storage throughput (runs in-process against DATABASE_URL)
+    python scripts/benchmark.py storage --rows 2520
+
+    # /batch/daily-changes cache pass for 100/500/2000 symbols
+    python scripts/benchmark.py batch --symbols 100 500 2000
+
+    # Live price tick write path (LivePrice, minute bars, rollups, tracking)
+    python scripts/benchmark.py tick --tickers 1000
+
+    # p50/p99 of 10k-bar JSON responses in-process (no DB), optionally
+    # also against a running server
+    python scripts/benchmark.py response --bars 10000 [--url http://localhost:8000]
+
+Benchmarks write to synthetic tickers (BENCH*.TEST) and delete them afterwards.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Allow running from the data_server directory without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    RESET = '\033[0m'
+    BOLD = '\033[1m'
+
+
+BENCH_TICKER = "BENCH.TEST"
+
+
+def print_header(title: str):
+    print(f"\n{Colors.BOLD}{'='*70}{Colors.RESET}")
+    print(f"{Colors.BOLD}{title}{Colors.RESET}")
+    print(f"{'='*70}")
+
+
+def print_rate(name: str, rows: int, seconds: float, unit: str = "rows"):
+    rate = rows / seconds if seconds > 0 else float("inf")
+    print(f"  {Colors.CYAN}{name:<28}{Colors.RESET} {rows:>7} {unit} in "
+          f"{seconds * 1000:>9.1f}ms  = {Colors.GREEN}{rate:>10,.0f} {unit}/sec{Colors.RESET}")
+    return rate
+
+
+def print_latency(name: str, samples: list[float], size: int = 0):
+    """Print p50/p99 of latency samples (seconds)."""
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2] * 1000
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+    size_str = f"  {size / 1024:>8.1f} KiB" if size else ""
+    print(f"  {Colors.CYAN}{name:<28}{Colors.RESET} p50 {Colors.GREEN}{p50:>8.2f}ms{Colors.RESET}"
+          f"  p99 {Colors.YELLOW}{p99:>8.2f}ms{Colors.RESET}{size_str}")
+    return p50
+
+
+def _synthetic_daily_bars(n: int) -> list[dict]:
+    """Generate n consecutive weekday bars ending today."""
+    bars = []
+    d = date.today()
+    price = 100.0
+    while len(bars) < n:
+        if d.weekday() < 5:
+            bars.append({
+                "date": d.isoformat(),
+                "open": price,
+                "high": price * 1.01,
+                "low": price * 0.99,
+                "close": price * 1.002,
+                "adjusted_close": price * 1.002,
+                "volume": 1_000_000 + len(bars),
+            })
+            price *= 0.9995
+        d -= timedelta(days=1)
+    bars.reverse()
+    return bars
+
+
+def _synthetic_intraday_bars(n: int) -> list[dict]:
+    """Generate n consecutive 1-minute bars."""
+    start = datetime.utcnow().replace(second=0, microsecond=0) - timedelta(minutes=n)
+    return [
+        {
+            "timestamp": int((start + timedelta(minutes=i)).timestamp()),
+            "open": 100.0 + i * 0.01,
+            "high": 100.1 + i * 0.01,
+            "low": 99.9 + i * 0.01,
+            "close": 100.05 + i * 0.01,
+            "volume": 1000 + i,
+        }
+        for i in range(n)
+    ]
+
+
+async def _legacy_store_daily(session, ticker: str, prices: list[dict]) -> int:
+    """Baseline: one INSERT ... ON CONFLICT per bar (pre-bulk implementation)."""
+    from sqlalchemy.dialects.postgresql import insert
+    from data_server.db.cache import parse_date_str
+    from data_server.db.models import DailyPrice
+
+    for price in prices:
+        values = {
+            "open": price.get("open"),
+            "high": price.get("high"),
+            "low": price.get("low"),
+            "close": price.get("close"),
+            "adjusted_close": price.get("adjusted_close"),
+            "volume": price.get("volume"),
+            "fetched_at": datetime.utcnow(),
+        }
+        stmt = insert(DailyPrice).values(
+            ticker=ticker, date=parse_date_str(price["date"]), **values
+        ).on_conflict_do_update(index_elements=["ticker", "date"], set_=values)
+        await session.execute(stmt)
+    return len(prices)
+
+
+async def _legacy_store_intraday(session, ticker: str, prices: list[dict]) -> int:
+    """Baseline: one INSERT ... ON CONFLICT per bar (pre-bulk implementation)."""
+    from sqlalchemy.dialects.postgresql import insert
+    from data_server.db.cache import parse_timestamp
+    from data_server.db.models import IntradayPrice
+
+    for price in prices:
+        values = {
+            "open": price.get("open"),
+            "high": price.get("high"),
+            "low": price.get("low"),
+            "close": price.get("close"),
+            "volume": price.get("volume"),
+            "source": "live",
+            "fetched_at": datetime.utcnow(),
+        }
+        stmt = insert(IntradayPrice).values(
+            ticker=ticker, timestamp=parse_timestamp(price["timestamp"]), **values
+        ).on_conflict_do_update(index_elements=["ticker", "timestamp"], set_=values)
+        await session.execute(stmt)
+    return len(prices)
+
+
+async def bench_storage(args) -> int:
+    """Compare per-row vs bulk upsert throughput for daily and intraday bars."""
+    from sqlalchemy import delete
+    from data_server.db import cache
+    from data_server.db.database import async_session_factory, close_db, init_db
+    from data_server.db.models import DailyPrice, IntradayPrice
+
+    await init_db()
+
+    daily = _synthetic_daily_bars(args.rows)
+    intraday = _synthetic_intraday_bars(args.rows)
+    multi = {f"BENCH{i}.TEST": daily for i in range(args.tickers)}
+
+    async def _cleanup():
+        async with async_session_factory() as session:
+            await session.execute(delete(DailyPrice).where(DailyPrice.ticker.like("BENCH%.TEST")))
+            await session.execute(delete(IntradayPrice).where(IntradayPrice.ticker.like("BENCH%.TEST")))
+            await session.commit()
+
+    async def _timed(fn, *fn_args, **fn_kwargs) -> float:
+        await _cleanup()
+        async with async_session_factory() as session:
+            start = time.perf_counter()
+            await fn(session, *fn_args, **fn_kwargs)
+            await session.commit()
+            return time.perf_counter() - start
+
+    print_header(f"PRICE STORAGE ({args.rows} bars/ticker)")
+    try:
+        before = print_rate("daily per-row (before)", len(daily),
+                            await _timed(_legacy_store_daily, BENCH_TICKER, daily))
+        after = print_rate("daily bulk (after)", len(daily),
+                           await _timed(cache.store_daily_prices, BENCH_TICKER, daily))
+        print(f"  {Colors.BOLD}speedup: {after / before:.1f}x{Colors.RESET}")
+
+        before = print_rate("intraday per-row (before)", len(intraday),
+                            await _timed(_legacy_store_intraday, BENCH_TICKER, intraday))
+        after = print_rate("intraday bulk (after)", len(intraday),
+                           await _timed(cache.store_intraday_prices, BENCH_TICKER, intraday))
+        print(f"  {Colors.BOLD}speedup: {after / before:.1f}x{Colors.RESET}")
+
+        print_rate(f"daily batch ({args.tickers} tickers)", len(daily) * args.tickers,
+                   await _timed(cache.store_daily_prices_batch, multi))
+    finally:
+        await _cleanup()
+        await close_db()
+
+    return 0
+
+
+async def _legacy_batch_lookup(session, symbols: list[str], from_date, to_date) -> int:
+    """Baseline: one ORM SELECT per symbol (pre-window implementation)."""
+    from sqlalchemy import select
+    from data_server.db.models import DailyPrice
+
+    hits = 0
+    for symbol in symbols:
+        result = await session.execute(
+            select(DailyPrice)
+            .where(DailyPrice.ticker == symbol)
+            .where(DailyPrice.date >= from_date.date())
+            .where(DailyPrice.date <= to_date.date())
+            .order_by(DailyPrice.date.asc())
+        )
+        prices = [
+            {"date": p.date.isoformat(), "close": float(p.close) if p.close else None, "volume": p.volume}
+            for p in result.scalars().all()
+        ]
+        if len(prices) >= 2:
+            hits += 1
+    return hits
+
+
+async def bench_batch(args) -> int:
+    """Compare per-symbol vs windowed cache lookup for /batch/daily-changes."""
+    from sqlalchemy import delete
+    from data_server.api.routes import _daily_change_from_window, get_batch_daily_changes
+    from data_server.db import cache
+    from data_server.db.database import async_session_factory, close_db, init_db
+    from data_server.db.models import DailyPrice
+
+    await init_db()
+
+    daily = _synthetic_daily_bars(args.rows)
+    max_symbols = max(args.symbols)
+    all_symbols = [f"BENCH{i}.TEST" for i in range(max_symbols)]
+    to_date = datetime.fromisoformat(daily[-1]["date"])
+    from_date = to_date - timedelta(days=args.days)
+    today_iso = date.today().isoformat()
+
+    async def _cleanup():
+        async with async_session_factory() as session:
+            await session.execute(delete(DailyPrice).where(DailyPrice.ticker.like("BENCH%.TEST")))
+            await session.commit()
+
+    print_header(f"BATCH DAILY CHANGES ({args.rows} bars/symbol, {args.days}-day range)")
+    try:
+        await _cleanup()
+        async with async_session_factory() as session:
+            await cache.store_daily_prices_batch(session, {s: daily for s in all_symbols})
+            await session.commit()
+
+        for n in args.symbols:
+            symbols = all_symbols[:n]
+            async with async_session_factory() as session:
+                start = time.perf_counter()
+                await _legacy_batch_lookup(session, symbols, from_date, to_date)
+                before = time.perf_counter() - start
+
+                start = time.perf_counter()
+                windows = await cache.get_daily_change_windows(session, symbols, from_date, to_date)
+                for symbol in symbols:
+                    _daily_change_from_window(windows[symbol], False, today_iso)
+                after = time.perf_counter() - start
+
+                start = time.perf_counter()
+                results = await get_batch_daily_changes(
+                    {"symbols": symbols, "start_date": from_date.date().isoformat(),
+                     "end_date": to_date.date().isoformat()},
+                    session=session,
+                )
+                route = time.perf_counter() - start
+
+            print(f"\n  {Colors.BOLD}{n} symbols{Colors.RESET} ({len(results)} results)")
+            print_rate("per-symbol (before)", n, before, unit="symbols")
+            print_rate("windowed query (after)", n, after, unit="symbols")
+            print_rate("full endpoint", n, route, unit="symbols")
+            print(f"  {Colors.BOLD}speedup: {before / after:.1f}x{Colors.RESET}")
+    finally:
+        await _cleanup()
+        await close_db()
+
+    return 0
+
+
+def _synthetic_quotes(tickers: list[str], step: int) -> list[dict]:
+    """EODHD real-time batch style quotes for one tick."""
+    ts = int(time.time())
+    return [
+        {
+            "code": ticker,
+            "timestamp": ts,
+            "open": 100.0,
+            "high": 101.0 + step * 0.01,
+            "low": 99.0,
+            "close": 100.0 + step * 0.01,
+            "volume": 1_000_000 + step * 1000,
+            "previousClose": 99.5,
+            "change": 0.5 + step * 0.01,
+            "change_p": 0.5,
+            "_data_source": "eodhd",
+        }
+        for ticker in tickers
+    ]
+
+
+async def bench_tick(args) -> int:
+    """Time the per-tick live price write path for many tickers."""
+    from sqlalchemy import delete
+    from data_server.db.database import async_session_factory, close_db, init_db
+    from data_server.db.models import IntradayPrice, IntradayRollup, LivePrice
+    from data_server.workers import price_worker
+
+    await init_db()
+
+    tickers = [f"BENCH{i}.TEST" for i in range(args.tickers)]
+
+    async def _cleanup():
+        async with async_session_factory() as session:
+            for model in (LivePrice, IntradayPrice, IntradayRollup):
+                await session.execute(delete(model).where(model.ticker.like("BENCH%.TEST")))
+            await session.commit()
+        for ticker in tickers:
+            price_worker._minute_bars.pop(ticker, None)
+            price_worker._prev_cumulative_volume.pop(ticker, None)
+
+    print_header(f"LIVE PRICE TICK ({args.tickers} tickers)")
+    try:
+        await _cleanup()
+        base = datetime.utcnow().replace(second=0, microsecond=0)
+        for step in range(args.ticks):
+            # Alternate within / across minutes so half the ticks close bars
+            now = base + timedelta(seconds=30 * step)
+            async with async_session_factory() as session:
+                start = time.perf_counter()
+                _, minute_bars = await price_worker.store_quotes(
+                    session, _synthetic_quotes(tickers, step), now
+                )
+                await session.commit()
+                elapsed = time.perf_counter() - start
+            print_rate(f"tick {step + 1} ({minute_bars} bars closed)", args.tickers, elapsed,
+                       unit="quotes")
+    finally:
+        await _cleanup()
+        await close_db()
+
+    return 0
+
+
+def _bench_app(bars):
+    """App serving the same bars through the default and the fast JSON routes."""
+    from fastapi import APIRouter, FastAPI
+    from data_server.api.responses import ETagMiddleware, FastJSONRoute
+
+    default_router = APIRouter()
+    fast_router = APIRouter(route_class=FastJSONRoute)
+
+    @default_router.get("/default")
+    async def default_route():
+        return bars.to_dicts()
+
+    @fast_router.get("/fast")
+    async def fast_route():
+        return bars.to_dicts()
+
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware)
+    app.include_router(default_router)
+    app.include_router(fast_router)
+    return app
+
+
+async def bench_response(args) -> int:
+    """p50/p99 latency of /eod-style JSON responses with N bars."""
+    import httpx
+    import numpy as np
+    from data_server.db.bar_cache import DailyBars
+
+    daily = _synthetic_daily_bars(args.bars)
+    bars = DailyBars(
+        dates=np.array([b["date"] for b in daily], dtype="datetime64[D]"),
+        **{col: np.array([b[col] for b in daily], dtype=np.float64)
+           for col in ("open", "high", "low", "close", "adjusted_close", "volume")},
+    )
+
+    async def _samples(client, path: str, headers=None) -> tuple[list[float], int]:
+        samples = []
+        size = 0
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            size = len(response.content)
+            samples.append(time.perf_counter() - start)
+        return samples, size
+
+    print_header(f"JSON RESPONSE LATENCY ({args.bars} bars, {args.iterations} requests)")
+    transport = httpx.ASGITransport(app=_bench_app(bars))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        before = print_latency("jsonable_encoder (before)", *await _samples(client, "/default"))
+        after = print_latency("orjson (after)", *await _samples(client, "/fast"))
+        etag = (await client.get("/fast")).headers["etag"]
+        print_latency("If-None-Match (304)",
+                      *await _samples(client, "/fast", {"If-None-Match": etag}))
+    print(f"  {Colors.BOLD}p50 speedup: {before / after:.1f}x{Colors.RESET}")
+
+    if args.url:
+        days = int(args.bars * 7 / 5) + 7
+        path = f"/api/eod/{args.symbol}?from={(date.today() - timedelta(days=days)).isoformat()}"
+        print_header(f"GET {args.url}{path}")
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            response = await client.get(path)
+            response.raise_for_status()
+            print(f"  {len(response.json())} bars")
+            print_latency("full response", *await _samples(client, path))
+            etag = response.headers.get("etag")
+            if etag:
+                print_latency("If-None-Match (304)",
+                              *await _samples(client, path, {"If-None-Match": etag}))
+
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data server performance benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("storage", help="Daily/intraday upsert throughput (rows/sec)")
+    p.add_argument("--rows", type=int, default=2520, help="Bars per ticker (default: 10 years)")
+    p.add_argument("--tickers", type=int, default=20, help="Tickers for the multi-ticker batch")
+    p.set_defaults(func=bench_storage)
+
+    p = sub.add_parser("batch", help="/batch/daily-changes cache lookup latency")
+    p.add_argument("--symbols", type=int, nargs="+", default=[100, 500, 2000],
+                   help="Symbol counts to benchmark (default: 100 500 2000)")
+    p.add_argument("--rows", type=int, default=260, help="Bars per symbol (default: 1 year)")
+    p.add_argument("--days", type=int, default=30, help="Requested range in calendar days")
+    p.set_defaults(func=bench_batch)
+
+    p = sub.add_parser("tick", help="Live price tick write latency")
+    p.add_argument("--tickers", type=int, default=1000, help="Tracked tickers per tick")
+    p.add_argument("--ticks", type=int, default=4, help="Consecutive ticks (30s apart)")
+    p.set_defaults(func=bench_tick)
+
+    p = sub.add_parser("response", help="JSON response p50/p99 latency (orjson, ETag)")
+    p.add_argument("--bars", type=int, default=10000, help="Bars per response")
+    p.add_argument("--iterations", type=int, default=200, help="Requests per variant")
+    p.add_argument("--url", help="Also benchmark /api/eod on a running server")
+    p.add_argument("--symbol", default="AAPL.US", help="Symbol for --url")
+    p.set_defaults(func=bench_response)
+
+    args = parser.parse_args()
+    return asyncio.run(args.func(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Tests for the binary price update encoding."""
+
+from data_server.ws.binary import PriceDeltaEncoder, decode_price_frame
+
+
+def _encoder(*tickers):
+    encoder = PriceDeltaEncoder()
+    encoder.assign_ids(tickers)
+    return encoder
+
+
+def test_round_trip_sends_only_changed_fields():
+    encoder = _encoder("AAPL.US")
+    first = {"price": 190.5, "change": 1.5, "change_percent": 0.79, "volume": 1000, "timestamp": 1700000000}
+    [frame] = encoder.encode({"AAPL.US": first})
+    assert decode_price_frame(frame) == [(0, first)]
+
+    [frame] = encoder.encode({"AAPL.US": {**first, "price": 191.0}})
+    assert decode_price_frame(frame) == [(0, {"price": 191.0})]
+    assert encoder.encode({"AAPL.US": {**first, "price": 191.0}}) == []
+
+
+def test_na_and_string_fields_are_skipped_or_coerced():
+    encoder = _encoder("AAPL.US", "MSFT.US")
+    [frame] = encoder.encode({
+        "AAPL.US": {"price": "190.5", "change": "NA", "change_percent": "", "volume": "1200", "timestamp": "NA"},
+        "MSFT.US": {"price": "NA", "change": None, "change_percent": "abc", "volume": "1e3", "timestamp": -5},
+    })
+    assert decode_price_frame(frame) == [
+        (0, {"price": 190.5, "volume": 1200}),
+        (1, {"volume": 1000}),
+    ]
+
+
+def test_uncoercible_update_keeps_previous_value():
+    encoder = _encoder("AAPL.US")
+    encoder.encode({"AAPL.US": {"price": 190.5}})
+    assert encoder.encode({"AAPL.US": {"price": "NA"}}) == []
+    [frame] = encoder.encode({"AAPL.US": {"price": 191}})
+    assert decode_price_frame(frame) == [(0, {"price": 191.0})]
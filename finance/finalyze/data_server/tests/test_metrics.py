@@ -0,0 +1,43 @@
+"""Tests for the HTTP metrics middleware."""
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from data_server import metrics
+
+
+def _client():
+    router = APIRouter()
+
+    @router.get("/eod/{symbol}")
+    async def eod(symbol: str):
+        return {"symbol": symbol}
+
+    @router.get("/files/{name:path}")
+    async def files(name: str):
+        return {"name": name}
+
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.include_router(router, prefix="/api")
+    return TestClient(app)
+
+
+def _routes():
+    return {route for _, route, _ in metrics.HTTP_REQUEST_DURATION._values}
+
+
+def test_route_label_includes_router_prefix():
+    client = _client()
+    client.get("/api/eod/AAPL.US")
+    client.get("/api/files/a/b.csv")
+    assert {"/api/eod/{symbol}", "/api/files/{name:path}"} <= _routes()
+    assert "/eod/{symbol}" not in _routes()
+
+
+def test_unmatched_requests_share_one_label():
+    client = _client()
+    client.get("/api/nope/1")
+    client.get("/api/nope/2")
+    assert "unmatched" in _routes()
+    assert not any(route.startswith("/api/nope") for route in _routes())
@@ -0,0 +1,8 @@
+"""Portfolio analysis module."""
+
+from investment_tool.analysis.portfolio.risk import PortfolioRisk, holdings_symbols
+
+__all__ = [
+    "PortfolioRisk",
+    "holdings_symbols",
+]
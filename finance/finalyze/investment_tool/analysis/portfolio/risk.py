@@ -0,0 +1,331 @@
+"""Vectorized portfolio risk analytics over a daily returns matrix.
+
+PortfolioRisk keeps the split-adjusted closes of a universe as a dense
+(days x symbols) array and derives returns, covariance, beta, VaR and
+drawdowns from it with whole-array NumPy operations.
+
+The windowed covariance is kept as running sums over the last `window`
+return rows (pairwise observation counts, sums and cross products), so a
+new day costs a rank-k update of three symbols x symbols matrices instead
+of a pass over the whole window. refresh() fetches only the days since
+the last one held, through a single /batch/daily-closes request.
+"""
+
+import warnings
+from datetime import date, timedelta
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Full recompute of the running sums after this many incremental updates,
+# which bounds floating-point drift from repeated add/subtract
+_RESYNC_UPDATES = 256
+
+
+def holdings_symbols(data_manager, watchlist_ids: Optional[Iterable[int]] = None) -> List[str]:
+    """Symbols ("AAPL.US") in the given watchlists, or in all of them."""
+    if watchlist_ids is None:
+        watchlist_ids = [w.id for w in data_manager.get_watchlists()]
+    symbols: Dict[str, None] = {}
+    for watchlist_id in watchlist_ids:
+        for item in data_manager.get_watchlist_items(watchlist_id):
+            symbols[f"{item.ticker}.{item.exchange}"] = None
+    return list(symbols)
+
+
+class _WindowMoments:
+    """Pairwise-complete running sums over a block of return rows.
+
+    For returns x (NaN where missing) and mask m = ~isnan(x), with x0 = x
+    zero-filled: count = m'm, sums = x0'm (column j: sum of x_i over rows
+    where both i and j are present) and cross = x0'x0.
+    """
+
+    def __init__(self, n: int):
+        self.count = np.zeros((n, n))
+        self.sums = np.zeros((n, n))
+        self.cross = np.zeros((n, n))
+
+    def add(self, rows: np.ndarray, sign: float = 1.0) -> None:
+        if len(rows) == 0:
+            return
+        mask = (~np.isnan(rows)).astype(np.float64)
+        x = np.nan_to_num(rows)
+        self.count += sign * (mask.T @ mask)
+        self.sums += sign * (x.T @ mask)
+        self.cross += sign * (x.T @ x)
+
+    def covariance(self, min_periods: int) -> np.ndarray:
+        n = self.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (self.cross - self.sums * self.sums.T / n) / (n - 1)
+        cov[n < max(min_periods, 2)] = np.nan
+        return cov
+
+
+class PortfolioRisk:
+    """Risk analytics for a universe of symbols over a rolling window.
+
+    Args:
+        symbols: Universe, e.g. ["AAPL.US", "MSFT.US"]
+        benchmark: Symbol beta is measured against (added to the fetch)
+        window: Return rows in the covariance/VaR window (252 = 1 year)
+        history_days: Calendar days fetched on the first refresh
+        min_periods: Fewest joint observations for a covariance entry
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        benchmark: str = "SPY.US",
+        window: int = 252,
+        history_days: int = 730,
+        min_periods: int = 20,
+    ):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.benchmark = benchmark
+        self.window = window
+        self.history_days = history_days
+        self.min_periods = min_periods
+
+        self._columns = self.symbols + ([benchmark] if benchmark not in self.symbols else [])
+        self.dates = np.array([], dtype="datetime64[D]")
+        self.prices = np.empty((0, len(self._columns)))
+        self.returns = np.empty((0, len(self._columns)))
+        self._moments = _WindowMoments(len(self._columns))
+        self._window_start = 0
+        self._updates = 0
+        self._cov: Optional[np.ndarray] = None
+
+    # ---- Data ----
+
+    def refresh(self, data_manager=None, end: Optional[date] = None) -> int:
+        """Fetch days since the last one held (or the initial history).
+
+        The last held day is fetched again, since its close may have been
+        revised. Returns the number of new days.
+        """
+        if data_manager is None:
+            from investment_tool.data.manager import get_data_manager
+            data_manager = get_data_manager()
+
+        end = end or date.today()
+        if len(self.dates):
+            start = self.dates[-1].item()
+        else:
+            start = end - timedelta(days=self.history_days)
+
+        frame = data_manager.get_batch_daily_closes(self._columns, start, end)
+        if frame.empty:
+            logger.warning(f"Portfolio risk: no closes for {len(self._columns)} symbols since {start}")
+            return 0
+        missing = [s for s in self._columns if s not in frame.columns]
+        if missing and not len(self.dates):
+            logger.warning(f"Portfolio risk: no stored history for {len(missing)} symbols: {missing[:10]}")
+        return self.update(frame)
+
+    def update(self, frame: pd.DataFrame) -> int:
+        """Merge a (date x symbol) frame of closes; returns the number of new days.
+
+        Held rows from the frame's first date on are replaced by the frame,
+        and only the return rows that depend on them are recomputed.
+        """
+        frame = frame.reindex(columns=self._columns)
+        new_dates = pd.DatetimeIndex(frame.index).values.astype("datetime64[D]")
+        order = np.argsort(new_dates, kind="stable")
+        new_dates = new_dates[order]
+        new_prices = frame.to_numpy(dtype=np.float64)[order]
+        if len(new_dates) == 0:
+            return 0
+
+        keep = int(np.searchsorted(self.dates, new_dates[0], side="left"))
+        added = len(new_dates) - (len(self.dates) - keep)
+        old_returns = self.returns
+
+        self.dates = np.concatenate((self.dates[:keep], new_dates))
+        self.prices = np.vstack((self.prices[:keep], new_prices))
+        # Return rows from keep - 1 on depend on replaced prices
+        first_changed = max(keep - 1, 0)
+        self.returns = np.vstack((old_returns[:first_changed], _returns(self.prices[first_changed:])))
+
+        self._advance_window(old_returns, first_changed)
+        self._cov = None
+        return max(added, 0)
+
+    def _advance_window(self, old_returns: np.ndarray, first_changed: int) -> None:
+        """Bring the running sums in line with the window over self.returns."""
+        old_start, old_end = self._window_start, len(old_returns)
+        new_end = len(self.returns)
+        new_start = max(new_end - self.window, 0)
+        self._window_start = new_start
+
+        # Rows that left the window or were replaced, and rows that entered
+        # or replace them (first_changed <= old_end: only a tail is replaced).
+        # Beyond a window's worth of rows a full pass is cheaper.
+        drop = old_returns[old_start:min(new_start, old_end)]
+        stale = old_returns[max(first_changed, new_start, old_start):old_end]
+        fresh = self.returns[max(first_changed, new_start):new_end]
+
+        self._updates += 1
+        if (
+            new_start < old_start
+            or len(drop) + len(stale) + len(fresh) >= self.window
+            or self._updates >= _RESYNC_UPDATES
+        ):
+            self._moments = _WindowMoments(self.returns.shape[1])
+            self._moments.add(self.returns[new_start:new_end])
+            self._updates = 0
+            return
+
+        self._moments.add(drop, -1.0)
+        self._moments.add(stale, -1.0)
+        self._moments.add(fresh)
+
+    @property
+    def window_returns(self) -> np.ndarray:
+        """Return rows in the current window (rows x symbols + benchmark)."""
+        return self.returns[self._window_start:]
+
+    def _column(self, symbol: str) -> int:
+        return self._columns.index(symbol)
+
+    # ---- Analytics ----
+
+    def covariance(self) -> pd.DataFrame:
+        """Pairwise-complete covariance of daily returns over the window."""
+        cov = self._covariance()
+        return pd.DataFrame(cov, index=self._columns, columns=self._columns)
+
+    def _covariance(self) -> np.ndarray:
+        if self._cov is None:
+            self._cov = self._moments.covariance(self.min_periods)
+        return self._cov
+
+    def correlation(self) -> pd.DataFrame:
+        cov = self._covariance()
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.outer(std, std)
+        return pd.DataFrame(corr, index=self._columns, columns=self._columns)
+
+    def beta(self) -> pd.Series:
+        """Beta of each symbol to the benchmark over the window."""
+        cov = self._covariance()
+        b = self._column(self.benchmark)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            beta = cov[:, b] / cov[b, b]
+        return pd.Series(beta[:len(self.symbols)], index=self.symbols)
+
+    def rolling_beta(self, window: Optional[int] = None) -> pd.DataFrame:
+        """Beta to the benchmark over a trailing window ending on each day."""
+        window = window or self.window
+        x = self.returns[:, :len(self.symbols)]
+        y = self.returns[:, self._column(self.benchmark)][:, None]
+        joint = ~np.isnan(x) & ~np.isnan(y)
+        x0 = np.where(joint, x, 0.0)
+        y0 = np.where(joint, y, 0.0)
+
+        def trailing(values: np.ndarray) -> np.ndarray:
+            csum = np.cumsum(values, axis=0)
+            csum[window:] = csum[window:] - csum[:-window]
+            return csum
+
+        n = trailing(joint.astype(np.float64))
+        sx, sy = trailing(x0), trailing(y0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = trailing(x0 * y0) - sx * sy / n
+            var = trailing(y0 * y0) - sy * sy / n
+            beta = np.where(n >= max(self.min_periods, 2), cov / var, np.nan)
+        return pd.DataFrame(beta, index=pd.DatetimeIndex(self.dates[1:]), columns=self.symbols)
+
+    def _weights(self, weights: Optional[Dict[str, float]]) -> np.ndarray:
+        w = np.zeros(len(self._columns))
+        if weights is None:
+            w[:len(self.symbols)] = 1.0 / max(len(self.symbols), 1)
+        else:
+            for symbol, weight in weights.items():
+                w[self._column(symbol)] = weight
+        return w
+
+    def portfolio_returns(self, weights: Optional[Dict[str, float]] = None) -> pd.Series:
+        """Daily portfolio returns (missing returns count as zero)."""
+        returns = np.nan_to_num(self.returns) @ self._weights(weights)
+        return pd.Series(returns, index=pd.DatetimeIndex(self.dates[1:]))
+
+    def value_at_risk(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        confidence: float = 0.95,
+        method: str = "historical",
+    ) -> float:
+        """One-day portfolio VaR over the window, as a positive loss fraction.
+
+        Args:
+            weights: {symbol: weight}; equal weights across symbols if None
+            confidence: e.g. 0.95 or 0.99
+            method: "historical" (empirical quantile) or "parametric" (normal)
+        """
+        w = self._weights(weights)
+        window = self.window_returns
+        if len(window) == 0:
+            return float("nan")
+        if method == "historical":
+            return float(-np.quantile(np.nan_to_num(window) @ w, 1.0 - confidence))
+        if method == "parametric":
+            cov = np.nan_to_num(self._covariance())
+            mean = np.nan_to_num(np.nanmean(window, axis=0)) @ w
+            sigma = np.sqrt(max(w @ cov @ w, 0.0))
+            return float(-(mean + NormalDist().inv_cdf(1.0 - confidence) * sigma))
+        raise ValueError(f"Unknown VaR method: {method}")
+
+    def asset_value_at_risk(self, confidence: float = 0.95) -> pd.DataFrame:
+        """Historical and parametric one-day VaR of each symbol."""
+        window = self.window_returns[:, :len(self.symbols)]
+        z = NormalDist().inv_cdf(1.0 - confidence)
+        # Symbols without returns in the window get NaN
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            historical = -np.nanquantile(window, 1.0 - confidence, axis=0) if len(window) else np.nan
+            parametric = -(np.nanmean(window, axis=0) + z * np.nanstd(window, axis=0, ddof=1))
+        return pd.DataFrame(
+            {"var_historical": historical, "var_parametric": parametric}, index=self.symbols
+        )
+
+    def drawdowns(self) -> pd.DataFrame:
+        """Current and maximum drawdown of each symbol over the held history."""
+        prices = self.prices[:, :len(self.symbols)]
+        # Carry the last close over gaps; leading NaNs stay NaN
+        valid = ~np.isnan(prices)
+        rows = np.where(valid, np.arange(len(prices))[:, None], 0)
+        np.maximum.accumulate(rows, axis=0, out=rows)
+        filled = np.take_along_axis(prices, rows, axis=0)
+        peak = np.fmax.accumulate(filled, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            drawdown = 1.0 - filled / peak
+        current = drawdown[-1] if len(drawdown) else np.full(len(self.symbols), np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            worst = np.nanmax(drawdown, axis=0) if len(drawdown) else current
+        return pd.DataFrame({"current_drawdown": current, "max_drawdown": worst}, index=self.symbols)
+
+    def summary(self, confidence: float = 0.95) -> pd.DataFrame:
+        """One row per symbol: volatility, beta, VaR and drawdowns."""
+        cov = self._covariance()
+        volatility = np.sqrt(np.diag(cov)[:len(self.symbols)] * 252.0)
+        return pd.concat(
+            [
+                pd.DataFrame({"volatility": volatility, "beta": self.beta()}, index=self.symbols),
+                self.asset_value_at_risk(confidence),
+                self.drawdowns(),
+            ],
+            axis=1,
+        )
+
+
+def _returns(prices: np.ndarray) -> np.ndarray:
+    """Simple returns between consecutive rows (NaN where either close is missing)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return prices[1:] / prices[:-1] - 1.0
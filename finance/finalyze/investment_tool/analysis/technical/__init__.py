@@ -0,0 +1,30 @@
+"""Technical analysis module."""
+
+from investment_tool.analysis.technical.indicators import (
+    atr,
+    bollinger_bands,
+    ema,
+    ewm_mean,
+    macd,
+    rolling_std,
+    rsi,
+    sma,
+    true_range,
+    vwap,
+)
+from investment_tool.analysis.technical.cache import IndicatorCache, get_indicator_cache
+
+__all__ = [
+    "atr",
+    "bollinger_bands",
+    "ema",
+    "ewm_mean",
+    "macd",
+    "rolling_std",
+    "rsi",
+    "sma",
+    "true_range",
+    "vwap",
+    "IndicatorCache",
+    "get_indicator_cache",
+]
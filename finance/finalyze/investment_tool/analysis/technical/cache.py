@@ -0,0 +1,192 @@
+"""Memoized indicator results with O(1) updates for appended bars.
+
+IndicatorCache keys results by (key, indicator, params), where the key is
+chosen by the caller, typically ("AAPL.US", "1Y"). When it is asked again
+for the same key with data that extends the cached series (the same first
+bar and the same last-but-one bar, possibly a changed last bar and new
+bars after it), it updates the cached result with the incremental
+indicator instead of recomputing the whole series. Any other change
+triggers a full vectorized recompute.
+"""
+
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from investment_tool.analysis.technical.incremental import (
+    IncrementalATR,
+    IncrementalBollinger,
+    IncrementalEMA,
+    IncrementalMACD,
+    IncrementalRSI,
+    IncrementalSMA,
+    IncrementalVWAP,
+)
+
+INDICATORS = {
+    "sma": IncrementalSMA,
+    "ema": IncrementalEMA,
+    "bollinger": IncrementalBollinger,
+    "macd": IncrementalMACD,
+    "rsi": IncrementalRSI,
+    "atr": IncrementalATR,
+    "vwap": IncrementalVWAP,
+}
+
+Result = Union[np.ndarray, Tuple[np.ndarray, ...]]
+
+
+def _same(a: Tuple[float, ...], b: Tuple[float, ...]) -> bool:
+    return all(x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b))
+
+
+@dataclass
+class _Entry:
+    indicator: Any
+    length: int
+    first: Tuple[float, ...]
+    committed: Tuple[float, ...]  # Inputs of the last-but-one bar
+    last: Tuple[float, ...]
+    outputs: List[np.ndarray]  # Buffers with spare capacity; valid up to length
+
+
+class IndicatorCache:
+    """LRU cache of indicator results, extended incrementally on new bars."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.extends = 0
+        self.recomputes = 0
+
+    def get(
+        self,
+        key: Hashable,
+        name: str,
+        data: Any,
+        **params: Any,
+    ) -> Result:
+        """Indicator `name` over `data` (DataFrame or mapping of input columns).
+
+        Returns one array, or a tuple of arrays for multi-output indicators
+        (bollinger: middle/upper/lower, macd: line/signal/histogram).
+        """
+        cls = INDICATORS[name]
+        arrays = [np.asarray(data[col], dtype=np.float64) for col in cls.inputs]
+        n = len(arrays[0])
+        entry_key = (key, name, tuple(sorted(params.items())))
+
+        entry = self._entries.get(entry_key)
+        if entry is not None and self._extend(entry, arrays, n):
+            self._entries.move_to_end(entry_key)
+        else:
+            entry = self._compute(cls, params, arrays, n)
+            self._entries[entry_key] = entry
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        results = tuple(buf[:n].copy() for buf in entry.outputs)
+        return results[0] if len(results) == 1 else results
+
+    def _compute(self, cls, params: Dict[str, Any], arrays: List[np.ndarray], n: int) -> _Entry:
+        self.recomputes += 1
+        indicator = cls(**params)
+        outputs = indicator.seed(*arrays)
+        capacity = n + max(64, n // 8)
+        buffers = []
+        for out in outputs:
+            buf = np.full(capacity, np.nan)
+            buf[:n] = out
+            buffers.append(buf)
+        return _Entry(
+            indicator=indicator,
+            length=n,
+            first=self._row(arrays, 0),
+            committed=self._row(arrays, n - 2),
+            last=self._row(arrays, n - 1),
+            outputs=buffers,
+        )
+
+    @staticmethod
+    def _row(arrays: List[np.ndarray], i: int) -> Tuple[float, ...]:
+        if i < 0 or i >= len(arrays[0]):
+            return ()
+        return tuple(float(a[i]) for a in arrays)
+
+    def _extend(self, entry: _Entry, arrays: List[np.ndarray], n: int) -> bool:
+        """Bring entry up to date with arrays if they extend it; False if not."""
+        start = entry.length - 1
+        if entry.length < 2 or n < entry.length:
+            return False
+        if not (_same(self._row(arrays, 0), entry.first)
+                and _same(self._row(arrays, entry.length - 2), entry.committed)):
+            return False
+        # Incremental states only take finite values
+        if not all(np.isfinite(v) for v in entry.committed + entry.last):
+            return False
+        if not all(np.isfinite(a[start:]).all() for a in arrays):
+            return False
+
+        last = self._row(arrays, start)
+        if n == entry.length and last == entry.last:
+            self.hits += 1
+            return True
+
+        self.extends += 1
+        self._reserve(entry, n)
+        if last != entry.last:
+            self._store(entry, start, entry.indicator.update_last(*last))
+        for i in range(entry.length, n):
+            self._store(entry, i, entry.indicator.append(*self._row(arrays, i)))
+
+        entry.length = n
+        entry.committed = self._row(arrays, n - 2)
+        entry.last = self._row(arrays, n - 1)
+        return True
+
+    @staticmethod
+    def _reserve(entry: _Entry, n: int) -> None:
+        if n <= len(entry.outputs[0]):
+            return
+        capacity = max(n, 2 * len(entry.outputs[0]))
+        for i, buf in enumerate(entry.outputs):
+            grown = np.full(capacity, np.nan)
+            grown[:entry.length] = buf[:entry.length]
+            entry.outputs[i] = grown
+
+    @staticmethod
+    def _store(entry: _Entry, i: int, values: Tuple[float, ...]) -> None:
+        for buf, value in zip(entry.outputs, values):
+            buf[i] = value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop cached results for one key (or everything)."""
+        if key is None:
+            self._entries.clear()
+            return
+        for entry_key in [k for k in self._entries if k[0] == key]:
+            del self._entries[entry_key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "extends": self.extends,
+            "recomputes": self.recomputes,
+        }
+
+
+_indicator_cache: Optional[IndicatorCache] = None
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Get the global indicator cache instance."""
+    global _indicator_cache
+    if _indicator_cache is None:
+        _indicator_cache = IndicatorCache()
+    return _indicator_cache
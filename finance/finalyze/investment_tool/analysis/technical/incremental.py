@@ -0,0 +1,325 @@
+"""Incrementally updatable indicators.
+
+Each class is seeded once from a full history with the vectorized
+functions in indicators.py, then kept current bar by bar:
+
+    append(*values)       a new bar was added             O(1)
+    update_last(*values)  the last bar changed (live bar) O(1)
+
+Both return the indicator's outputs for that bar as a tuple, in the same
+order as seed() returns its arrays. Inputs given to append/update_last
+must be finite; IndicatorCache falls back to a full recompute otherwise.
+"""
+
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+from investment_tool.analysis.technical.indicators import (
+    ewm_mean,
+    rolling_std,
+    rsi_from_averages,
+    sma,
+    true_range,
+    vwap,
+)
+
+_NAN = float("nan")
+
+# Running window sums are recomputed from the window this often to stop
+# floating-point drift from accumulating.
+_RESUM_INTERVAL = 4096
+
+
+class _EWMState:
+    """Exponentially weighted mean (adjust=False) of finite inputs."""
+
+    def __init__(self, alpha: float, min_periods: int = 0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.prev: Optional[float] = None  # Mean before the last input
+        self.last: Optional[float] = None
+        self.count = 0
+
+    def seed(self, x: np.ndarray) -> np.ndarray:
+        out = ewm_mean(x, self.alpha)
+        valid = out[~np.isnan(out)]
+        self.count = len(valid)
+        self.last = float(valid[-1]) if self.count else None
+        self.prev = float(valid[-2]) if self.count > 1 else None
+        if self.min_periods > 1:
+            out[np.flatnonzero(~np.isnan(out))[:self.min_periods - 1]] = np.nan
+        return out
+
+    def _value(self) -> float:
+        if self.last is None or self.count < self.min_periods:
+            return _NAN
+        return self.last
+
+    def append(self, x: float) -> float:
+        self.prev = self.last
+        self.count += 1
+        return self.update_last(x)
+
+    def update_last(self, x: float) -> float:
+        self.last = x if self.prev is None else self.prev + self.alpha * (x - self.prev)
+        return self._value()
+
+
+class _WindowState:
+    """Sum and sum of squares over the last `period` inputs (NaNs counted)."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window: deque = deque(maxlen=period)
+        self.ref = 0.0  # Offset subtracted before summing, for precision
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nans = 0
+        self._appends = 0
+
+    def seed(self, x: np.ndarray) -> None:
+        tail = x[-self.period:]
+        finite = tail[~np.isnan(tail)]
+        self.ref = float(finite[0]) if len(finite) else 0.0
+        self.window = deque(tail.tolist(), maxlen=self.period)
+        self._resum()
+
+    def _resum(self) -> None:
+        values = np.array(self.window, dtype=np.float64)
+        finite = values[~np.isnan(values)] - self.ref
+        self.total = float(finite.sum())
+        self.total_sq = float((finite * finite).sum())
+        self.nans = len(values) - len(finite)
+
+    def _add(self, x: float, sign: float) -> None:
+        if x != x:  # NaN
+            self.nans += 1 if sign > 0 else -1
+        else:
+            d = x - self.ref
+            self.total += sign * d
+            self.total_sq += sign * d * d
+
+    def append(self, x: float) -> None:
+        if len(self.window) == self.period:
+            self._add(self.window[0], -1.0)
+        self.window.append(x)
+        self._add(x, 1.0)
+        self._appends += 1
+        if self._appends % _RESUM_INTERVAL == 0:
+            self._resum()
+
+    def update_last(self, x: float) -> None:
+        self._add(self.window[-1], -1.0)
+        self.window[-1] = x
+        self._add(x, 1.0)
+
+    @property
+    def full(self) -> bool:
+        return len(self.window) == self.period and self.nans == 0
+
+    def mean(self) -> float:
+        return self.ref + self.total / self.period if self.full else _NAN
+
+    def std(self, ddof: int = 1) -> float:
+        if not self.full or self.period <= ddof:
+            return _NAN
+        var = (self.total_sq - self.total * self.total / self.period) / (self.period - ddof)
+        return float(np.sqrt(max(var, 0.0)))
+
+
+class IncrementalSMA:
+    inputs = ("close",)
+
+    def __init__(self, period: int):
+        self._window = _WindowState(period)
+
+    def seed(self, close: np.ndarray) -> Tuple[np.ndarray]:
+        self._window.seed(close)
+        return (sma(close, self._window.period),)
+
+    def append(self, close: float) -> Tuple[float]:
+        self._window.append(close)
+        return (self._window.mean(),)
+
+    def update_last(self, close: float) -> Tuple[float]:
+        self._window.update_last(close)
+        return (self._window.mean(),)
+
+
+class IncrementalEMA:
+    inputs = ("close",)
+
+    def __init__(self, period: int):
+        self._ewm = _EWMState(2.0 / (period + 1.0))
+
+    def seed(self, close: np.ndarray) -> Tuple[np.ndarray]:
+        return (self._ewm.seed(close),)
+
+    def append(self, close: float) -> Tuple[float]:
+        return (self._ewm.append(close),)
+
+    def update_last(self, close: float) -> Tuple[float]:
+        return (self._ewm.update_last(close),)
+
+
+class IncrementalBollinger:
+    """Outputs (middle, upper, lower)."""
+
+    inputs = ("close",)
+
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        self.num_std = num_std
+        self._window = _WindowState(period)
+
+    def seed(self, close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self._window.seed(close)
+        middle = sma(close, self._window.period)
+        width = self.num_std * rolling_std(close, self._window.period)
+        return middle, middle + width, middle - width
+
+    def _bands(self) -> Tuple[float, float, float]:
+        middle = self._window.mean()
+        width = self.num_std * self._window.std()
+        return middle, middle + width, middle - width
+
+    def append(self, close: float) -> Tuple[float, float, float]:
+        self._window.append(close)
+        return self._bands()
+
+    def update_last(self, close: float) -> Tuple[float, float, float]:
+        self._window.update_last(close)
+        return self._bands()
+
+
+class IncrementalMACD:
+    """Outputs (macd line, signal line, histogram)."""
+
+    inputs = ("close",)
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._fast = _EWMState(2.0 / (fast + 1.0))
+        self._slow = _EWMState(2.0 / (slow + 1.0))
+        self._signal = _EWMState(2.0 / (signal + 1.0))
+
+    def seed(self, close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        line = self._fast.seed(close) - self._slow.seed(close)
+        signal = self._signal.seed(line)
+        return line, signal, line - signal
+
+    def append(self, close: float) -> Tuple[float, float, float]:
+        line = self._fast.append(close) - self._slow.append(close)
+        signal = self._signal.append(line)
+        return line, signal, line - signal
+
+    def update_last(self, close: float) -> Tuple[float, float, float]:
+        line = self._fast.update_last(close) - self._slow.update_last(close)
+        signal = self._signal.update_last(line)
+        return line, signal, line - signal
+
+
+class IncrementalRSI:
+    inputs = ("close",)
+
+    def __init__(self, period: int = 14):
+        self._gain = _EWMState(1.0 / period, min_periods=period)
+        self._loss = _EWMState(1.0 / period, min_periods=period)
+        self._prev_close: Optional[float] = None  # Close before the last bar
+        self._last_close: Optional[float] = None
+
+    def seed(self, close: np.ndarray) -> Tuple[np.ndarray]:
+        delta = np.diff(close, prepend=np.nan)
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+        gains[np.isnan(delta)] = np.nan
+        losses[np.isnan(delta)] = np.nan
+        out = rsi_from_averages(self._gain.seed(gains), self._loss.seed(losses))
+        self._last_close = float(close[-1]) if len(close) else None
+        self._prev_close = float(close[-2]) if len(close) > 1 else None
+        return (out,)
+
+    def _step(self, close: float, update) -> Tuple[float]:
+        if self._prev_close is None:
+            return (_NAN,)
+        delta = close - self._prev_close
+        gain = update(self._gain, max(delta, 0.0))
+        loss = update(self._loss, max(-delta, 0.0))
+        return (float(rsi_from_averages(np.array([gain]), np.array([loss]))[0]),)
+
+    def append(self, close: float) -> Tuple[float]:
+        self._prev_close = self._last_close
+        self._last_close = close
+        return self._step(close, _EWMState.append)
+
+    def update_last(self, close: float) -> Tuple[float]:
+        self._last_close = close
+        return self._step(close, _EWMState.update_last)
+
+
+class IncrementalATR:
+    inputs = ("high", "low", "close")
+
+    def __init__(self, period: int = 14):
+        self._tr = _EWMState(1.0 / period, min_periods=period)
+        self._prev_close: Optional[float] = None  # Close before the last bar
+        self._last_close: Optional[float] = None
+
+    def seed(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Tuple[np.ndarray]:
+        out = self._tr.seed(true_range(high, low, close))
+        self._last_close = float(close[-1]) if len(close) else None
+        self._prev_close = float(close[-2]) if len(close) > 1 else None
+        return (out,)
+
+    def _true_range(self, high: float, low: float) -> float:
+        if self._prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+
+    def append(self, high: float, low: float, close: float) -> Tuple[float]:
+        self._prev_close = self._last_close
+        self._last_close = close
+        return (self._tr.append(self._true_range(high, low)),)
+
+    def update_last(self, high: float, low: float, close: float) -> Tuple[float]:
+        self._last_close = close
+        return (self._tr.update_last(self._true_range(high, low)),)
+
+
+class IncrementalVWAP:
+    """Cumulative VWAP over the whole series (pass one session of bars)."""
+
+    inputs = ("high", "low", "close", "volume")
+
+    def __init__(self):
+        self._pv = 0.0
+        self._v = 0.0
+        self._last_pv = 0.0  # Contribution of the last bar
+        self._last_v = 0.0
+
+    def seed(self, high, low, close, volume) -> Tuple[np.ndarray]:
+        typical = (high + low + close) / 3.0
+        valid = ~(np.isnan(typical) | np.isnan(volume))
+        self._pv = float(np.sum(typical[valid] * volume[valid]))
+        self._v = float(np.sum(volume[valid]))
+        if len(typical) and valid[-1]:
+            self._last_pv = float(typical[-1] * volume[-1])
+            self._last_v = float(volume[-1])
+        else:
+            self._last_pv = self._last_v = 0.0
+        return (vwap(high, low, close, volume),)
+
+    def _value(self) -> Tuple[float]:
+        return (self._pv / self._v if self._v > 0 else _NAN,)
+
+    def append(self, high: float, low: float, close: float, volume: float) -> Tuple[float]:
+        self._last_pv = (high + low + close) / 3.0 * volume
+        self._last_v = volume
+        self._pv += self._last_pv
+        self._v += self._last_v
+        return self._value()
+
+    def update_last(self, high: float, low: float, close: float, volume: float) -> Tuple[float]:
+        self._pv -= self._last_pv
+        self._v -= self._last_v
+        return self.append(high, low, close, volume)
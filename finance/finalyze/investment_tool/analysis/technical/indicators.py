@@ -0,0 +1,208 @@
+"""Vectorized technical indicators.
+
+All functions take array-likes (NumPy arrays, pandas Series or lists) and
+return float64 NumPy arrays aligned with the input, with NaN where the
+indicator is not defined yet. Results match the pandas formulations the
+chart widgets used before:
+
+    sma             Series.rolling(period).mean()
+    ema             Series.ewm(span=period, adjust=False).mean()
+    rolling_std     Series.rolling(period).std()
+    macd            ema(fast) - ema(slow), signal = ema(macd, signal)
+    rsi / atr       Wilder smoothing, i.e. ewm(alpha=1/period, adjust=False)
+
+Exponential averages skip NaN inputs (pandas ignore_na=True): the output
+is NaN at those positions and the average continues from the last valid
+value.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Largest decimal exponent of the per-block scaling factors in _ewm_filter
+_MAX_BLOCK_EXPONENT = 250.0
+
+
+def _as_float(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _ewm_filter(x: np.ndarray, alpha: float) -> np.ndarray:
+    """y[0] = x[0], y[t] = (1 - alpha) * y[t-1] + alpha * x[t] for NaN-free x.
+
+    The recursion is unrolled in blocks: within a block of length L,
+    y[j] = c^(j+1) * y_prev + alpha * c^j * cumsum(c^-k * x[k]) with
+    c = 1 - alpha. Blocks are sized so c^-L stays far below float64
+    overflow, which keeps the loop at a handful of iterations. A 2-D x
+    (bars x tickers) is filtered column by column along axis 0.
+    """
+    n = len(x)
+    y = np.empty(x.shape, dtype=np.float64)
+    if n == 0:
+        return y
+    c = 1.0 - alpha
+    if c <= 0.0:
+        y[:] = x
+        return y
+
+    block = n if c >= 1.0 else max(1, min(n, int(_MAX_BLOCK_EXPONENT / -np.log10(c))))
+    j = np.arange(block, dtype=np.float64).reshape((-1,) + (1,) * (x.ndim - 1))
+    growth = c ** -j
+    decay = c ** j
+    carry = decay * c
+
+    prev = x[0]
+    for start in range(0, n, block):
+        seg = x[start:start + block]
+        size = len(seg)
+        acc = np.cumsum(seg * growth[:size], axis=0)
+        y[start:start + size] = carry[:size] * prev + alpha * decay[:size] * acc
+        prev = y[start + size - 1]
+    return y
+
+
+def ewm_mean(values, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """Exponentially weighted mean with adjust=False, skipping NaN inputs."""
+    x = _as_float(values)
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return out
+    y = _ewm_filter(x[valid], alpha)
+    if min_periods > 1:
+        y[:min_periods - 1] = np.nan
+    out[valid] = y
+    return out
+
+
+def sma(values, period: int, min_periods: Optional[int] = None) -> np.ndarray:
+    """Simple moving average over `period` values.
+
+    Like pandas rolling().mean(), NaNs are excluded from a window and the
+    result is NaN unless at least `min_periods` (default: period) values
+    are present.
+    """
+    x = _as_float(values)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n == 0 or period < 1:
+        return out
+    min_periods = period if min_periods is None else max(1, min_periods)
+
+    valid = ~np.isnan(x)
+    if not valid.any():
+        return out
+    # Summing offsets from a reference value keeps the prefix sums small
+    ref = x[np.argmax(valid)]
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, x - ref, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+
+    hi = np.arange(1, n + 1)
+    lo = np.maximum(hi - period, 0)
+    total = csum[hi] - csum[lo]
+    count = ccount[hi] - ccount[lo]
+    ok = count >= min_periods
+    out[ok] = ref + total[ok] / count[ok]
+    return out
+
+
+def ema(values, period: int, min_periods: int = 0) -> np.ndarray:
+    """Exponential moving average with span `period` (alpha = 2 / (period + 1))."""
+    return ewm_mean(values, 2.0 / (period + 1.0), min_periods)
+
+
+def rolling_std(values, period: int, ddof: int = 1) -> np.ndarray:
+    """Rolling standard deviation (NaN for windows containing NaN)."""
+    x = _as_float(values)
+    out = np.full(len(x), np.nan)
+    if period <= ddof or len(x) < period:
+        return out
+    out[period - 1:] = sliding_window_view(x, period).std(axis=1, ddof=ddof)
+    return out
+
+
+def bollinger_bands(
+    close, period: int = 20, num_std: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger Bands as (middle, upper, lower)."""
+    middle = sma(close, period)
+    width = num_std * rolling_std(close, period)
+    return middle, middle + width, middle - width
+
+
+def macd(
+    close, fast: int = 12, slow: int = 26, signal: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD as (macd line, signal line, histogram)."""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    """RSI from smoothed gains/losses (100 with no losses, 50 when flat)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    no_loss = avg_loss == 0
+    out[no_loss] = np.where(avg_gain[no_loss] > 0, 100.0, 50.0)
+    return out
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder smoothing."""
+    x = _as_float(close)
+    delta = np.diff(x, prepend=np.nan)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    gains[np.isnan(delta)] = np.nan
+    losses[np.isnan(delta)] = np.nan
+
+    alpha = 1.0 / period
+    return rsi_from_averages(
+        ewm_mean(gains, alpha, min_periods=period),
+        ewm_mean(losses, alpha, min_periods=period),
+    )
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range; the first bar (no previous close) uses high - low."""
+    high = _as_float(high)
+    low = _as_float(low)
+    prev_close = np.roll(_as_float(close), 1)
+    if len(prev_close):
+        prev_close[0] = np.nan
+    # fmax ignores the NaN previous close on the first bar
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Average True Range with Wilder smoothing."""
+    return ewm_mean(true_range(high, low, close), 1.0 / period, min_periods=period)
+
+
+def vwap(high, low, close, volume, sessions=None) -> np.ndarray:
+    """Volume-weighted average of the typical price (high + low + close) / 3.
+
+    Accumulates from the first bar, restarting wherever `sessions` (e.g.
+    the bar dates) changes value. Bars with missing values are skipped.
+    """
+    typical = (_as_float(high) + _as_float(low) + _as_float(close)) / 3.0
+    vol = _as_float(volume)
+    valid = ~(np.isnan(typical) | np.isnan(vol))
+    cum_pv = np.cumsum(np.where(valid, typical * vol, 0.0))
+    cum_v = np.cumsum(np.where(valid, vol, 0.0))
+
+    if sessions is not None and len(cum_v):
+        keys = np.asarray(sessions)
+        new_session = np.concatenate(([True], keys[1:] != keys[:-1]))
+        segment = np.cumsum(new_session) - 1
+        starts = np.flatnonzero(new_session)
+        cum_pv = cum_pv - np.concatenate(([0.0], cum_pv))[starts][segment]
+        cum_v = cum_v - np.concatenate(([0.0], cum_v))[starts][segment]
+
+    out = np.full(len(cum_v), np.nan)
+    has_volume = cum_v > 0
+    out[has_volume] = cum_pv[has_volume] / cum_v[has_volume]
+    return out
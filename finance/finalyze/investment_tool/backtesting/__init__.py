@@ -0,0 +1,22 @@
+"""Backtesting module."""
+
+from investment_tool.backtesting.panel import PricePanel, load_panel
+from investment_tool.backtesting.engine import (
+    PanelBacktest,
+    SharedPanel,
+    evaluate,
+    expand_grid,
+    run_backtest,
+    run_sweep,
+)
+
+__all__ = [
+    "PricePanel",
+    "load_panel",
+    "PanelBacktest",
+    "SharedPanel",
+    "evaluate",
+    "expand_grid",
+    "run_backtest",
+    "run_sweep",
+]
@@ -0,0 +1,154 @@
+"""Dense price panels for vectorized backtests.
+
+A PricePanel holds the bars of many tickers aligned on one time axis as
+(bars x tickers) float64 arrays, so strategies and metrics run as whole-
+array NumPy operations instead of per-ticker loops. Prices are forward
+filled after a ticker's first bar; before it (not yet listed, or outside
+the data range) they are NaN and the ticker takes no position.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+# Budget for PricePanel.memo, per process
+MEMO_BYTES = 256 * 1024 * 1024
+
+
+def ffill(x: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs along axis 0 (leading NaNs stay NaN)."""
+    valid = ~np.isnan(x)
+    index = np.where(valid, np.arange(len(x)).reshape((-1,) + (1,) * (x.ndim - 1)), 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    # Rows before the first valid value pick up row 0, which is NaN there
+    return np.take_along_axis(x, index, axis=0)
+
+
+@dataclass
+class PricePanel:
+    """Bars for many tickers aligned on a common time index."""
+
+    index: np.ndarray  # datetime64 bar times, ascending
+    symbols: List[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    bars_per_year: float = 252.0
+    cache: Dict[tuple, np.ndarray] = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.close.shape
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def memo(self, key: tuple, compute) -> np.ndarray:
+        """Cache a derived (bars x tickers) array, e.g. a moving average.
+
+        Parameter sweeps evaluate many strategies on the same panel, and
+        most of them share indicator inputs (the 50-bar SMA of a 20/50 and
+        a 10/50 crossover). Oldest entries are dropped beyond MEMO_BYTES.
+        """
+        value = self.cache.get(key)
+        if value is None:
+            value = compute()
+            while self.cache and sum(a.nbytes for a in self.cache.values()) + value.nbytes > MEMO_BYTES:
+                self.cache.pop(next(iter(self.cache)))
+            self.cache[key] = value
+        return value
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: Dict[str, pd.DataFrame],
+        bars_per_year: float = 252.0,
+    ) -> "PricePanel":
+        """Align per-ticker OHLCV frames (indexed by bar time) into a panel."""
+        frames = {s: f for s, f in frames.items() if f is not None and not f.empty}
+        symbols = list(frames)
+        if not symbols:
+            empty = np.empty((0, 0))
+            return cls(np.array([], dtype="datetime64[ns]"), [], empty, empty, empty, empty, empty,
+                       bars_per_year)
+
+        index = pd.DatetimeIndex(
+            pd.to_datetime(np.concatenate([f.index.values for f in frames.values()]))
+        ).unique().sort_values()
+
+        arrays = {name: np.full((len(index), len(symbols)), np.nan) for name in FIELDS}
+        for j, symbol in enumerate(symbols):
+            frame = frames[symbol]
+            rows = index.get_indexer(pd.to_datetime(frame.index))
+            for name in FIELDS:
+                if name in frame.columns:
+                    arrays[name][rows, j] = pd.to_numeric(frame[name], errors="coerce").values
+
+        listed = ~np.isnan(ffill(arrays["close"]))
+        for name in ("open", "high", "low", "close"):
+            arrays[name] = ffill(arrays[name])
+        # No trading on filled bars
+        arrays["volume"] = np.where(listed & np.isnan(arrays["volume"]), 0.0, arrays["volume"])
+
+        return cls(index=index.values, symbols=symbols, bars_per_year=bars_per_year, **arrays)
+
+
+def _parse_symbol(symbol: Union[str, Tuple[str, str]]) -> Tuple[str, str]:
+    if isinstance(symbol, tuple):
+        return symbol
+    ticker, _, exchange = symbol.rpartition(".")
+    return (ticker, exchange) if ticker else (symbol, "US")
+
+
+def load_panel(
+    symbols: Sequence[Union[str, Tuple[str, str]]],
+    start: Union[date, datetime],
+    end: Union[date, datetime],
+    interval: str = "d",
+    data_manager=None,
+) -> PricePanel:
+    """Load bars for symbols ("AAPL.US" or (ticker, exchange)) from the data server.
+
+    interval is "d" for daily bars or an intraday interval such as "1m"
+    or "5m". Tickers without data in the range are skipped with a warning.
+    """
+    if data_manager is None:
+        from investment_tool.data.manager import get_data_manager
+        data_manager = get_data_manager()
+
+    frames: Dict[str, pd.DataFrame] = {}
+    for symbol in symbols:
+        ticker, exchange = _parse_symbol(symbol)
+        try:
+            if interval == "d":
+                df = data_manager.get_daily_prices(ticker, exchange, start, end)
+            else:
+                df = data_manager.get_intraday_prices(ticker, exchange, interval, start, end)
+                if df is not None and not df.empty:
+                    df = df.set_index("timestamp")
+        except Exception as e:
+            logger.warning(f"Backtest panel: no data for {ticker}.{exchange}: {e}")
+            continue
+        if df is None or df.empty:
+            logger.warning(f"Backtest panel: no data for {ticker}.{exchange}")
+            continue
+        frames[f"{ticker}.{exchange}"] = df
+
+    bars_per_year = 252.0 if interval == "d" else 252.0 * _bars_per_day(interval)
+    panel = PricePanel.from_frames(frames, bars_per_year=bars_per_year)
+    logger.info(f"Loaded backtest panel: {panel.shape[0]} bars x {panel.shape[1]} tickers")
+    return panel
+
+
+def _bars_per_day(interval: str) -> float:
+    """Regular-session (6.5h) bars per day for an interval like "5m" or "1h"."""
+    minutes = {"m": 1, "h": 60}[interval[-1]] * int(interval[:-1])
+    return 390.0 / minutes
@@ -0,0 +1,17 @@
+"""Backtesting strategies."""
+
+from investment_tool.backtesting.strategies.base_strategies import (
+    STRATEGIES,
+    Momentum,
+    MovingAverageCrossover,
+    RSIStrategy,
+    Strategy,
+)
+
+__all__ = [
+    "STRATEGIES",
+    "Momentum",
+    "MovingAverageCrossover",
+    "RSIStrategy",
+    "Strategy",
+]
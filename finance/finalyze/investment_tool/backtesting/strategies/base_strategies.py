@@ -0,0 +1,146 @@
+"""Vectorized trading strategies.
+
+A strategy turns a PricePanel into target positions: a (bars x tickers)
+array with 1 for long, -1 for short and 0 for flat (fractions allowed),
+decided at the close of each bar and held over the next one. Strategies
+work on whole arrays, so one evaluation covers every ticker and bar.
+
+Panel inputs are NaN only before a ticker's first bar (PricePanel
+forward-fills gaps), which is what the panel helpers below assume.
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+from investment_tool.analysis.technical.indicators import _ewm_filter, rsi_from_averages
+from investment_tool.backtesting.panel import PricePanel, ffill
+
+
+def rolling_mean(x: np.ndarray, period: int) -> np.ndarray:
+    """Rolling mean along axis 0 (NaN until `period` values are available)."""
+    out = np.full(x.shape, np.nan)
+    if period < 1 or len(x) < period:
+        return out
+    csum = np.cumsum(np.nan_to_num(x), axis=0)
+    csum = np.concatenate((np.zeros((1,) + x.shape[1:]), csum))
+    count = np.cumsum(~np.isnan(x), axis=0)
+    count = np.concatenate((np.zeros((1,) + x.shape[1:], dtype=count.dtype), count))
+    full = (count[period:] - count[:-period]) == period
+    out[period - 1:] = np.where(full, (csum[period:] - csum[:-period]) / period, np.nan)
+    return out
+
+
+def ewm_mean(x: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """Column-wise exponentially weighted mean (adjust=False) along axis 0."""
+    if len(x) == 0:
+        return np.full(x.shape, np.nan)
+    valid = ~np.isnan(x)
+    first = valid.argmax(axis=0)
+    # Before its first value a column holds that value, which leaves the
+    # filter's state unchanged; those rows are masked again below.
+    seeded = np.where(valid, x, x[first, np.arange(x.shape[1])])
+    out = _ewm_filter(ffill(seeded), alpha)
+    rows = np.arange(len(x))[:, None]
+    out[rows < first + max(min_periods - 1, 0)] = np.nan
+    out[:, ~valid.any(axis=0)] = np.nan
+    return out
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI for every column of a (bars x tickers) array."""
+    delta = np.diff(close, axis=0, prepend=np.nan)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    gains[np.isnan(delta)] = np.nan
+    losses[np.isnan(delta)] = np.nan
+    alpha = 1.0 / period
+    return rsi_from_averages(
+        ewm_mean(gains, alpha, min_periods=period),
+        ewm_mean(losses, alpha, min_periods=period),
+    )
+
+
+def hold(entries: np.ndarray, exits: np.ndarray, position: float = 1.0) -> np.ndarray:
+    """Positions that enter on `entries` and stay on until `exits` (bool arrays)."""
+    state = np.where(entries, position, np.where(exits, 0.0, np.nan))
+    return np.nan_to_num(ffill(state))
+
+
+class Strategy:
+    """Base class: subclasses set `name` and implement positions()."""
+
+    name = "strategy"
+
+    def __init__(self, **params: Any):
+        self.params: Dict[str, Any] = params
+
+    def positions(self, panel: PricePanel) -> np.ndarray:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{type(self).__name__}({args})"
+
+
+class MovingAverageCrossover(Strategy):
+    """Long while the fast SMA is above the slow SMA (short below if allowed)."""
+
+    name = "ma_crossover"
+
+    def __init__(self, fast: int = 20, slow: int = 50, allow_short: bool = False):
+        super().__init__(fast=fast, slow=slow, allow_short=allow_short)
+        self.fast = fast
+        self.slow = slow
+        self.allow_short = allow_short
+
+    def positions(self, panel: PricePanel) -> np.ndarray:
+        fast = panel.memo(("sma", self.fast), lambda: rolling_mean(panel.close, self.fast))
+        slow = panel.memo(("sma", self.slow), lambda: rolling_mean(panel.close, self.slow))
+        with np.errstate(invalid="ignore"):
+            above = fast > slow
+            below = fast < slow
+        out = above.astype(np.float64)
+        if self.allow_short:
+            out -= below
+        return out
+
+
+class RSIStrategy(Strategy):
+    """Mean reversion: buy when RSI drops below `oversold`, sell above `overbought`."""
+
+    name = "rsi"
+
+    def __init__(self, period: int = 14, oversold: float = 30.0, overbought: float = 70.0):
+        super().__init__(period=period, oversold=oversold, overbought=overbought)
+        self.period = period
+        self.oversold = oversold
+        self.overbought = overbought
+
+    def positions(self, panel: PricePanel) -> np.ndarray:
+        values = panel.memo(("rsi", self.period), lambda: rsi(panel.close, self.period))
+        with np.errstate(invalid="ignore"):
+            return hold(values < self.oversold, values > self.overbought)
+
+
+class Momentum(Strategy):
+    """Long while the trailing `lookback`-bar return exceeds `threshold`."""
+
+    name = "momentum"
+
+    def __init__(self, lookback: int = 126, threshold: float = 0.0):
+        super().__init__(lookback=lookback, threshold=threshold)
+        self.lookback = lookback
+        self.threshold = threshold
+
+    def positions(self, panel: PricePanel) -> np.ndarray:
+        close = panel.close
+        trailing = np.full(close.shape, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            trailing[self.lookback:] = close[self.lookback:] / close[:-self.lookback] - 1.0
+            return (trailing > self.threshold).astype(np.float64)
+
+
+STRATEGIES = {
+    cls.name: cls for cls in (MovingAverageCrossover, RSIStrategy, Momentum)
+}
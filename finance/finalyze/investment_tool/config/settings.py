@@ -22,6 +22,9 @@ class DataConfig(BaseModel):
     """Data storage configuration."""
     # Local user data directory (watchlists, settings - NOT market data cache)
     user_data_dir: Path = Field(default=Path.home() / ".investment_tool" / "data")
+    # On-disk copy of data server responses (under user_data_dir/cache)
+    # for instant startup and offline use; 0 disables it
+    client_cache_mb: int = Field(default=1024)
     auto_refresh_interval_minutes: int = Field(default=15)
 
 
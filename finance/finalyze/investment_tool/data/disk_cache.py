@@ -0,0 +1,249 @@
+"""On-disk cache of data server responses for instant startup and offline use.
+
+Responses are stored under <user_data_dir>/cache, one directory per ticker:
+Arrow bodies (bars) as Arrow IPC files that are memory-mapped on read, JSON
+bodies (fundamentals, shares history, batch results) as JSON files. An
+index records each entry's ETag and fetched_at time so the provider can
+revalidate with If-None-Match instead of downloading unchanged data, or
+skip the request altogether while serving a startup paint.
+
+The data server remains the source of truth; entries are evicted least
+recently used once the cache grows past its byte budget.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow bodies are not cached
+    pa = None
+
+# Minimum seconds between index writes (the index is also saved on exit)
+_INDEX_SAVE_INTERVAL = 5.0
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+@dataclass
+class CacheEntry:
+    """Index record of one cached response."""
+
+    file: str  # Relative to the cache root
+    kind: str  # "arrow" or "json"
+    etag: Optional[str]
+    fetched_at: float  # Last time the server confirmed or sent this body
+    used_at: float
+    size: int
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class DiskCache:
+    """Response cache on disk, keyed by request (endpoint and parameters)."""
+
+    def __init__(self, root: Path, max_bytes: int = 1024 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index_file = root / "index.json"
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CacheEntry] = {}
+        self._dirty = False
+        self._saved_at = 0.0
+        self._flush_pending = False  # A flush timer is scheduled
+        self._write_lock = threading.Lock()  # Orders index writes
+        self.hits = 0
+        self.revalidated = 0
+        self.stores = 0
+        self._load_index()
+        atexit.register(self.flush)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load_index(self) -> None:
+        if not self._index_file.exists():
+            return
+        try:
+            raw = json.loads(self._index_file.read_text())
+            self._entries = {key: CacheEntry(**value) for key, value in raw.items()}
+        except Exception as e:
+            logger.warning(f"Discarding unreadable client cache index: {e}")
+            self._entries = {}
+            self._purge()
+
+    def _purge(self) -> None:
+        """Delete every file under the cache root.
+
+        File names are hashes of request keys, so the index cannot be
+        rebuilt from them; without an index they would never be evicted.
+        """
+        for path in self.root.iterdir():
+            try:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+            except OSError as e:
+                logger.warning(f"Failed to remove {path} from client cache: {e}")
+
+    def flush(self) -> None:
+        """Write the index if it changed."""
+        # Snapshot and write under one lock, so a later snapshot is never
+        # overwritten by an earlier one
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = {key: asdict(entry) for key, entry in self._entries.items()}
+                self._dirty = False
+                self._saved_at = time.monotonic()
+            tmp = self._index_file.with_name(f"index.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                tmp.write_text(json.dumps(data))
+                os.replace(tmp, self._index_file)
+            except OSError as e:
+                logger.warning(f"Failed to save client cache index: {e}")
+
+    def _scheduled_flush(self) -> None:
+        with self._lock:
+            self._flush_pending = False
+        self.flush()
+
+    def _changed(self) -> None:
+        """Mark the index dirty (caller holds the lock).
+
+        At most one flush is scheduled at a time, no sooner than
+        _INDEX_SAVE_INTERVAL after the last write.
+        """
+        self._dirty = True
+        if self._flush_pending:
+            return
+        self._flush_pending = True
+        delay = max(0.0, self._saved_at + _INDEX_SAVE_INTERVAL - time.monotonic())
+        timer = threading.Timer(delay, self._scheduled_flush)
+        timer.daemon = True
+        timer.start()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Index entry for key, if its file is still present."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not (self.root / entry.file).exists():
+            with self._lock:
+                self._entries.pop(key, None)
+                self._changed()
+            return None
+        return entry
+
+    def load(self, entry: CacheEntry) -> Any:
+        """Cached body: a DataFrame for Arrow entries, parsed JSON otherwise."""
+        path = self.root / entry.file
+        entry.used_at = time.time()
+        self.hits += 1
+        if entry.kind == "arrow":
+            # Numeric columns without nulls are wrapped, not copied, from the map
+            table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+            return table.to_pandas(split_blocks=True)
+        return json.loads(path.read_bytes())
+
+    def put(self, key: str, group: str, body: Any, kind: str, etag: Optional[str] = None) -> None:
+        """Store a response body.
+
+        Args:
+            key: Request key
+            group: Directory to store under, typically the ticker symbol
+            body: Arrow IPC stream bytes when kind is "arrow", else a JSON value
+            kind: "arrow" or "json"
+            etag: Server ETag for revalidation, if any
+        """
+        if kind == "arrow" and pa is None:
+            return
+        digest = hashlib.sha1(key.encode()).hexdigest()[:20]
+        relative = f"{_UNSAFE_CHARS.sub('_', group) or '_'}/{digest}.{kind}"
+        path = self.root / relative
+        # Unique per writer: the UI thread and prefetch threads may store the same key
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if kind == "arrow":
+                # Rewritten as an IPC file (not stream) so it can be memory-mapped
+                table = pa.ipc.open_stream(body).read_all()
+                with pa.OSFile(str(tmp), "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+            else:
+                tmp.write_text(json.dumps(body, default=str))
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"Failed to cache {key}: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            self._entries[key] = CacheEntry(
+                file=relative, kind=kind, etag=etag, fetched_at=now, used_at=now, size=path.stat().st_size,
+            )
+            self.stores += 1
+            self._evict()
+            self._changed()
+
+    def touch(self, key: str) -> None:
+        """Record that the server confirmed an entry is unchanged (304)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.fetched_at = entry.used_at = time.time()
+                self.revalidated += 1
+                self._changed()
+
+    def _evict(self) -> None:
+        total = sum(entry.size for entry in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k].used_at):
+            entry = self._entries.pop(key)
+            total -= entry.size
+            try:
+                (self.root / entry.file).unlink()
+            except OSError:
+                pass
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                try:
+                    (self.root / entry.file).unlink()
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._changed()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(entry.size for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "stores": self.stores,
+            }
@@ -0,0 +1,160 @@
+"""Persistent WebSocket subscription to the data server's live prices.
+
+Runs a background thread that keeps one connection to the data server's
+/ws endpoint open, subscribes to the tickers the UI currently shows, and
+switches to the compact binary protocol. Each pushed tick is emitted as
+one prices_updated signal containing only the tickers that changed, in
+the same shape as DataManager.get_all_live_prices() entries. The
+connection is re-established with backoff after errors.
+"""
+
+import json
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+
+from PySide6.QtCore import QObject, Signal
+from loguru import logger
+
+from investment_tool.data.stream_protocol import PriceStreamDecoder
+
+
+def _to_live_price(quote: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a pushed quote to the get_all_live_prices() field names.
+
+    Only fields present in the push are returned, so merging the result
+    into a polled snapshot keeps open/high/low from the snapshot.
+    """
+    result: Dict[str, Any] = {}
+    price = quote.get("price")
+    change = quote.get("change")
+    if price is not None:
+        result["price"] = price
+    if change is not None:
+        result["change"] = change
+        if price is not None:
+            result["previous_close"] = price - change
+    if quote.get("change_percent") is not None:
+        result["change_percent"] = quote["change_percent"]
+    if quote.get("volume") is not None:
+        result["volume"] = quote["volume"]
+    ts = quote.get("timestamp")
+    if ts:
+        try:
+            result["market_timestamp"] = datetime.utcfromtimestamp(int(ts)).isoformat()
+        except (ValueError, TypeError, OSError):
+            pass
+    return result
+
+
+class LivePriceStream(QObject):
+    """Background WebSocket client emitting pushed live price updates."""
+
+    prices_updated = Signal(dict)  # {"TICKER.EXCHANGE": live price dict}
+    connection_changed = Signal(bool)
+
+    RECONNECT_DELAY = 2.0
+    MAX_RECONNECT_DELAY = 60.0
+    RECV_TIMEOUT = 1.0  # Also how often subscription changes are picked up
+
+    def __init__(self, url: str, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.url = url
+        self._tickers: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connected = False
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def start(self) -> None:
+        """Start the background connection (no-op if already running)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="live-price-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the background connection."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def set_tickers(self, tickers: Iterable[str]) -> None:
+        """Replace the subscribed tickers (applied within RECV_TIMEOUT)."""
+        with self._lock:
+            self._tickers = set(tickers)
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected != self._connected:
+            self._connected = connected
+            self.connection_changed.emit(connected)
+
+    def _run(self) -> None:
+        try:
+            from websockets.sync.client import connect
+        except ImportError:
+            logger.warning("websockets not installed; live prices fall back to polling")
+            return
+
+        delay = self.RECONNECT_DELAY
+        while not self._stop.is_set():
+            try:
+                with connect(self.url, open_timeout=5, close_timeout=1) as ws:
+                    logger.info(f"Live price stream connected to {self.url}")
+                    delay = self.RECONNECT_DELAY
+                    self._stream(ws)
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"Live price stream error: {e}")
+            self._set_connected(False)
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    def _stream(self, ws) -> None:
+        """Handle one connection until it closes or stop() is called."""
+        decoder = PriceStreamDecoder()
+        subscribed: Set[str] = set()
+        ws.send(json.dumps({"type": "set_protocol", "protocol": "binary"}))
+        self._set_connected(True)
+
+        while not self._stop.is_set():
+            with self._lock:
+                wanted = set(self._tickers)
+            added = sorted(wanted - subscribed)
+            removed = sorted(subscribed - wanted)
+            if added:
+                ws.send(json.dumps({"type": "subscribe", "tickers": added}))
+            if removed:
+                ws.send(json.dumps({"type": "unsubscribe", "tickers": removed}))
+            subscribed = wanted
+
+            try:
+                message = ws.recv(timeout=self.RECV_TIMEOUT)
+            except TimeoutError:
+                continue
+
+            if isinstance(message, bytes):
+                updates = decoder.decode_frame(message)
+            else:
+                data = json.loads(message)
+                msg_type = data.get("type")
+                if msg_type in ("price_updates", "price_update"):
+                    updates = decoder.decode_json(data)
+                else:
+                    decoder.handle_control(data)
+                    continue
+
+            changed = {
+                symbol: _to_live_price(quote)
+                for symbol, quote in updates.items()
+                if symbol in subscribed
+            }
+            if changed:
+                self.prices_updated.emit(changed)
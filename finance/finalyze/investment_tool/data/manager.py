@@ -1,21 +1,69 @@
 """Data manager that orchestrates data providers.
 
 All caching is handled by the data server. This manager simply
-forwards requests to providers and handles fallback.
+forwards requests to providers and handles fallback. The only client-side
+copy is the provider's disk cache of server responses (see disk_cache),
+which serves the startup paint and offline use.
+
+Independent requests can run concurrently: prefetch() starts calls in
+the background so that the same calls made later (for example by UI code
+that loads a ticker's chart, metrics and tabs one after the other) join
+the request already in flight instead of issuing their own.
 """
 
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 
 import pandas as pd
 from loguru import logger
 
 from investment_tool.config.settings import AppConfig
 from investment_tool.data.models import CompanyInfo, DailySentiment, NewsArticle
+from investment_tool.data.disk_cache import DiskCache
 from investment_tool.data.storage import UserDataStore
 from investment_tool.data.providers.base import DataProviderBase, ProviderError
 from investment_tool.data.providers.eodhd import EODHDProvider
 
+# Seconds a prefetched result stays available to the call it was made for
+PREFETCH_TTL = 30.0
+
+# Concurrent requests issued by prefetch()
+FETCH_WORKERS = 8
+
+
+def _prefetchable(method):
+    """Let a DataManager method return a matching prefetch() result."""
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        future = self._take_prefetched(_call_key(signature, method.__name__, self, args, kwargs))
+        if future is not None:
+            result = future.result()
+            # Callers may modify returned frames/lists in place
+            if isinstance(result, pd.DataFrame):
+                return result.copy()
+            if isinstance(result, list):
+                return list(result)
+            return result
+        return method(self, *args, **kwargs)
+
+    wrapper.signature = signature
+    return wrapper
+
+
+def _call_key(signature: inspect.Signature, name: str, obj: Any, args: tuple, kwargs: dict) -> tuple:
+    bound = signature.bind(obj, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = list(bound.arguments.items())[1:]  # Drop self
+    return (name, tuple(arguments))
+
 
 class DataManager:
     """Orchestrates data providers. Caching is handled by data server."""
@@ -28,6 +76,16 @@ class DataManager:
         # Local storage for user data only (watchlists, etc.)
         self.user_store = UserDataStore(config.data.user_data_dir)
 
+        self.disk_cache: Optional[DiskCache] = None
+        if config.data.client_cache_mb > 0:
+            self.disk_cache = DiskCache(
+                config.data.user_data_dir / "cache", config.data.client_cache_mb * 1024 * 1024,
+            )
+
+        self._executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="data-fetch")
+        self._prefetched: Dict[tuple, Tuple[float, Future]] = {}
+        self._prefetch_lock = threading.Lock()
+
         self._setup_providers()
 
     @property
@@ -51,10 +109,25 @@ class DataManager:
 
     def _setup_providers(self) -> None:
         """Initialize data providers (data server handles authentication)."""
-        self.providers["eodhd"] = EODHDProvider()
+        self.providers["eodhd"] = EODHDProvider(cache=self.disk_cache)
         self.provider_priority.append("eodhd")
         logger.info("EODHD provider initialized (via data server)")
 
+    @contextmanager
+    def cached_first(self):
+        """Serve disk-cached responses without contacting the data server.
+
+        Used for the first paint after startup; data missing from the cache
+        is still fetched. Calls made after the block, and prefetches running
+        meanwhile, revalidate as usual.
+        """
+        eodhd = self.providers.get("eodhd")
+        if not isinstance(eodhd, EODHDProvider) or self.disk_cache is None:
+            yield
+            return
+        with eodhd.serving_cached():
+            yield
+
     def get_provider(self, name: str) -> Optional[DataProviderBase]:
         """Get a specific provider by name."""
         return self.providers.get(name)
@@ -63,6 +136,7 @@ class DataManager:
         """Check if at least one provider is available."""
         return any(p.is_available() for p in self.providers.values())
 
+    @_prefetchable
     def get_daily_prices(
         self,
         ticker: str,
@@ -112,6 +186,7 @@ class DataManager:
             force_eodhd=force_refresh,
         )
 
+    @_prefetchable
     def get_company_info(
         self,
         ticker: str,
@@ -142,6 +217,7 @@ class DataManager:
 
         return None
 
+    @_prefetchable
     def get_news(
         self,
         ticker: str,
@@ -205,6 +281,7 @@ class DataManager:
         aggregator = SentimentAggregator()
         return aggregator.get_sentiment_trend(ticker, articles, days=days)
 
+    @_prefetchable
     def get_fundamentals(
         self,
         ticker: str,
@@ -260,6 +337,7 @@ class DataManager:
                 logger.warning(f"Failed to get live price: {e}")
         return None
 
+    @_prefetchable
     def get_shares_history(
         self,
         ticker: str,
@@ -309,6 +387,39 @@ class DataManager:
                 logger.warning(f"Failed to get batch daily changes: {e}")
         return {}
 
+    def get_batch_daily_closes(
+        self,
+        symbols: List[str],
+        start_date: date,
+        end_date: date,
+    ) -> pd.DataFrame:
+        """
+        Get split-adjusted daily closes for many symbols in a single call.
+
+        Args:
+            symbols: List of symbols like ["AAPL.US", "GOOGL.US"]
+            start_date: First date to include
+            end_date: Last date to include
+
+        Returns:
+            Wide DataFrame indexed by date with one column per symbol found
+            (NaN where a symbol has no bar on a date)
+        """
+        eodhd = self.providers.get("eodhd")
+        if eodhd and isinstance(eodhd, EODHDProvider):
+            try:
+                df = eodhd.get_batch_daily_closes(symbols, start_date, end_date)
+                if not df.empty:
+                    prices = df["adjusted_close"].fillna(df["close"])
+                    return (
+                        df.assign(price=prices)
+                        .pivot(index="date", columns="symbol", values="price")
+                        .sort_index()
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to get batch daily closes: {e}")
+        return pd.DataFrame()
+
     def override_quarterly_financials(
         self,
         ticker: str,
@@ -372,17 +483,7 @@ class DataManager:
         eodhd = self.providers.get("eodhd")
         if eodhd and isinstance(eodhd, EODHDProvider):
             try:
-                import requests as http_requests
-                params = {"from_date": from_date, "to_date": to_date}
-                params = {k: v for k, v in params.items() if v}
-                base = eodhd.BASE_URL.rsplit("/api", 1)[0]
-                resp = http_requests.get(
-                    f"{base}/api/forex/rates/{currency}",
-                    params=params,
-                    timeout=10,
-                )
-                if resp.status_code == 200:
-                    return resp.json().get("rates", {})
+                return eodhd.get_forex_rates(currency, from_date, to_date)
             except Exception as e:
                 logger.warning(f"Failed to get forex rates for {currency}: {e}")
         return {}
@@ -423,6 +524,47 @@ class DataManager:
 
         return None
 
+    def prefetch(self, calls: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Start DataManager calls in the background without waiting.
+
+        The next call to the same method with the same arguments (defaults
+        included) within PREFETCH_TTL returns the prefetched result, waiting
+        for it if the request is still in flight. A prefetch answers that
+        one call only; later calls (e.g. a chart reload) fetch fresh data.
+        Only methods marked prefetchable (daily prices, company info,
+        fundamentals, news, shares history) can be prefetched.
+
+        Args:
+            calls: (method name, kwargs) pairs, e.g.
+                [("get_fundamentals", {"ticker": "AAPL", "exchange": "US"})]
+        """
+        now = time.monotonic()
+        with self._prefetch_lock:
+            for key in [k for k, (t, f) in self._prefetched.items() if now - t > PREFETCH_TTL and f.done()]:
+                del self._prefetched[key]
+
+            for method_name, kwargs in calls:
+                method = getattr(type(self), method_name)
+                if not hasattr(method, "signature"):
+                    raise ValueError(f"{method_name} cannot be prefetched")
+                key = _call_key(method.signature, method_name, self, (), kwargs)
+                entry = self._prefetched.get(key)
+                if entry is not None and (not entry[1].done() or now - entry[0] <= PREFETCH_TTL):
+                    continue
+                future = self._executor.submit(method.__wrapped__, self, **kwargs)
+                self._prefetched[key] = (now, future)
+
+    def _take_prefetched(self, key: tuple) -> Optional[Future]:
+        """Remove and return the prefetch for key, unless it has expired."""
+        with self._prefetch_lock:
+            entry = self._prefetched.pop(key, None)
+            if entry is None:
+                return None
+            created, future = entry
+            if future.done() and time.monotonic() - created > PREFETCH_TTL:
+                return None
+            return future
+
     def _fetch_from_providers(
         self,
         method: str,
@@ -2,18 +2,33 @@
 
 This provider connects to the data server (caching proxy) instead of
 directly to EODHD. The data server handles all caching and rate limiting.
+
+Requests go through one pooled requests.Session, so calls reuse kept-alive
+connections, and the provider is safe to call from several threads at
+once (DataManager issues a ticker's independent requests concurrently).
 """
 
 import calendar
 import hashlib
+import json
 import os
+import threading
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import date, datetime
+from urllib.parse import urlencode
 from typing import Optional, List, Dict, Any, Tuple
 
 import requests
 import pandas as pd
 from loguru import logger
+from requests.adapters import HTTPAdapter
+
+try:
+    import pyarrow as pa
+except ImportError:  # Bars fall back to JSON
+    pa = None
 
 from investment_tool.data.models import CompanyInfo, NewsArticle, SentimentData
 from investment_tool.data.providers.base import (
@@ -24,6 +39,11 @@ from investment_tool.data.providers.base import (
     DataNotFoundError,
 )
 
+# While set, disk-cached responses are returned without a request (see
+# EODHDProvider.serving_cached). A context variable rather than a provider
+# attribute, so prefetch threads running meanwhile still revalidate.
+_serve_cached: ContextVar[bool] = ContextVar("serve_cached", default=False)
+
 
 class EODHDProvider(DataProviderBase):
     """EODHD API data provider via data server proxy.
@@ -39,16 +59,35 @@ class EODHDProvider(DataProviderBase):
             "Set DATA_SERVER_URL=http://localhost:8000 in investment_tool/.env"
         )
     BASE_URL = f"{_data_server_url}/api"
-    RATE_LIMIT_DELAY = 0.1  # Reduced since data server handles rate limiting
+    # WebSocket endpoint for pushed live prices (http -> ws, https -> wss)
+    WS_URL = f"{_data_server_url.replace('http', 'ws', 1)}/ws"
+    # Kept-alive connections to the data server; above the number of
+    # requests DataManager runs concurrently
+    POOL_SIZE = 16
+
+    # GET endpoints whose responses go to the disk cache (see _request)
+    CACHED_ENDPOINTS = ("eod/", "fundamentals/", "shares-history/", "live-prices")
+    # Seconds a cached body of these endpoints is kept before a fresh
+    # response replaces it; live prices change on every poll, and only a
+    # recent snapshot is needed for the startup paint
+    CACHE_REWRITE_AGE = {"live-prices": 300}
 
     # TTL for cached fundamentals/shares data (seconds)
     _CACHE_TTL = 300  # 5 minutes
 
     def __init__(self, api_key: str = "", cache: Optional[Any] = None):
         super().__init__(api_key, cache)
-        self._last_request_time = 0.0
         self.api_call_count = 0
 
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_SIZE)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # One lock per cache key, so concurrent callers share a single fetch
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._key_locks_guard = threading.Lock()
+
         # Session-level caches to avoid redundant API calls
         self._split_cache: Dict[str, List[Dict]] = {}
         self._fundamentals_cache: Dict[str, Tuple[float, Any]] = {}
@@ -58,8 +97,7 @@ class EODHDProvider(DataProviderBase):
 
         # Health check: warn if data server is unreachable
         try:
-            import requests as _req
-            _req.get(f"{self.BASE_URL}/server-status", timeout=3)
+            self._session.get(f"{self.BASE_URL}/server-status", timeout=3)
         except Exception:
             logger.warning(f"Data server at {self.BASE_URL} is not reachable")
 
@@ -67,39 +105,72 @@ class EODHDProvider(DataProviderBase):
         """Always available — data server handles authentication."""
         return True
 
-    def _rate_limit(self) -> None:
-        """Enforce rate limiting between requests."""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self.RATE_LIMIT_DELAY:
-            time.sleep(self.RATE_LIMIT_DELAY - elapsed)
-        self._last_request_time = time.time()
+    @contextmanager
+    def serving_cached(self):
+        """Return disk-cached responses without a request inside the block.
+
+        Applies to calls made from the current context only; used by
+        DataManager.cached_first for the startup paint.
+        """
+        token = _serve_cached.set(True)
+        try:
+            yield
+        finally:
+            _serve_cached.reset(token)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._key_locks_guard:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
 
     def _request(
         self,
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
+        fmt: str = "json",
     ) -> Any:
         """
-        Make API request with rate limiting and error handling.
+        Make API request with error handling.
+
+        With a disk cache, responses of CACHED_ENDPOINTS are stored on disk
+        and revalidated with their ETag, so an unchanged body is not sent
+        again. The stored body is also served inside serving_cached()
+        (startup paint) and when the data server is unreachable.
 
         Args:
             endpoint: API endpoint path
             params: Query parameters
+            fmt: "json", or "arrow" for a DataFrame decoded from an Arrow
+                IPC stream (tabular endpoints only)
 
         Returns:
-            JSON response data
+            JSON response data, or a DataFrame when fmt="arrow"
         """
-        self._rate_limit()
-
         if params is None:
             params = {}
-        params["fmt"] = "json"
+        params["fmt"] = fmt
 
         url = f"{self.BASE_URL}/{endpoint}"
 
+        entry = None
+        cache_key = None
+        if self.cache is not None and endpoint.startswith(self.CACHED_ENDPOINTS):
+            cache_key = f"{endpoint}?{urlencode(sorted(params.items()))}"
+            entry = self.cache.get(cache_key)
+            if entry is not None and _serve_cached.get():
+                return self.cache.load(entry)
+
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else None
+
         try:
             self.api_call_count += 1
-            response = requests.get(url, params=params, timeout=30)
+            response = self._session.get(url, params=params, headers=headers, timeout=30)
+
+            if response.status_code == 304 and entry is not None:
+                self.cache.touch(cache_key)
+                return self.cache.load(entry)
 
             if response.status_code == 401:
                 raise AuthenticationError(self.name)
@@ -115,17 +186,79 @@ class EODHDProvider(DataProviderBase):
                 return None
 
             response.raise_for_status()
-            result = response.json()
-            logger.debug(f"Response from {url}: status={response.status_code}, records={len(result) if isinstance(result, list) else 'N/A'}")
+            if fmt == "arrow":
+                result = self._read_arrow(response.content)
+            else:
+                result = response.json()
+            logger.debug(f"Response from {url}: status={response.status_code}, records={len(result) if isinstance(result, (list, pd.DataFrame)) else 'N/A'}")
+
+            if cache_key is not None and not (
+                entry is not None and entry.age < self.CACHE_REWRITE_AGE.get(endpoint, 0)
+            ):
+                self.cache.put(
+                    cache_key,
+                    endpoint.rsplit("/", 1)[-1] if "/" in endpoint else "_",
+                    response.content if fmt == "arrow" else result,
+                    fmt,
+                    response.headers.get("ETag"),
+                )
             return result
 
         except requests.exceptions.RequestException as e:
+            if entry is not None:
+                logger.warning(f"Data server unreachable, using cached {endpoint}: {e}")
+                return self.cache.load(entry)
             logger.error(f"Data server request failed: {e}")
             raise ProviderError(self.name, str(e))
         except Exception as e:
             logger.error(f"Data server unexpected error: {e}")
             raise ProviderError(self.name, str(e))
 
+    def _post(self, endpoint: str, body: Dict[str, Any], timeout: float) -> Any:
+        """POST a batch request and return its JSON result.
+
+        Batch endpoints have no ETags; with a disk cache the last result for
+        the same body is kept with its fetched_at time and served while
+        inside serving_cached() or when the data server is unreachable.
+        """
+        url = f"{self.BASE_URL}/{endpoint}"
+        cache_key = None
+        entry = None
+        if self.cache is not None:
+            cache_key = f"POST {endpoint} {json.dumps(body, sort_keys=True, default=str)}"
+            entry = self.cache.get(cache_key)
+            if entry is not None and _serve_cached.get():
+                return self.cache.load(entry)
+
+        try:
+            self.api_call_count += 1
+            response = self._session.post(url, json=body, timeout=timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            if entry is not None:
+                logger.warning(f"Data server unreachable, using cached {endpoint} from {entry.age:.0f}s ago")
+                return self.cache.load(entry)
+            raise
+
+        result = response.json()
+        if cache_key is not None:
+            self.cache.put(cache_key, "_batch", result, "json")
+        return result
+
+    @staticmethod
+    def _read_arrow(content: bytes) -> pd.DataFrame:
+        """Decode an Arrow IPC stream body into a DataFrame.
+
+        Numeric columns without nulls are wrapped rather than copied.
+        """
+        table = pa.ipc.open_stream(content).read_all()
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    @property
+    def _bars_format(self) -> str:
+        """Wire format for bar endpoints: Arrow when pyarrow is installed."""
+        return "arrow" if pa is not None else "json"
+
     def format_symbol(self, ticker: str, exchange: str) -> str:
         """Format symbol for EODHD API."""
         return f"{ticker}.{exchange}"
@@ -145,13 +278,14 @@ class EODHDProvider(DataProviderBase):
             params={
                 "from": start.isoformat(),
                 "to": end.isoformat(),
-            }
+            },
+            fmt=self._bars_format,
         )
 
-        if not data:
+        if data is None or len(data) == 0:
             raise DataNotFoundError(self.name, ticker, "daily_prices")
 
-        df = pd.DataFrame(data)
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
 
         if df.empty:
             return df
@@ -204,6 +338,7 @@ class EODHDProvider(DataProviderBase):
             "5m": "5m",
             "15m": "15m",
             "1h": "1h",
+            "1d": "1d",
         }
 
         eodhd_interval = interval_map.get(interval, "5m")
@@ -218,16 +353,17 @@ class EODHDProvider(DataProviderBase):
 
         data = self._request(
             f"intraday/{symbol}",
-            params=params
+            params=params,
+            fmt=self._bars_format,
         )
 
-        logger.debug(f"Intraday response for {symbol}: type={type(data)}, len={len(data) if data else 0}")
+        logger.debug(f"Intraday response for {symbol}: type={type(data)}, len={len(data) if data is not None else 0}")
 
-        if not data:
+        if data is None or len(data) == 0:
             logger.warning(f"No intraday data returned for {symbol}, data={data}")
             raise DataNotFoundError(self.name, ticker, "intraday_prices")
 
-        df = pd.DataFrame(data)
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
 
         if df.empty:
             return df
@@ -252,18 +388,19 @@ class EODHDProvider(DataProviderBase):
     def _get_cached_fundamentals(self, ticker: str, exchange: str) -> Any:
         """Get fundamentals data with TTL cache."""
         key = f"{ticker}.{exchange}"
-        now = time.time()
-        if key in self._fundamentals_cache:
-            cached_time, cached_data = self._fundamentals_cache[key]
-            if now - cached_time < self._CACHE_TTL:
-                logger.debug(f"Fundamentals cache hit for {key}")
-                return cached_data
-
-        symbol = self.format_symbol(ticker, exchange)
-        data = self._request(f"fundamentals/{symbol}")
-        if data is not None:
-            self._fundamentals_cache[key] = (now, data)
-        return data
+        with self._key_lock(f"fundamentals:{key}"):
+            now = time.time()
+            if key in self._fundamentals_cache:
+                cached_time, cached_data = self._fundamentals_cache[key]
+                if now - cached_time < self._CACHE_TTL:
+                    logger.debug(f"Fundamentals cache hit for {key}")
+                    return cached_data
+
+            symbol = self.format_symbol(ticker, exchange)
+            data = self._request(f"fundamentals/{symbol}")
+            if data is not None:
+                self._fundamentals_cache[key] = (now, data)
+            return data
 
     def get_company_info(self, ticker: str, exchange: str) -> CompanyInfo:
         """Fetch company metadata from EODHD or data server."""
@@ -410,10 +547,15 @@ class EODHDProvider(DataProviderBase):
         Returns list of {"date": "YYYY-MM-DD", "ratio": int} (e.g. ratio=10 for 10:1 split).
         """
         key = f"{ticker}.{exchange}"
-        if key in self._split_cache:
-            logger.debug(f"Split cache hit for {key}")
-            return self._split_cache[key]
-
+        with self._key_lock(f"splits:{key}"):
+            if key in self._split_cache:
+                logger.debug(f"Split cache hit for {key}")
+                return self._split_cache[key]
+            splits = self._detect_splits(ticker, exchange)
+            self._split_cache[key] = splits
+            return splits
+
+    def _detect_splits(self, ticker: str, exchange: str) -> List[Dict[str, Any]]:
         symbol = self.format_symbol(ticker, exchange)
 
         # Fetch raw EOD data (data server returns both close and adjusted_close)
@@ -422,7 +564,6 @@ class EODHDProvider(DataProviderBase):
             params={"from": "2000-01-01", "to": date.today().isoformat()},
         )
         if not data or len(data) < 2:
-            self._split_cache[key] = []
             return []
 
         splits = []
@@ -443,28 +584,28 @@ class EODHDProvider(DataProviderBase):
                     })
             prev_ratio = ratio
 
-        self._split_cache[key] = splits
         return splits
 
     def get_shares_history(self, ticker: str, exchange: str) -> Dict[str, Any]:
         """Get shares outstanding history from data server."""
         key = f"{ticker}.{exchange}"
-        now = time.time()
-        if key in self._shares_cache:
-            cached_time, cached_data = self._shares_cache[key]
-            if now - cached_time < self._CACHE_TTL:
-                logger.debug(f"Shares cache hit for {key}")
-                return cached_data
-
-        empty_result = {"ticker": ticker, "shares_history": [], "latest_shares_outstanding": None}
-
-        symbol = self.format_symbol(ticker, exchange)
-        data = self._request(f"shares-history/{symbol}")
-        if not data:
-            self._shares_cache[key] = (now, empty_result)
-            return empty_result
-        self._shares_cache[key] = (now, data)
-        return data
+        with self._key_lock(f"shares:{key}"):
+            now = time.time()
+            if key in self._shares_cache:
+                cached_time, cached_data = self._shares_cache[key]
+                if now - cached_time < self._CACHE_TTL:
+                    logger.debug(f"Shares cache hit for {key}")
+                    return cached_data
+
+            empty_result = {"ticker": ticker, "shares_history": [], "latest_shares_outstanding": None}
+
+            symbol = self.format_symbol(ticker, exchange)
+            data = self._request(f"shares-history/{symbol}")
+            if not data:
+                self._shares_cache[key] = (now, empty_result)
+                return empty_result
+            self._shares_cache[key] = (now, data)
+            return data
 
     def get_batch_daily_changes(
         self,
@@ -488,13 +629,10 @@ class EODHDProvider(DataProviderBase):
         Returns:
             Dict mapping symbol to {"start_price": float, "end_price": float, "change": float}
         """
-        url = f"{self.BASE_URL}/batch/daily-changes"
-
         try:
-            self.api_call_count += 1
-            response = requests.post(
-                url,
-                json={
+            return self._post(
+                "batch/daily-changes",
+                {
                     "symbols": symbols,
                     "start_date": start_date.isoformat(),
                     "end_date": end_date.isoformat(),
@@ -502,8 +640,6 @@ class EODHDProvider(DataProviderBase):
                 },
                 timeout=60,  # Longer timeout for batch requests
             )
-            response.raise_for_status()
-            return response.json()
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Batch daily changes request failed: {e}")
@@ -512,6 +648,60 @@ class EODHDProvider(DataProviderBase):
             logger.error(f"Batch daily changes unexpected error: {e}")
             return {}
 
+    def get_batch_daily_closes(
+        self,
+        symbols: List[str],
+        start_date: date,
+        end_date: date,
+    ) -> pd.DataFrame:
+        """
+        Fetch stored daily closes for many symbols in a single call.
+
+        Args:
+            symbols: List of symbols like ["AAPL.US", "GOOGL.US"]
+            start_date: First date to include
+            end_date: Last date to include
+
+        Returns:
+            Long DataFrame with columns symbol, date, close, adjusted_close
+            (empty on failure). Symbols the server has no bars for are absent.
+        """
+        url = f"{self.BASE_URL}/batch/daily-closes"
+        columns = ["symbol", "date", "close", "adjusted_close"]
+
+        try:
+            self.api_call_count += 1
+            response = self._session.post(
+                url,
+                params={"fmt": self._bars_format},
+                json={
+                    "symbols": symbols,
+                    "start_date": start_date.isoformat(),
+                    "end_date": end_date.isoformat(),
+                },
+                timeout=60,  # Longer timeout for batch requests
+            )
+            response.raise_for_status()
+            if self._bars_format == "arrow":
+                df = self._read_arrow(response.content)
+            else:
+                df = pd.DataFrame(
+                    [
+                        (symbol, d, c, ac)
+                        for symbol, bars in response.json().items()
+                        for d, c, ac in zip(bars["dates"], bars["close"], bars["adjusted_close"])
+                    ],
+                    columns=columns,
+                )
+            df["date"] = pd.to_datetime(df["date"])
+            return df
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Batch daily closes request failed: {e}")
+        except Exception as e:
+            logger.error(f"Batch daily closes unexpected error: {e}")
+        return pd.DataFrame(columns=columns)
+
     def get_all_live_prices(self) -> Dict[str, Dict[str, Any]]:
         """
         Get all live prices from the data server.
@@ -519,12 +709,8 @@ class EODHDProvider(DataProviderBase):
         Returns:
             Dict mapping "TICKER.EXCHANGE" to price data
         """
-        url = f"{self.BASE_URL}/live-prices"
-
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._request("live-prices") or []
 
             # Convert list to dict keyed by symbol
             result = {}
@@ -552,7 +738,7 @@ class EODHDProvider(DataProviderBase):
                 }
             return result
 
-        except requests.exceptions.RequestException as e:
+        except ProviderError as e:
             logger.error(f"Live prices request failed: {e}")
             return {}
         except Exception as e:
@@ -652,6 +838,14 @@ class EODHDProvider(DataProviderBase):
             "timestamp": datetime.fromtimestamp(data.get("timestamp", 0)),
         }
 
+    def get_forex_rates(
+        self, currency: str, from_date: Optional[str] = None, to_date: Optional[str] = None,
+    ) -> Dict[str, float]:
+        """Historical rates for a currency as {date string: rate_to_usd}."""
+        params = {"from_date": from_date, "to_date": to_date}
+        data = self._request(f"forex/rates/{currency}", params={k: v for k, v in params.items() if v})
+        return (data or {}).get("rates", {})
+
     def get_exchanges(self) -> List[Dict[str, str]]:
         """Get list of supported exchanges."""
         data = self._request("exchanges-list")
@@ -709,7 +903,7 @@ class EODHDProvider(DataProviderBase):
 
         try:
             self.api_call_count += 1
-            response = requests.post(
+            response = self._session.post(
                 url,
                 json={"overrides": overrides},
                 timeout=30,
@@ -735,14 +929,8 @@ class EODHDProvider(DataProviderBase):
         Returns dict mapping symbol to {name, pe_ratio, eps, market_cap,
         shares_outstanding, currency, fx_rate_to_usd, ...}.
         """
-        url = f"{self.BASE_URL}/batch/highlights"
         try:
-            self.api_call_count += 1
-            response = requests.post(
-                url, json={"symbols": symbols}, timeout=30,
-            )
-            response.raise_for_status()
-            return response.json()
+            return self._post("batch/highlights", {"symbols": symbols}, timeout=30)
         except Exception as e:
             logger.error(f"Batch highlights request failed: {e}")
             return {}
@@ -759,7 +947,7 @@ class EODHDProvider(DataProviderBase):
         """
         try:
             url = f"{self.BASE_URL}/server-status"
-            response = requests.get(url, timeout=5)
+            response = self._session.get(url, timeout=5)
             response.raise_for_status()
             return response.json()
         except Exception as e:
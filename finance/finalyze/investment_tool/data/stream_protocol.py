@@ -0,0 +1,94 @@
+"""Decoder for the data server's live price WebSocket messages.
+
+Handles both JSON "price_updates" messages and the compact binary frames
+a client gets after sending {"type": "set_protocol", "protocol": "binary"}.
+Binary frames carry ticker ids (announced in the "protocol" and
+"subscribed" replies) and only the fields that changed, so the decoder
+keeps the latest full quote per ticker.
+
+Frame layout (little-endian, must match data_server/ws/binary.py):
+
+    header  B kind (1 = price updates), B version, H entry count
+    entry   H ticker id, B field mask, then one value per set mask bit:
+            bit 0 price d, bit 1 change d, bit 2 change_percent d,
+            bit 3 volume q, bit 4 timestamp I
+"""
+
+import struct
+from typing import Any, Dict, Optional
+
+FRAME_PRICE_UPDATES = 1
+PROTOCOL_VERSION = 1
+
+FIELDS = (
+    ("price", "d"),
+    ("change", "d"),
+    ("change_percent", "d"),
+    ("volume", "q"),
+    ("timestamp", "I"),
+)
+
+_HEADER = struct.Struct("<BBH")
+_ENTRY = struct.Struct("<HB")
+_VALUES = {
+    mask: struct.Struct("<" + "".join(code for bit, (_, code) in enumerate(FIELDS) if mask >> bit & 1))
+    for mask in range(1 << len(FIELDS))
+}
+
+
+class PriceStreamDecoder:
+    """Turns live price messages into {ticker: full quote} updates."""
+
+    def __init__(self):
+        self._tickers_by_id: Dict[int, str] = {}
+        self.quotes: Dict[str, Dict[str, Any]] = {}
+
+    def reset(self) -> None:
+        """Forget ids and quotes (call on reconnect)."""
+        self._tickers_by_id.clear()
+        self.quotes.clear()
+
+    def handle_control(self, message: Dict[str, Any]) -> None:
+        """Record ticker ids from "protocol" / "subscribed" replies."""
+        for ticker, ticker_id in (message.get("ids") or {}).items():
+            self._tickers_by_id[int(ticker_id)] = ticker
+
+    def decode_json(self, message: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Updates from a JSON "price_updates" (or legacy "price_update") message."""
+        if message.get("type") == "price_update":
+            updates = {message.get("ticker"): message.get("data") or {}}
+        else:
+            updates = message.get("data") or {}
+
+        changed = {}
+        for ticker, data in updates.items():
+            if not ticker:
+                continue
+            quote = self.quotes.setdefault(ticker, {})
+            quote.update({k: v for k, v in data.items() if v is not None})
+            changed[ticker] = dict(quote)
+        return changed
+
+    def decode_frame(self, frame: bytes) -> Dict[str, Dict[str, Any]]:
+        """Updates from a binary price frame, merged into the latest quotes."""
+        kind, version, count = _HEADER.unpack_from(frame, 0)
+        if kind != FRAME_PRICE_UPDATES or version != PROTOCOL_VERSION:
+            raise ValueError(f"Unsupported frame kind={kind} version={version}")
+
+        changed = {}
+        offset = _HEADER.size
+        for _ in range(count):
+            ticker_id, mask = _ENTRY.unpack_from(frame, offset)
+            offset += _ENTRY.size
+            layout = _VALUES[mask]
+            values = iter(layout.unpack_from(frame, offset))
+            offset += layout.size
+
+            ticker: Optional[str] = self._tickers_by_id.get(ticker_id)
+            fields = {name: next(values) for bit, (name, _) in enumerate(FIELDS) if mask >> bit & 1}
+            if ticker is None:
+                continue
+            quote = self.quotes.setdefault(ticker, {})
+            quote.update(fields)
+            changed[ticker] = dict(quote)
+        return changed
@@ -14,11 +14,19 @@ Environment variables:
 import json
 import os
 import sys
+from pathlib import Path
 from typing import Any
 
 import requests
 from mcp.server.fastmcp import FastMCP
 
+# Make the 'investment_tool' package importable when run as a script
+_parent_dir = Path(__file__).parent.parent
+if str(_parent_dir) not in sys.path:
+    sys.path.insert(0, str(_parent_dir))
+
+from investment_tool.analysis.technical import atr, bollinger_bands, ema, macd, rsi, sma, vwap
+
 # Redirect logging to stderr (stdout is used for MCP JSON-RPC)
 import logging
 
@@ -248,6 +256,71 @@ def get_daily_prices(ticker: str, exchange: str = "US", days: int = 30) -> str:
         return f"Error getting daily prices: {e}"
 
 
+@mcp.tool()
+def get_technical_indicators(ticker: str, exchange: str = "US", days: int = 365) -> str:
+    """Get the latest technical indicator values for a stock.
+
+    Computed from daily bars: SMA 20/50/200, EMA 12/26, RSI 14,
+    MACD (12, 26, 9), Bollinger Bands (20, 2), ATR 14 and the VWAP of the
+    requested range.
+
+    Args:
+        ticker: Stock ticker symbol (e.g. NVDA, AAPL)
+        exchange: Exchange code (default: US)
+        days: Calendar days of history to compute from (default: 365;
+            SMA 200 needs about 300)
+    """
+    try:
+        from datetime import date, timedelta
+
+        import numpy as np
+
+        end = date.today()
+        start = end - timedelta(days=days)
+
+        data = _data_get(
+            f"eod/{ticker}.{exchange}",
+            {"from": start.isoformat(), "to": end.isoformat()},
+        )
+        if not data:
+            return f"No price data found for {ticker}.{exchange}"
+
+        def column(name: str) -> np.ndarray:
+            return np.array([row.get(name) for row in data], dtype=np.float64)
+
+        high, low, close, volume = column("high"), column("low"), column("close"), column("volume")
+        macd_line, macd_signal, macd_hist = macd(close)
+        bb_middle, bb_upper, bb_lower = bollinger_bands(close)
+
+        values = [
+            ("SMA 20", sma(close, 20)),
+            ("SMA 50", sma(close, 50)),
+            ("SMA 200", sma(close, 200)),
+            ("EMA 12", ema(close, 12)),
+            ("EMA 26", ema(close, 26)),
+            ("RSI 14", rsi(close, 14)),
+            ("MACD", macd_line),
+            ("MACD signal", macd_signal),
+            ("MACD histogram", macd_hist),
+            ("Bollinger upper", bb_upper),
+            ("Bollinger middle", bb_middle),
+            ("Bollinger lower", bb_lower),
+            ("ATR 14", atr(high, low, close, 14)),
+            ("VWAP", vwap(high, low, close, volume)),
+        ]
+
+        lines = [
+            f"Technical indicators for {ticker}.{exchange} as of {data[-1].get('date', '')} "
+            f"({len(data)} bars, close {close[-1]:.2f}):"
+        ]
+        for name, series in values:
+            value = series[-1]
+            lines.append(f"  {name:<17} {'N/A (not enough data)' if np.isnan(value) else f'{value:.2f}'}")
+        return "\n".join(lines)
+    except Exception as e:
+        return f"Error getting technical indicators: {e}"
+
+
 @mcp.tool()
 def get_news(ticker: str, limit: int = 10) -> str:
     """Get recent news articles for a stock with sentiment data.
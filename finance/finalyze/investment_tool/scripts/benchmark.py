@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Performance benchmarks for the investment tool's analysis code.
+
+Usage:
+    cd /Users/jmahe/projects/python/finance/finalyze
+    investment_tool/.venv/bin/python investment_tool/scripts/benchmark.py indicators --bars 10000
+    investment_tool/.venv/bin/python investment_tool/scripts/benchmark.py backtest --tickers 500 --years 20
+    investment_tool/.venv/bin/python investment_tool/scripts/benchmark.py portfolio --symbols 1000
+
+Benchmarks run on synthetic data and need neither the data server nor a
+display.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Make the 'investment_tool' package importable when run as a script
+_parent_dir = Path(__file__).resolve().parent.parent.parent
+if str(_parent_dir) not in sys.path:
+    sys.path.insert(0, str(_parent_dir))
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    CYAN = '\033[96m'
+    RESET = '\033[0m'
+    BOLD = '\033[1m'
+
+
+def print_header(title: str):
+    print(f"\n{Colors.BOLD}{'='*70}{Colors.RESET}")
+    print(f"{Colors.BOLD}{title}{Colors.RESET}")
+    print(f"{'='*70}")
+
+
+def _timed(fn, repeat: int) -> float:
+    """Best-of-repeat wall time of fn() in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _synthetic_bars(n: int, seed: int = 0) -> pd.DataFrame:
+    """Random-walk OHLCV bars."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = np.abs(rng.normal(0, 0.005, n))
+    return pd.DataFrame({
+        "open": close * (1 + rng.normal(0, 0.002, n)),
+        "high": close * (1 + spread),
+        "low": close * (1 - spread),
+        "close": close,
+        "volume": rng.integers(100_000, 5_000_000, n).astype(np.float64),
+    })
+
+
+def _pandas_reference(df: pd.DataFrame) -> dict:
+    """The pandas formulations the chart widgets used before."""
+    close = df["close"]
+    delta = close.diff()
+    wilder = dict(alpha=1 / 14, adjust=False, min_periods=14)
+    avg_gain = delta.clip(lower=0).ewm(**wilder).mean()
+    avg_loss = (-delta).clip(lower=0).ewm(**wilder).mean()
+    prev_close = close.shift()
+    true_range = pd.concat(
+        [df["high"] - df["low"], (df["high"] - prev_close).abs(), (df["low"] - prev_close).abs()],
+        axis=1,
+    ).max(axis=1)
+    ema12 = close.ewm(span=12, adjust=False).mean()
+    ema26 = close.ewm(span=26, adjust=False).mean()
+    typical = (df["high"] + df["low"] + close) / 3
+    return {
+        "sma": close.rolling(20).mean().values,
+        "ema": ema12.values,
+        "bollinger": (close.rolling(20).mean() + 2 * close.rolling(20).std()).values,
+        "macd": (ema12 - ema26).values,
+        "rsi": (100 - 100 / (1 + avg_gain / avg_loss)).values,
+        "atr": true_range.ewm(**wilder).mean().values,
+        "vwap": ((typical * df["volume"]).cumsum() / df["volume"].cumsum()).values,
+    }
+
+
+def bench_indicators(args) -> int:
+    """Correctness vs pandas, vectorized throughput and incremental update cost."""
+    from investment_tool.analysis.technical import (
+        IndicatorCache, atr, bollinger_bands, ema, macd, rsi, sma, vwap,
+    )
+
+    df = _synthetic_bars(args.bars)
+    high, low, close, volume = (df[c].values for c in ("high", "low", "close", "volume"))
+
+    ours = {
+        "sma": lambda: sma(close, 20),
+        "ema": lambda: ema(close, 12),
+        "bollinger": lambda: bollinger_bands(close, 20, 2.0)[1],
+        "macd": lambda: macd(close)[0],
+        "rsi": lambda: rsi(close, 14),
+        "atr": lambda: atr(high, low, close, 14),
+        "vwap": lambda: vwap(high, low, close, volume),
+    }
+    reference = _pandas_reference(df)
+    params = {
+        "sma": {"period": 20}, "ema": {"period": 12}, "bollinger": {"period": 20, "num_std": 2.0},
+        "macd": {}, "rsi": {"period": 14}, "atr": {"period": 14}, "vwap": {},
+    }
+
+    print_header(f"INDICATORS ({args.bars} bars)")
+    print(f"  {'indicator':<10} {'max |diff|':>12} {'vectorized':>12} {'bars/sec':>14} "
+          f"{'append':>10} {'live tick':>10}")
+
+    failures = 0
+    for name, fn in ours.items():
+        result = fn()
+        expected = reference[name]
+        same_nan = np.array_equal(np.isnan(result), np.isnan(expected))
+        diff = float(np.nanmax(np.abs(result - expected)))
+        ok = same_nan and diff <= 1e-8 * max(1.0, float(np.nanmax(np.abs(expected))))
+        failures += not ok
+
+        seconds = _timed(fn, args.repeat)
+
+        # Incremental: grow the series one bar at a time through the cache,
+        # then re-send the same length with a changed last bar (live tick).
+        cache = IndicatorCache()
+        columns = {c: df[c].values for c in df.columns}
+        base = args.bars - args.appends
+        cache.get("BENCH", name, {c: a[:base] for c, a in columns.items()}, **params[name])
+        start = time.perf_counter()
+        for n in range(base + 1, args.bars + 1):
+            cache.get("BENCH", name, {c: a[:n] for c, a in columns.items()}, **params[name])
+        append_us = (time.perf_counter() - start) / args.appends * 1e6
+
+        live = dict(columns, close=close.copy())
+        start = time.perf_counter()
+        for i in range(args.appends):
+            live["close"][-1] = close[-1] * (1 + 1e-4 * (i + 1))
+            cache.get("BENCH", name, live, **params[name])
+        tick_us = (time.perf_counter() - start) / args.appends * 1e6
+
+        color = Colors.GREEN if ok else Colors.RED
+        print(f"  {Colors.CYAN}{name:<10}{Colors.RESET} {color}{diff:>12.2e}{Colors.RESET} "
+              f"{seconds * 1000:>10.2f}ms {args.bars / seconds:>14,.0f} "
+              f"{append_us:>8.1f}us {tick_us:>8.1f}us")
+
+    print(f"\n  {'pandas reference (all)':<24} {_timed(lambda: _pandas_reference(df), args.repeat) * 1000:>8.2f}ms")
+    print(f"  {'vectorized (all)':<24} "
+          f"{_timed(lambda: [fn() for fn in ours.values()], args.repeat) * 1000:>8.2f}ms")
+    if failures:
+        print(f"  {Colors.RED}{failures} indicator(s) differ from the pandas reference{Colors.RESET}")
+    return 1 if failures else 0
+
+
+def _synthetic_panel(tickers: int, bars: int, seed: int = 0):
+    """Random-walk close prices for many tickers, some listed late."""
+    from investment_tool.backtesting import PricePanel
+
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, (bars, tickers)), axis=0))
+    listed = rng.integers(0, bars // 4, tickers)
+    close[np.arange(bars)[:, None] < listed] = np.nan
+    index = pd.bdate_range("2000-01-03", periods=bars).values
+    return PricePanel(
+        index=index, symbols=[f"T{i:04d}.US" for i in range(tickers)],
+        open=close, high=close, low=close, close=close, volume=np.ones_like(close),
+    )
+
+
+def bench_backtest(args) -> int:
+    """Single backtest and parallel parameter sweep on a synthetic panel."""
+    from investment_tool.backtesting import run_backtest, run_sweep
+    from investment_tool.backtesting.strategies import MovingAverageCrossover
+
+    bars = args.years * 252
+    panel = _synthetic_panel(args.tickers, bars)
+    side = max(1, int(round(args.params ** 0.5)))
+    grid = {
+        "fast": list(np.linspace(5, 50, side).astype(int)),
+        "slow": list(np.linspace(60, 250, max(1, args.params // side)).astype(int)),
+    }
+    runs = len(grid["fast"]) * len(grid["slow"])
+
+    print_header(f"BACKTEST ({args.tickers} tickers x {bars} bars, {runs} parameter sets)")
+    start = time.perf_counter()
+    result = run_backtest(panel, MovingAverageCrossover(20, 100))
+    single = time.perf_counter() - start
+    print(f"  {'single backtest':<24} {single * 1000:>10.1f}ms   "
+          f"Sharpe {result.metrics['sharpe_ratio']:.2f}, {result.metrics['total_trades']} trades")
+
+    timings = {}
+    results = {}
+    for workers in sorted({1, args.workers}):
+        start = time.perf_counter()
+        results[workers] = run_sweep(panel, MovingAverageCrossover, grid, workers=workers)
+        timings[workers] = time.perf_counter() - start
+        print(f"  {f'sweep, {workers} worker(s)':<24} {timings[workers]:>10.2f}s   "
+              f"{runs * args.tickers * bars / timings[workers]:>14,.0f} bar-evaluations/sec")
+
+    same = all(
+        np.allclose(results[1]["sharpe_ratio"].values, r["sharpe_ratio"].values, equal_nan=True)
+        for r in results.values()
+    )
+    best = results[args.workers].iloc[0]
+    print(f"\n  best: fast={best['fast']} slow={best['slow']} Sharpe {best['sharpe_ratio']:.2f}")
+    if len(timings) > 1:
+        print(f"  parallel speedup: {timings[1] / timings[args.workers]:.1f}x")
+    color = Colors.GREEN if same else Colors.RED
+    print(f"  {color}parallel results {'match' if same else 'DIFFER from'} in-process results{Colors.RESET}")
+    return 0 if same else 1
+
+
+def bench_portfolio(args) -> int:
+    """Initial build and daily refresh of portfolio risk for a large universe."""
+    from investment_tool.analysis.portfolio import PortfolioRisk
+
+    rng = np.random.default_rng(0)
+    symbols = [f"T{i:04d}.US" for i in range(args.symbols)]
+    days = args.days + args.refreshes
+    market = rng.normal(0.0003, 0.01, days)
+    returns = market[:, None] * rng.uniform(0.5, 1.5, args.symbols) + rng.normal(0, 0.015, (days, args.symbols))
+    closes = pd.DataFrame(
+        100.0 * np.exp(np.cumsum(np.column_stack((returns, market)), axis=0)),
+        index=pd.bdate_range("2020-01-01", periods=days),
+        columns=symbols + ["SPY.US"],
+    )
+    closes.iloc[: days // 3, ::7] = np.nan  # Late listings
+
+    print_header(f"PORTFOLIO RISK ({args.symbols} symbols, {args.days} days, window {args.window})")
+    risk = PortfolioRisk(symbols, window=args.window)
+    start = time.perf_counter()
+    risk.update(closes.iloc[:args.days])
+    summary = risk.summary()
+    build = time.perf_counter() - start
+    print(f"  {'initial build + summary':<28} {build * 1000:>10.1f}ms")
+
+    # Each refresh re-sends the last held day (as refresh() does) plus a new one
+    timings = []
+    for day in range(args.days, days):
+        start = time.perf_counter()
+        risk.update(closes.iloc[day - 1:day + 1])
+        summary = risk.summary()
+        risk.value_at_risk(method="historical")
+        risk.value_at_risk(method="parametric")
+        timings.append(time.perf_counter() - start)
+    print(f"  {'daily refresh + summary':<28} {np.median(timings) * 1000:>10.1f}ms (median of {len(timings)})")
+
+    full = PortfolioRisk(symbols, window=args.window)
+    full.update(closes)
+    diff = float(np.nanmax(np.abs(risk.covariance().values - full.covariance().values)))
+    ok = diff <= 1e-12 and np.allclose(summary.values, full.summary().values, equal_nan=True)
+    color = Colors.GREEN if ok else Colors.RED
+    print(f"  {'incremental vs full cov':<28} {color}{diff:>12.2e}{Colors.RESET}")
+    return 0 if ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Investment tool analysis benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("indicators", help="Technical indicator correctness and throughput")
+    p.add_argument("--bars", type=int, default=10000, help="Bars per series")
+    p.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported)")
+    p.add_argument("--appends", type=int, default=500, help="Incremental updates to time")
+    p.set_defaults(func=bench_indicators)
+
+    p = sub.add_parser("backtest", help="Vectorized backtest and parameter sweep")
+    p.add_argument("--tickers", type=int, default=500, help="Tickers in the panel")
+    p.add_argument("--years", type=int, default=20, help="Years of daily bars")
+    p.add_argument("--params", type=int, default=100, help="Parameter sets in the sweep")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Sweep worker processes")
+    p.set_defaults(func=bench_backtest)
+
+    p = sub.add_parser("portfolio", help="Portfolio risk build and daily refresh")
+    p.add_argument("--symbols", type=int, default=1000, help="Symbols in the universe")
+    p.add_argument("--days", type=int, default=504, help="Trading days of initial history")
+    p.add_argument("--window", type=int, default=252, help="Covariance/VaR window")
+    p.add_argument("--refreshes", type=int, default=20, help="Daily refreshes to time")
+    p.set_defaults(func=bench_portfolio)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
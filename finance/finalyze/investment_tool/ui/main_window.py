@@ -1,6 +1,5 @@
 """Main application window."""
 
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta, timezone
 from typing import Optional, List, Dict
 
@@ -32,6 +31,7 @@ import pandas as pd
 from investment_tool.config.settings import get_config, AppConfig
 from investment_tool.config.categories import get_category_manager
 from investment_tool.data.manager import get_data_manager, DataManager
+from investment_tool.data.live_stream import LivePriceStream
 from investment_tool.ui.styles.theme import get_stylesheet
 from investment_tool.ui.dialogs.settings_dialog import SettingsDialog
 from investment_tool.ui.dialogs.category_dialog import CategoryDialog
@@ -94,6 +94,20 @@ def _strip_phantom_today(prices):
     return prices
 
 
+def _cap_volume_outliers(prices, quantile: float = 0.9) -> None:
+    """Clip each day's bar volumes at that day's quantile (modifies in place).
+
+    EODHD often dumps the day's total volume into the last 1-minute bar;
+    in 5m/15m bars it lands in the day's last bucket. Capping per day keeps
+    one spike per day above the threshold even in a multi-day range.
+    """
+    if "volume" not in prices.columns or len(prices) <= 10:
+        return
+    volume = prices["volume"]
+    caps = volume.groupby(prices.index.normalize()).transform(lambda v: v.dropna().quantile(quantile))
+    prices["volume"] = volume.clip(upper=caps.where(caps > 0))
+
+
 class MainWindow(QMainWindow):
     """Main application window."""
 
@@ -116,6 +130,11 @@ class MainWindow(QMainWindow):
         self._news_update_progress: Optional[QProgressDialog] = None
         self._financials_update_progress: Optional[QProgressDialog] = None
 
+        # Pushed live prices (WebSocket); polling is the fallback while disconnected
+        self._live_stream: Optional[LivePriceStream] = None
+        self._treemap_fx: Dict[str, float] = {}  # symbol -> FX rate to USD for treemap prices
+        self._last_push_chart_reload: float = 0.0
+
         self._setup_window()
         self._create_menu_bar()
         self._create_tool_bar()
@@ -486,7 +505,9 @@ class MainWindow(QMainWindow):
         refresh_interval = self.config.data.auto_refresh_interval_minutes * 60 * 1000
         self.refresh_timer.start(refresh_interval)
 
-        # Live price refresh timer (15 seconds for real-time updates)
+        # Live price refresh timer (15 seconds for real-time updates).
+        # While the live price stream is connected the 1D view is updated by
+        # pushes instead and this only drives the reduced-rate refresh.
         self.live_price_timer = QTimer(self)
         self.live_price_timer.timeout.connect(self._refresh_live_prices)
         self.live_price_timer.start(15000)  # 15 seconds
@@ -573,6 +594,9 @@ class MainWindow(QMainWindow):
             self._offhours_tick = 0
 
         if market_open and period == "1D":
+            if self._live_stream and self._live_stream.is_connected:
+                # Pushed updates keep the 1D view current (_on_live_prices_pushed)
+                return
             # Full refresh during market hours for 1D view
             self._load_treemap_data()
             now = datetime.now().strftime("%H:%M:%S")
@@ -608,28 +632,18 @@ class MainWindow(QMainWindow):
             self.advanced_chart.set_data_manager(self.data_manager)
 
             if self.data_manager.is_connected():
-                # Get server status for EODHD API call count
-                server_status = self.data_manager.get_server_status()
-                if server_status:
-                    api_calls = server_status.get("eodhd_api_calls", 0)
-                    self.connection_label.setText(f"Data Server: Connected | EODHD Calls: {api_calls}")
-                else:
-                    self.connection_label.setText("Data Server: Connected")
-                self.connection_label.setStyleSheet("color: #22C55E;")
-
-                # Sync all stocks to data server for live price tracking
-                self._sync_stocks_to_server()
-
-                # Show loading state while data server may still be warming up
-                self.treemap.set_loading(True)
-
-                # Load treemap with default category
-                self._load_treemap_data()
-
-                # Set period and refresh watchlist with current data
                 period = self.period_combo.currentText()
                 self.watchlist_widget.set_period(period)
-                self.watchlist_widget.refresh_all()
+
+                if self.data_manager.disk_cache:
+                    # First paint from the local disk cache, then revalidate
+                    # against the data server once the window is shown
+                    with self.data_manager.cached_first():
+                        self._load_treemap_data()
+                        self.watchlist_widget.refresh_all()
+                    QTimer.singleShot(0, self._connect_data_server)
+                else:
+                    self._connect_data_server()
 
                 # News feed only loads when a stock is selected
             else:
@@ -645,6 +659,39 @@ class MainWindow(QMainWindow):
             self.connection_label.setText("EODHD: Error")
             self.connection_label.setStyleSheet("color: #EF4444;")
 
+    def _connect_data_server(self) -> None:
+        """Load current data from the data server and start live updates."""
+        try:
+            # Get server status for EODHD API call count
+            server_status = self.data_manager.get_server_status()
+            if server_status:
+                api_calls = server_status.get("eodhd_api_calls", 0)
+                self.connection_label.setText(f"Data Server: Connected | EODHD Calls: {api_calls}")
+            else:
+                self.connection_label.setText("Data Server: Connected")
+            self.connection_label.setStyleSheet("color: #22C55E;")
+
+            # Sync all stocks to data server for live price tracking
+            self._sync_stocks_to_server()
+
+            # Show loading state while data server may still be warming up
+            # (unless the disk cache already painted the treemap)
+            if not self.treemap.get_symbols():
+                self.treemap.set_loading(True)
+
+            # Load treemap with default category
+            self._load_treemap_data()
+
+            # Refresh watchlist with current data
+            self.watchlist_widget.refresh_all()
+
+            self._start_live_stream()
+
+        except Exception as e:
+            logger.error(f"Failed to load data from server: {e}")
+            self.connection_label.setText("EODHD: Error")
+            self.connection_label.setStyleSheet("color: #EF4444;")
+
     def _sync_stocks_to_server(self) -> None:
         """Sync all stocks from categories to data server for live price tracking."""
         import os
@@ -834,6 +881,7 @@ class MainWindow(QMainWindow):
                 ccy = hl.get("currency")
                 if fx and ccy and ccy != "USD":
                     price_usd = current * fx
+                    self._treemap_fx[ticker_key] = fx
 
                 # Market cap from batch highlights (already computed server-side)
                 market_cap = hl.get("market_cap") or 1e9
@@ -885,6 +933,86 @@ class MainWindow(QMainWindow):
             # Keep loading state if no items yet (data server may still be warming up)
             self.treemap.set_loading(True)
 
+        self._update_live_subscriptions()
+
+    def _start_live_stream(self) -> None:
+        """Open the WebSocket live price subscription (polling covers disconnects)."""
+        if self._live_stream is not None:
+            return
+        from investment_tool.data.providers.eodhd import EODHDProvider
+
+        self._live_stream = LivePriceStream(EODHDProvider.WS_URL, self)
+        self._live_stream.prices_updated.connect(self._on_live_prices_pushed)
+        self._live_stream.connection_changed.connect(self._on_live_stream_connection_changed)
+        self._update_live_subscriptions()
+        self._live_stream.start()
+
+    def _update_live_subscriptions(self) -> None:
+        """Subscribe to the tickers currently shown (treemap, watchlists, selection)."""
+        if self._live_stream is None:
+            return
+        symbols = set(self.treemap.get_symbols())
+        symbols |= self.watchlist_widget.get_symbols()
+        if self._selected_ticker and self._selected_exchange:
+            symbols.add(f"{self._selected_ticker}.{self._selected_exchange}")
+        self._live_stream.set_tickers(symbols)
+
+    @Slot(bool)
+    def _on_live_stream_connection_changed(self, connected: bool) -> None:
+        """Switch between pushed updates and polling."""
+        self.watchlist_widget.set_live_push_active(connected)
+        if connected:
+            logger.info("Live price stream connected; 1D polling paused")
+        else:
+            logger.warning("Live price stream disconnected; falling back to polling")
+            # Catch up on anything missed while disconnected
+            self._refresh_live_prices()
+
+    @Slot(dict)
+    def _on_live_prices_pushed(self, updates: Dict[str, Dict]) -> None:
+        """Apply pushed live prices to the treemap, watchlists and selected chart.
+
+        Work is proportional to the number of tickers in the update.
+        """
+        period = self.period_combo.currentText()
+
+        if period == "1D":
+            # Same rule as _load_treemap_data: price vs previous close, today only
+            today_str = date.today().isoformat()
+            changes = {}
+            for symbol, lp in updates.items():
+                price = lp.get("price")
+                prev_close = lp.get("previous_close")
+                if not str(lp.get("market_timestamp", "")).startswith(today_str):
+                    continue
+                if price and prev_close:
+                    changes[symbol] = (
+                        (price - prev_close) / prev_close,
+                        price * self._treemap_fx.get(symbol, 1.0),
+                    )
+            self.treemap.update_prices(changes)
+
+        self.watchlist_widget.apply_live_prices(updates)
+
+        # The 1D chart and metrics are rebuilt from server bars; throttle to the
+        # price worker's cadence rather than reloading on every push
+        if (
+            period == "1D"
+            and self._selected_ticker
+            and self._selected_exchange
+            and f"{self._selected_ticker}.{self._selected_exchange}" in updates
+            and is_market_open("US")
+        ):
+            import time
+            now = time.monotonic()
+            if now - self._last_push_chart_reload >= 30:
+                self._last_push_chart_reload = now
+                if self.advanced_btn.isChecked():
+                    self._load_advanced_chart()
+                else:
+                    self._load_stock_chart(self._selected_ticker, self._selected_exchange)
+                self._update_metrics(self._selected_ticker, self._selected_exchange)
+
     def _configure_tabs_for_asset_type(self, asset_type: str) -> None:
         """Reconfigure chart_tabs based on whether this is an ETF or stock.
 
@@ -940,43 +1068,45 @@ class MainWindow(QMainWindow):
             # Select the stock in the watchlist (if present)
             self.watchlist_widget.select_stock(ticker, exchange)
 
-            # Fetch all data in parallel using threads
+            self._update_live_subscriptions()
+
+            # Start every independent request for this ticker at once; the
+            # chart, metrics and tab loads below join the ones in flight, so
+            # the switch waits for the slowest request rather than their sum.
             articles = None
             if self.data_manager:
                 end_date = date.today()
                 start_date = end_date - timedelta(days=30)
+                # Fetch only 100 initially for fast loading - more loaded on demand
+                news_kwargs = dict(
+                    ticker=ticker, limit=100, from_date=start_date, to_date=end_date, refresh=True,
+                )
+                period_start, period_end = get_date_range(self.stock_chart.get_period(), min_trading_days=0)
+                self.data_manager.prefetch([
+                    ("get_news", news_kwargs),
+                    ("get_daily_prices", dict(ticker=ticker, exchange=exchange,
+                                              start=period_start, end=period_end)),
+                    ("get_daily_prices", dict(ticker=ticker, exchange=exchange,
+                                              start=end_date - timedelta(days=365), end=end_date)),
+                    ("get_fundamentals", dict(ticker=ticker, exchange=exchange)),
+                    ("get_shares_history", dict(ticker=ticker, exchange=exchange)),
+                ])
+
+                # Load chart and metrics on main thread (they update UI)
+                t1 = time.perf_counter()
+                if self.advanced_btn.isChecked():
+                    self._load_advanced_chart()
+                else:
+                    self._load_stock_chart(ticker, exchange)
+                logger.info(f"[TIMING] Chart load: {(time.perf_counter() - t1)*1000:.0f}ms")
 
-                # Define fetch functions
-                def fetch_news():
-                    t0 = time.perf_counter()
-                    # Fetch only 100 initially for fast loading - more loaded on demand
-                    result = self.data_manager.get_news(
-                        ticker, limit=100, from_date=start_date, to_date=end_date,
-                        refresh=True,
-                    )
-                    logger.info(f"[TIMING] News fetch: {(time.perf_counter() - t0)*1000:.0f}ms ({len(result) if result else 0} articles)")
-                    return result
-
-                # Run news fetch in parallel with chart/metrics (which share some data)
-                with ThreadPoolExecutor(max_workers=2) as executor:
-                    news_future = executor.submit(fetch_news)
-
-                    # Load chart and metrics on main thread (they update UI)
-                    t1 = time.perf_counter()
-                    if self.advanced_btn.isChecked():
-                        self._load_advanced_chart()
-                    else:
-                        self._load_stock_chart(ticker, exchange)
-                    logger.info(f"[TIMING] Chart load: {(time.perf_counter() - t1)*1000:.0f}ms")
-
-                    t2 = time.perf_counter()
-                    self._update_metrics(ticker, exchange)
-                    logger.info(f"[TIMING] Metrics update: {(time.perf_counter() - t2)*1000:.0f}ms")
+                t2 = time.perf_counter()
+                self._update_metrics(ticker, exchange)
+                logger.info(f"[TIMING] Metrics update: {(time.perf_counter() - t2)*1000:.0f}ms")
 
-                    # Get news result
-                    t3 = time.perf_counter()
-                    articles = news_future.result()
-                    logger.info(f"[TIMING] News future.result(): {(time.perf_counter() - t3)*1000:.0f}ms")
+                t3 = time.perf_counter()
+                articles = self.data_manager.get_news(**news_kwargs)
+                logger.info(f"[TIMING] News: {(time.perf_counter() - t3)*1000:.0f}ms ({len(articles)} articles)")
 
             # Update sentiment gauge with pre-fetched articles
             t4 = time.perf_counter()
@@ -1162,6 +1292,7 @@ class MainWindow(QMainWindow):
     def _on_stock_add_to_watchlist(self, ticker: str, exchange: str) -> None:
         """Handle adding stock to watchlist from treemap."""
         self.watchlist_widget.add_stock(ticker, exchange)
+        self._update_live_subscriptions()
         logger.info(f"Added {ticker}.{exchange} to watchlist")
 
     def _on_news_articles_changed(self, articles: list) -> None:
@@ -1233,7 +1364,8 @@ class MainWindow(QMainWindow):
                 )
 
                 if not market_is_open:
-                    # Market closed - use EODHD historical only
+                    # Market closed - use EODHD historical only, as 5-minute
+                    # bars aggregated by the data server
                     # Try current trading date first, then go back to find available data
                     raw_prices = None
                     display_date = trading_date
@@ -1251,7 +1383,7 @@ class MainWindow(QMainWindow):
                         logger.info(f"Checking intraday for {ticker} on {check_date}")
                         try:
                             raw_prices = self.data_manager.get_intraday_prices(
-                                ticker, exchange, "1m",
+                                ticker, exchange, "5m",
                                 day_open.replace(tzinfo=timezone.utc),
                                 day_close.replace(tzinfo=timezone.utc),
                                 use_cache=True,
@@ -1268,7 +1400,7 @@ class MainWindow(QMainWindow):
                             full_day_index = pd.date_range(
                                 start=market_open_utc,
                                 end=market_close_utc,
-                                freq="1min"
+                                freq="5min"
                             )
                             logger.info(f"Found intraday data for {check_date} ({len(raw_prices)} records)")
                             break
@@ -1279,17 +1411,12 @@ class MainWindow(QMainWindow):
                         if "timestamp" in raw_prices.columns:
                             raw_prices = raw_prices.set_index("timestamp")
 
-                        # EODHD often dumps total daily volume into the last bar -
-                        # cap outlier volume at the 95th percentile of other bars
-                        if "volume" in raw_prices.columns and len(raw_prices) > 10:
-                            vol = raw_prices["volume"].dropna()
-                            p95 = vol.quantile(0.95)
-                            if p95 > 0:
-                                raw_prices["volume"] = raw_prices["volume"].clip(upper=p95)
+                        # EODHD often dumps total daily volume into the last bar
+                        _cap_volume_outliers(raw_prices)
 
                         # For sparse data (OTC stocks with few trades), don't reindex
                         # Just use raw data directly - chart will show actual trades only
-                        is_sparse = len(raw_prices) < 50  # Less than 50 actual data points
+                        is_sparse = len(raw_prices) < 10  # Less than 10 of ~78 5-minute bars
 
                         if is_sparse:
                             # Use raw data directly without reindexing
@@ -1382,7 +1509,7 @@ class MainWindow(QMainWindow):
                             logger.info(f"Checking intraday for {ticker} on {check_date}")
                             try:
                                 raw_prev = self.data_manager.get_intraday_prices(
-                                    ticker, exchange, "1m",
+                                    ticker, exchange, "5m",
                                     day_open.replace(tzinfo=timezone.utc),
                                     day_close.replace(tzinfo=timezone.utc),
                                     use_cache=True, force_refresh=True,
@@ -1392,11 +1519,8 @@ class MainWindow(QMainWindow):
                             if raw_prev is not None and not raw_prev.empty:
                                 if "timestamp" in raw_prev.columns:
                                     raw_prev = raw_prev.set_index("timestamp")
-                                if "volume" in raw_prev.columns and len(raw_prev) > 10:
-                                    p95 = raw_prev["volume"].dropna().quantile(0.95)
-                                    if p95 > 0:
-                                        raw_prev["volume"] = raw_prev["volume"].clip(upper=p95)
-                                prev_index = pd.date_range(start=day_open, end=day_close, freq="1min")
+                                _cap_volume_outliers(raw_prev)
+                                prev_index = pd.date_range(start=day_open, end=day_close, freq="5min")
                                 prices = raw_prev.reindex(prev_index)
                                 prices["close"] = prices["close"].ffill()
                                 prices["open"] = prices["open"].fillna(prices["close"])
@@ -1436,9 +1560,10 @@ class MainWindow(QMainWindow):
                     day_start = datetime(check_date.year, check_date.month, check_date.day, oh, om, tzinfo=timezone.utc) - timedelta(hours=utc_off)
                     day_end = datetime(check_date.year, check_date.month, check_date.day, ch, cm, tzinfo=timezone.utc) - timedelta(hours=utc_off)
 
-                    # Use 1m interval - EODHD 5m data has gaps/NULLs for some stocks
+                    # Data server aggregates its 1m bars into 15-minute OHLC
+                    # (EODHD's own 5m data has gaps/NULLs for some stocks)
                     day_prices = self.data_manager.get_intraday_prices(
-                        ticker, exchange, "1m", day_start, day_end, use_cache=True,
+                        ticker, exchange, "15m", day_start, day_end, use_cache=True,
                         force_refresh=True  # Only use EODHD data, not price worker cache
                     )
                     if day_prices is not None and not day_prices.empty:
@@ -1450,19 +1575,9 @@ class MainWindow(QMainWindow):
                         prices = prices.set_index("timestamp")
                     prices = prices.sort_index()
                     # Cap outlier volume (EODHD dumps daily total into last bar)
-                    if "volume" in prices.columns and len(prices) > 10:
-                        vol = prices["volume"].dropna()
-                        p95 = vol.quantile(0.95)
-                        if p95 > 0:
-                            prices["volume"] = prices["volume"].clip(upper=p95)
-                    # Resample to 15-minute OHLC for smooth graph
-                    prices = prices.resample("15min").agg({
-                        "open": "first",
-                        "high": "max",
-                        "low": "min",
-                        "close": "last",
-                        "volume": "sum"
-                    }).dropna()
+                    _cap_volume_outliers(prices)
+                    # Drop empty 15-minute buckets
+                    prices = prices.dropna(subset=["open", "high", "low", "close"])
                     if "volume" in prices.columns:
                         prices["volume"] = prices["volume"].fillna(0)
                     logger.info(f"Got {len(prices)} 15-min records for {ticker} (1W)")
@@ -2437,6 +2552,8 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event) -> None:
         """Handle window close event."""
+        if self._live_stream is not None:
+            self._live_stream.stop()
         # Stop control server
         if hasattr(self, '_control_server'):
             self._control_server.stop()
@@ -23,6 +23,8 @@ import pyqtgraph as pg
 import pandas as pd
 from loguru import logger
 
+from investment_tool.analysis.technical import macd, sma
+
 
 # Configure pyqtgraph (matches stock_chart.py)
 pg.setConfigOptions(antialias=True, background="#1F2937", foreground="#F9FAFB")
@@ -727,9 +729,8 @@ class AdvancedChartWidget(QWidget):
         Computes MA on full_close (includes warmup data), then trims to the
         visible range starting at vis_start so the MA line has no NaN gaps.
         """
-        sma_full = pd.Series(full_close).rolling(window=period).mean().values
-        sma = sma_full[vis_start:]
-        sma_pct = (sma / base_price - 1) * 100
+        ma = sma(full_close, period)[vis_start:]
+        sma_pct = (ma / base_price - 1) * 100
 
         pen = pg.mkPen(color, width=1.5)
         curve = self.price_widget.plot(x, sma_pct, pen=pen, name=f"MA {period}")
@@ -850,7 +851,7 @@ class AdvancedChartWidget(QWidget):
         if len(close) < smooth_window + 2:
             return []
 
-        smoothed = pd.Series(close).rolling(smooth_window, min_periods=1).mean().values
+        smoothed = sma(close, smooth_window, min_periods=1)
         diff = np.diff(smoothed)
 
         signs = np.sign(diff)
@@ -878,11 +879,7 @@ class AdvancedChartWidget(QWidget):
         if len(close) < 35:
             return []
 
-        s = pd.Series(close)
-        ema12 = s.ewm(span=12, adjust=False).mean().values
-        ema26 = s.ewm(span=26, adjust=False).mean().values
-        macd_line = ema12 - ema26
-        signal_line = pd.Series(macd_line).ewm(span=9, adjust=False).mean().values
+        macd_line, signal_line, _ = macd(close, 12, 26, 9)
 
         # Phase = growth when MACD > signal, fall when MACD < signal
         above = macd_line > signal_line
@@ -909,7 +906,7 @@ class AdvancedChartWidget(QWidget):
         if window < 10:
             return []
 
-        ma = pd.Series(close).rolling(window, min_periods=1).mean().values
+        ma = sma(close, window, min_periods=1)
         above = close > ma
 
         phases = []
@@ -1,9 +1,12 @@
 """Interactive market treemap widget."""
 
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Callable, Any
+from typing import Optional, List, Dict, Callable, Any, Tuple
 import math
 
+import numpy as np
+
 from PySide6.QtCore import Qt, Signal, QRectF, QPointF, QTimer
 from PySide6.QtGui import (
     QPainter,
@@ -36,6 +39,20 @@ from investment_tool.utils.helpers import (
 from investment_tool.config.settings import get_config
 
 
+# A cached layout is reused while every tile's share of the total value is
+# within this relative change of the share it was laid out with
+LAYOUT_WEIGHT_TOLERANCE = 0.01
+
+# Canvas resizes up to this fraction per side rescale a cached layout
+# instead of rerunning squarify
+LAYOUT_RESIZE_TOLERANCE = 0.05
+
+LAYOUT_CACHE_SIZE = 16
+
+# Gap between the canvas edge and the tiles
+_LAYOUT_MARGIN = 2
+
+
 @dataclass
 class TreemapItem:
     """Single item in the treemap."""
@@ -58,6 +75,31 @@ class TreemapItem:
     height: float = 0
 
 
+@dataclass
+class _Layout:
+    """Squarified rectangles for one set of tiles on one canvas size."""
+    symbols: Tuple[str, ...]  # "TICKER.EXCHANGE" in layout order
+    weights: np.ndarray  # Share of the total value per tile
+    width: float
+    height: float
+    rects: np.ndarray  # (n, 4) x, y, width, height from the layout origin
+
+    def fits(self, symbols: Tuple[str, ...], weights: np.ndarray) -> bool:
+        return self.symbols == symbols and bool(
+            np.all(np.abs(weights - self.weights) <= LAYOUT_WEIGHT_TOLERANCE * self.weights)
+        )
+
+
+def _item_rects(items: List[TreemapItem]) -> np.ndarray:
+    """(n, 4) x, y, width, height of the items' tiles."""
+    return np.array([(item.x, item.y, item.width, item.height) for item in items], dtype=float).reshape(-1, 4)
+
+
+def _style_key(item: TreemapItem) -> tuple:
+    """Fields that affect how a tile is painted, apart from its geometry."""
+    return (item.change_percent, item.price, item.pe_ratio, item.market_cap)
+
+
 class MarketTreemap(QWidget):
     """
     Interactive market treemap visualization.
@@ -77,7 +119,9 @@ class MarketTreemap(QWidget):
 
         self.config = get_config()
         self._items: List[TreemapItem] = []
-        self._layout_rects: List[QRectF] = []
+        self._index_by_symbol: Dict[str, int] = {}  # "TICKER.EXCHANGE" -> item index
+        # Layouts by (filter, width, height), least recently used first
+        self._layouts: "OrderedDict[Tuple[str, int, int], _Layout]" = OrderedDict()
         self._selected_ticker: Optional[str] = None
         self._hovered_index: int = -1
         self._compare_selection: List[int] = []
@@ -178,14 +222,48 @@ class MarketTreemap(QWidget):
         if self._items:
             self._compute_layout()
             self.canvas.set_items(self._items)
-            self.canvas.update()
 
     def set_items(self, items: List[TreemapItem]) -> None:
-        """Set the items to display in the treemap."""
+        """Set the items to display in the treemap.
+
+        Tile geometry comes from the layout cache unless the set of tiles,
+        their market-cap weights or the canvas size changed meaningfully;
+        with the same tiles and geometry only restyled tiles are repainted.
+        """
         self._items = items
+        self._index_by_symbol = {
+            f"{item.ticker}.{item.exchange}": i for i, item in enumerate(items)
+        }
         self._compute_layout()
         self.canvas.set_items(self._items)
-        self.canvas.update()
+
+    def get_symbols(self) -> List[str]:
+        """"TICKER.EXCHANGE" for every displayed item."""
+        return list(self._index_by_symbol)
+
+    def update_prices(self, changes: Dict[str, tuple]) -> None:
+        """Apply live price changes without recomputing the layout.
+
+        Args:
+            changes: {"TICKER.EXCHANGE": (change_percent, price)}; change_percent
+                     is a fraction, price may be None to keep the current one.
+
+        Tile sizes come from market cap, so only the changed tiles are repainted.
+        """
+        changed = []
+        for symbol, (change_percent, price) in changes.items():
+            index = self._index_by_symbol.get(symbol)
+            if index is None:
+                continue
+            item = self._items[index]
+            if item.change_percent == change_percent and (price is None or item.price == price):
+                continue
+            item.change_percent = change_percent
+            if price is not None:
+                item.price = price
+            changed.append(item)
+        if changed:
+            self.canvas.update_items(changed)
 
     def set_categories(self, categories: List[str]) -> None:
         """Set available category filters."""
@@ -243,8 +321,8 @@ class MarketTreemap(QWidget):
             return
 
         # Get canvas size
-        width = self.canvas.width() - 4
-        height = self.canvas.height() - 4
+        width = self.canvas.width() - 2 * _LAYOUT_MARGIN
+        height = self.canvas.height() - 2 * _LAYOUT_MARGIN
 
         if width <= 0 or height <= 0:
             return
@@ -254,20 +332,55 @@ class MarketTreemap(QWidget):
         if not valid_items:
             return
 
-        # Normalize values for squarify
-        values = [item.value for item in valid_items]
-        total = sum(values)
-        normalized = [v / total * width * height for v in values]
-
-        # Compute rectangles
-        rects = squarify.squarify(normalized, 2, 2, width, height)
-
-        # Assign layout to items
-        for item, rect in zip(valid_items, rects):
-            item.x = rect["x"]
-            item.y = rect["y"]
-            item.width = rect["dx"]
-            item.height = rect["dy"]
+        symbols = tuple(f"{item.ticker}.{item.exchange}" for item in valid_items)
+        values = np.array([item.value for item in valid_items], dtype=float)
+        weights = values / values.sum()
+        layout = self._cached_layout(symbols, weights, width, height)
+        if layout is None:
+            # Normalize values for squarify
+            normalized = (weights * width * height).tolist()
+            rects = squarify.squarify(normalized, 0, 0, width, height)
+            layout = _Layout(
+                symbols=symbols,
+                weights=weights,
+                width=width,
+                height=height,
+                rects=np.array([(r["x"], r["y"], r["dx"], r["dy"]) for r in rects], dtype=float),
+            )
+            self._layouts[(self.filter_combo.currentText(), width, height)] = layout
+            while len(self._layouts) > LAYOUT_CACHE_SIZE:
+                self._layouts.popitem(last=False)
+
+        # Assign layout to items, scaled if the canvas was resized slightly
+        rects = layout.rects * (width / layout.width, height / layout.height, width / layout.width, height / layout.height)
+        rects[:, :2] += _LAYOUT_MARGIN
+        for item, (x, y, dx, dy) in zip(valid_items, rects.tolist()):
+            item.x = x
+            item.y = y
+            item.width = dx
+            item.height = dy
+
+    def _cached_layout(
+        self, symbols: Tuple[str, ...], weights: np.ndarray, width: int, height: int,
+    ) -> Optional[_Layout]:
+        """Cached layout of these tiles for the current filter and canvas size."""
+        filter_text = self.filter_combo.currentText()
+        key = (filter_text, width, height)
+        layout = self._layouts.get(key)
+        if layout is not None and layout.fits(symbols, weights):
+            self._layouts.move_to_end(key)
+            return layout
+
+        # A layout for a slightly different canvas size can be rescaled
+        for (cached_filter, cached_width, cached_height), layout in reversed(self._layouts.items()):
+            if (
+                cached_filter == filter_text
+                and abs(width - cached_width) <= LAYOUT_RESIZE_TOLERANCE * cached_width
+                and abs(height - cached_height) <= LAYOUT_RESIZE_TOLERANCE * cached_height
+                and layout.fits(symbols, weights)
+            ):
+                return layout
+        return None
 
     def _on_filter_changed(self, filter_text: str) -> None:
         """Handle filter selection change."""
@@ -357,8 +470,7 @@ class MarketTreemap(QWidget):
     def resizeEvent(self, event) -> None:
         """Handle resize events."""
         super().resizeEvent(event)
-        QTimer.singleShot(0, self._compute_layout)
-        QTimer.singleShot(10, self.canvas.update)
+        QTimer.singleShot(0, self._recompute_and_update)
 
 
 class TreemapCanvas(QWidget):
@@ -373,6 +485,9 @@ class TreemapCanvas(QWidget):
         super().__init__(parent)
 
         self._items: List[TreemapItem] = []
+        # Tile geometry of _items as of the last set_items, for vectorized
+        # hit testing and dirty-region checks
+        self._rects = np.empty((0, 4))
         self._selected_index: int = -1
         self._hovered_index: int = -1
         self._loading: bool = False
@@ -395,25 +510,57 @@ class TreemapCanvas(QWidget):
         self.update()
 
     def set_items(self, items: List[TreemapItem]) -> None:
-        """Set items to render."""
+        """Set items to render.
+
+        Selection and hover are kept when the tiles are the same stocks in
+        the same order; if their geometry is unchanged too, only tiles
+        whose style changed are repainted.
+        """
+        same_tiles = len(items) == len(self._items) and all(
+            new.ticker == old.ticker and new.exchange == old.exchange
+            for new, old in zip(items, self._items)
+        )
+        rects = _item_rects(items)
+        restyled = [
+            new for new, old in zip(items, self._items)
+            if new is not old and _style_key(new) != _style_key(old)
+        ] if same_tiles else []
+        was_loading = self._loading
         self._items = items
         self._loading = False
-        self._selected_index = -1
-        self._hovered_index = -1
+
+        if same_tiles and not was_loading and np.array_equal(rects, self._rects):
+            self.update_items(restyled)
+            return
+
+        self._rects = rects
+        if not same_tiles:
+            self._selected_index = -1
+            self._hovered_index = -1
         self.update()
 
     def set_selected(self, index: int) -> None:
         """Set selected item index."""
-        self._selected_index = index
-        self.update()
+        previous, self._selected_index = self._selected_index, index
+        self._update_tiles([previous, index])
+
+    def update_items(self, items: List[TreemapItem]) -> None:
+        """Schedule a repaint of just these items' tiles."""
+        for item in items:
+            # Margin covers the 3px selection border
+            self.update(QRectF(item.x, item.y, item.width, item.height).toAlignedRect().adjusted(-3, -3, 3, 3))
+
+    def _update_tiles(self, indices: List[int]) -> None:
+        self.update_items([self._items[i] for i in indices if 0 <= i < len(self._items)])
 
     def paintEvent(self, event) -> None:
         """Render the treemap."""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
 
-        # Background
-        painter.fillRect(self.rect(), QColor("#1F2937"))
+        # Background (only the exposed region; partial repaints come from update_items)
+        dirty = QRectF(event.rect())
+        painter.fillRect(dirty, QColor("#1F2937"))
 
         if not self._items:
             # Draw placeholder text
@@ -433,9 +580,14 @@ class TreemapCanvas(QWidget):
                 )
             return
 
-        # Draw items
-        for i, item in enumerate(self._items):
-            self._draw_item(painter, item, i)
+        # Draw items intersecting the exposed region
+        x, y, w, h = self._rects.T
+        exposed = np.flatnonzero(
+            (x - 3 < dirty.right()) & (x + w + 3 > dirty.left())
+            & (y - 3 < dirty.bottom()) & (y + h + 3 > dirty.top())
+        )
+        for i in exposed.tolist():
+            self._draw_item(painter, self._items[i], i)
 
     def _draw_item(self, painter: QPainter, item: TreemapItem, index: int) -> None:
         """Draw a single treemap item."""
@@ -470,22 +622,13 @@ class TreemapCanvas(QWidget):
 
         # Draw text if item is large enough
         if item.width > 40 and item.height > 30:
-            self._draw_item_text(painter, item, rect)
+            self._draw_item_text(painter, item, rect, fill_color)
 
     def _draw_item_text(
-        self, painter: QPainter, item: TreemapItem, rect: QRectF
+        self, painter: QPainter, item: TreemapItem, rect: QRectF, bg_color: QColor
     ) -> None:
         """Draw text labels on an item."""
         # Determine text color based on background brightness
-        color_hex = interpolate_color(
-            item.change_percent * 100,
-            self._min_value,
-            self._max_value,
-            self._min_color,
-            self._mid_color,
-            self._max_color,
-        )
-        bg_color = QColor(color_hex)
         brightness = (bg_color.red() * 299 + bg_color.green() * 587 + bg_color.blue() * 114) / 1000
         text_color = QColor("#000000") if brightness > 128 else QColor("#FFFFFF")
 
@@ -554,11 +697,10 @@ class TreemapCanvas(QWidget):
 
     def _get_item_at(self, pos: QPointF) -> int:
         """Get item index at position."""
-        for i, item in enumerate(self._items):
-            rect = QRectF(item.x, item.y, item.width, item.height)
-            if rect.contains(pos):
-                return i
-        return -1
+        x, y, w, h = self._rects.T
+        px, py = pos.x(), pos.y()
+        hits = np.flatnonzero((x <= px) & (px <= x + w) & (y <= py) & (py <= y + h))
+        return int(hits[0]) if len(hits) else -1
 
     def mousePressEvent(self, event: QMouseEvent) -> None:
         """Handle mouse press."""
@@ -579,9 +721,9 @@ class TreemapCanvas(QWidget):
         index = self._get_item_at(event.position())
 
         if index != self._hovered_index:
-            self._hovered_index = index
+            previous, self._hovered_index = self._hovered_index, index
             self.item_hovered.emit(index)
-            self.update()
+            self._update_tiles([previous, index])
 
             # Show tooltip
             if index >= 0:
@@ -611,8 +753,8 @@ class TreemapCanvas(QWidget):
 
     def leaveEvent(self, event) -> None:
         """Handle mouse leave."""
-        self._hovered_index = -1
-        self.update()
+        previous, self._hovered_index = self._hovered_index, -1
+        self._update_tiles([previous])
         QToolTip.hideText()
 
     def contextMenuEvent(self, event) -> None:
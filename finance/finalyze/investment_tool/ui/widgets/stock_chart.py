@@ -30,6 +30,7 @@ from PySide6.QtCore import QRectF
 import pyqtgraph as pg
 import pandas as pd
 
+from investment_tool.analysis.technical import get_indicator_cache
 from investment_tool.config.settings import get_config
 
 
@@ -201,117 +202,109 @@ class MeasureViewBox(pg.ViewBox):
         self.addItem(self._measure_label, ignoreBounds=True)
 
 
-class CandlestickItem(pg.GraphicsObject):
-    """Custom graphics item for candlestick chart."""
-
-    def __init__(self, data: pd.DataFrame):
-        super().__init__()
-        self.data = data
-        self.picture = None
-        self._generate_picture()
-
-    def _generate_picture(self) -> None:
-        """Pre-render the candlesticks."""
-        from PySide6.QtGui import QPainter, QPicture, QPen, QBrush
+# Bars per cached picture at full detail; changing a bar (e.g. the live
+# one) re-renders only its chunk
+_CHUNK_BARS = 512
 
-        self.picture = QPicture()
-        painter = QPainter(self.picture)
 
-        if self.data is None or self.data.empty:
-            painter.end()
-            return
-
-        # Colors
-        green = QColor("#22C55E")
-        red = QColor("#EF4444")
-        green_brush = QBrush(green)
-        red_brush = QBrush(red)
-
-        bar_width = 0.6
-
-        for i, (idx, row) in enumerate(self.data.iterrows()):
-            open_price = row["open"]
-            high = row["high"]
-            low = row["low"]
-            close = row["close"]
-
-            # Skip NaN values (future times in intraday view)
-            if pd.isna(open_price) or pd.isna(close) or pd.isna(high) or pd.isna(low):
-                continue
-
-            # Skip invalid data (all values must be positive)
-            if open_price <= 0 or close <= 0 or high <= 0 or low <= 0:
-                continue
-
-            # Fix invalid OHLC relationships (sometimes data has low=0 or extreme values)
-            # Ensure: low <= min(open,close) and high >= max(open,close)
-            body_min = min(open_price, close)
-            body_max = max(open_price, close)
-            if low > body_min:
-                low = body_min
-            if high < body_max:
-                high = body_max
-
-            # Skip bars with extreme wick ratio (likely data errors for OTC/sparse stocks)
-            # If wick range is > 50% of price, cap it
-            wick_range = high - low
-            if close > 0 and wick_range / close > 0.5:
-                # Cap wicks to reasonable range around the body
-                margin = body_max * 0.05  # 5% margin
-                low = max(low, body_min - margin)
-                high = min(high, body_max + margin)
-
-            is_bullish = close >= open_price
-            color = green if is_bullish else red
-            brush = green_brush if is_bullish else red_brush
-
-            # Calculate body bounds
-            body_top = max(open_price, close)
-            body_bottom = min(open_price, close)
-            body_height = body_top - body_bottom
-            wick_height = high - low
-
-            # Only draw wick if there's an actual range (high != low)
-            if wick_height > 0.0001:
-                painter.setPen(pg.mkPen(color, width=1))
-                painter.drawLine(
-                    pg.QtCore.QPointF(i, low),
-                    pg.QtCore.QPointF(i, high)
-                )
-
-            # Draw body
-            painter.setBrush(brush)
-            painter.setPen(pg.mkPen(color, width=1))
+def _clean_ohlc(data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Drawable open/high/low/close arrays and a mask of bars to draw.
 
-            if body_height < 0.0001:
-                # Doji - draw a small horizontal line
-                painter.drawLine(
-                    pg.QtCore.QPointF(i - bar_width / 2, close),
-                    pg.QtCore.QPointF(i + bar_width / 2, close)
-                )
-            else:
-                painter.drawRect(
-                    pg.QtCore.QRectF(
-                        i - bar_width / 2,
-                        body_bottom,
-                        bar_width,
-                        body_height
-                    )
-                )
+    NaN bars (future times in intraday view) and bars with non-positive
+    prices are masked out. Invalid OHLC relationships are fixed so that
+    low <= min(open, close) and high >= max(open, close), and wicks wider
+    than 50% of the price (likely data errors for OTC/sparse stocks) are
+    capped to a 5% margin around the body.
+    """
+    o, h, l, c = (data[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close"))
+    body_min = np.minimum(o, c)
+    body_max = np.maximum(o, c)
+    with np.errstate(invalid="ignore"):
+        valid = (o > 0) & (h > 0) & (l > 0) & (c > 0)
+        l = np.minimum(l, body_min)
+        h = np.maximum(h, body_max)
+        extreme = (h - l) / c > 0.5
+    margin = body_max * 0.05
+    l = np.where(extreme, np.maximum(l, body_min - margin), l)
+    h = np.where(extreme, np.minimum(h, body_max + margin), h)
+    return o, h, l, c, valid
+
+
+def _segments_path(x0: np.ndarray, y0: np.ndarray, x1: np.ndarray, y1: np.ndarray) -> "pg.QtGui.QPainterPath":
+    """One path holding a line segment per element."""
+    x = np.empty(2 * len(x0))
+    y = np.empty(2 * len(y0))
+    x[0::2], x[1::2] = x0, x1
+    y[0::2], y[1::2] = y0, y1
+    return pg.arrayToQPath(x, y, connect="pairs", finiteCheck=False)
+
+
+def _rects_path(left: np.ndarray, bottom: np.ndarray, width: float, height: np.ndarray) -> "pg.QtGui.QPainterPath":
+    """One path holding a closed rectangle per element."""
+    right = left + width
+    top = bottom + height
+    x = np.column_stack([left, right, right, left, left]).ravel()
+    y = np.column_stack([bottom, bottom, top, top, bottom]).ravel()
+    connect = np.tile(np.array([1, 1, 1, 1, 0], dtype=np.int32), len(left))
+    return pg.arrayToQPath(x, y, connect=connect, finiteCheck=False)
+
+
+class _PriceBarsItem(pg.GraphicsObject):
+    """Base for price items drawn as one glyph per OHLC bar.
+
+    Bar geometry is computed with NumPy once per set_data and drawn with
+    batched paths. At full detail the bars are rendered into pictures of
+    _CHUNK_BARS bars, and set_data re-renders only the chunks from the
+    first changed bar on. When more than one bar falls in a pixel column
+    the visible range is decimated to one OHLC per column instead.
+    """
 
-        painter.end()
+    def __init__(self, data: pd.DataFrame):
+        super().__init__()
+        self.data = None
+        self._ohlc = np.empty((4, 0))
+        self._valid = np.empty(0, dtype=bool)
+        self._bounds = pg.QtCore.QRectF(0, 0, 1, 1)
+        self._chunks: Dict[int, Any] = {}
+        self._lod_key: Optional[Tuple[int, int, int]] = None
+        self._lod_picture = None
+        self.set_data(data)
+
+    def _draw(self, painter, x, o, h, l, c, step: int) -> None:
+        """Draw bars centred at x; step is the number of bars per glyph."""
+        raise NotImplementedError
 
-    def paint(self, painter, option, widget) -> None:
-        """Paint the candlesticks."""
-        if self.picture:
-            self.picture.play(painter)
+    def set_data(self, data: pd.DataFrame) -> None:
+        """Update the data, re-rendering only the bars that changed."""
+        self.data = data
+        if data is None or data.empty:
+            ohlc = np.empty((4, 0))
+            valid = np.empty(0, dtype=bool)
+        else:
+            *columns, valid = _clean_ohlc(data)
+            ohlc = np.vstack(columns)
+
+        common = min(ohlc.shape[1], self._ohlc.shape[1])
+        old, new = self._ohlc[:, :common], ohlc[:, :common]
+        same = ((old == new) | (np.isnan(old) & np.isnan(new))).all(axis=0)
+        same &= self._valid[:common] == valid[:common]
+        changed = np.flatnonzero(~same)
+        first_changed = changed[0] if len(changed) else common
+        stale = first_changed // _CHUNK_BARS
+        self._chunks = {k: v for k, v in self._chunks.items() if k < stale}
+        self._lod_key = None
+
+        self._ohlc = ohlc
+        self._valid = valid
+        self._bounds = self._data_bounds()
+        self.prepareGeometryChange()
+        self.update()
 
-    def boundingRect(self):
-        """Return bounding rectangle."""
+    def _data_bounds(self):
         if self.data is None or self.data.empty:
             return pg.QtCore.QRectF(0, 0, 1, 1)
 
-        # Use nanmin/nanmax to handle NaN values in intraday data
+        # Use skipna to handle NaN values in intraday data
         low_min = self.data["low"].min(skipna=True)
         high_max = self.data["high"].max(skipna=True)
         if pd.isna(low_min) or pd.isna(high_max):
@@ -333,133 +326,124 @@ class CandlestickItem(pg.GraphicsObject):
             height
         )
 
-    def set_data(self, data: pd.DataFrame) -> None:
-        """Update the data and regenerate picture."""
-        self.data = data
-        self._generate_picture()
-        self.prepareGeometryChange()
-        self.update()
-
-
-class OHLCItem(pg.GraphicsObject):
-    """Custom graphics item for OHLC bar chart."""
-
-    def __init__(self, data: pd.DataFrame):
-        super().__init__()
-        self.data = data
-        self.picture = None
-        self._generate_picture()
+    def boundingRect(self):
+        """Return bounding rectangle."""
+        return self._bounds
+
+    def _bars(self, start: int, stop: int, step: int) -> Tuple[np.ndarray, ...]:
+        """x, open, high, low, close of the drawable bars in [start, stop).
+
+        With step > 1, bars are grouped into buckets of step bars aligned
+        to multiples of step, each reduced to one OHLC.
+        """
+        idx = np.flatnonzero(self._valid[start:stop]) + start
+        o, h, l, c = self._ohlc[:, idx]
+        if step == 1 or len(idx) == 0:
+            return idx.astype(float), o, h, l, c
+        bucket = idx // step
+        first = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        last = np.r_[first[1:], len(idx)] - 1
+        return (
+            bucket[first] * step + (step - 1) / 2,
+            o[first],
+            np.maximum.reduceat(h, first),
+            np.minimum.reduceat(l, first),
+            c[last],
+        )
 
-    def _generate_picture(self) -> None:
-        """Pre-render the OHLC bars."""
-        from PySide6.QtGui import QPainter, QPicture, QPen
+    def _render(self, start: int, stop: int, step: int):
+        from PySide6.QtGui import QPainter, QPicture
 
-        self.picture = QPicture()
-        painter = QPainter(self.picture)
+        picture = QPicture()
+        painter = QPainter(picture)
+        x, o, h, l, c = self._bars(start, stop, step)
+        if len(x):
+            self._draw(painter, x, o, h, l, c, step)
+        painter.end()
+        return picture
 
-        if self.data is None or self.data.empty:
-            painter.end()
+    def paint(self, painter, option, widget) -> None:
+        """Paint the bars in the visible x-range."""
+        n = self._ohlc.shape[1]
+        if n == 0:
+            return
+        view = self.getViewBox()
+        if view is None:
+            start, stop = 0, n
+        else:
+            (x_min, x_max), _ = view.viewRange()
+            start = max(0, int(np.floor(x_min)))
+            stop = min(n, int(np.ceil(x_max)) + 1)
+        if start >= stop:
             return
 
-        # Colors
-        green = QColor("#22C55E")
-        red = QColor("#EF4444")
-
-        tick_width = 0.3  # Width of open/close ticks
-
-        for i, (idx, row) in enumerate(self.data.iterrows()):
-            open_price = row["open"]
-            high = row["high"]
-            low = row["low"]
-            close = row["close"]
-
-            # Skip NaN values (future times in intraday view)
-            if pd.isna(open_price) or pd.isna(close) or pd.isna(high) or pd.isna(low):
-                continue
-
-            # Skip invalid data (all values must be positive)
-            if open_price <= 0 or close <= 0 or high <= 0 or low <= 0:
-                continue
-
-            # Fix invalid OHLC relationships
-            body_min = min(open_price, close)
-            body_max = max(open_price, close)
-            if low > body_min:
-                low = body_min
-            if high < body_max:
-                high = body_max
-
-            # Cap extreme wicks for sparse/OTC data
-            wick_range = high - low
-            if close > 0 and wick_range / close > 0.5:
-                margin = body_max * 0.05
-                low = max(low, body_min - margin)
-                high = min(high, body_max + margin)
-
-            is_bullish = close >= open_price
-            color = green if is_bullish else red
-            pen = pg.mkPen(color, width=2)
-            painter.setPen(pen)
-
-            # Only draw vertical line (high to low) if there's an actual range
-            wick_height = high - low
-            if wick_height > 0.0001:
-                painter.drawLine(
-                    pg.QtCore.QPointF(i, low),
-                    pg.QtCore.QPointF(i, high)
-                )
-
-            # Draw open tick (left side)
-            painter.drawLine(
-                pg.QtCore.QPointF(i - tick_width, open_price),
-                pg.QtCore.QPointF(i, open_price)
-            )
-
-            # Draw close tick (right side)
-            painter.drawLine(
-                pg.QtCore.QPointF(i, close),
-                pg.QtCore.QPointF(i + tick_width, close)
-            )
+        # Bars per device pixel column
+        step = int(self.pixelWidth() or 1)
+        if step < 2:
+            for chunk in range(start // _CHUNK_BARS, (stop - 1) // _CHUNK_BARS + 1):
+                picture = self._chunks.get(chunk)
+                if picture is None:
+                    first = chunk * _CHUNK_BARS
+                    picture = self._render(first, min(n, first + _CHUNK_BARS), 1)
+                    self._chunks[chunk] = picture
+                picture.play(painter)
+            return
 
-        painter.end()
+        key = (start - start % step, stop, step)
+        if key != self._lod_key:
+            self._lod_picture = self._render(key[0], stop, step)
+            self._lod_key = key
+        self._lod_picture.play(painter)
 
-    def paint(self, painter, option, widget) -> None:
-        """Paint the OHLC bars."""
-        if self.picture:
-            self.picture.play(painter)
 
-    def boundingRect(self):
-        """Return bounding rectangle."""
-        if self.data is None or self.data.empty:
-            return pg.QtCore.QRectF(0, 0, 1, 1)
-
-        # Use skipna to handle NaN values in intraday data
-        low_min = self.data["low"].min(skipna=True)
-        high_max = self.data["high"].max(skipna=True)
-        if pd.isna(low_min) or pd.isna(high_max):
-            return pg.QtCore.QRectF(0, 0, 1, 1)
+class CandlestickItem(_PriceBarsItem):
+    """Custom graphics item for candlestick chart."""
 
-        # Ensure minimum height to prevent scaling issues when min == max
-        height = high_max - low_min
-        if height < 0.01:
-            padding = max(0.01, low_min * 0.005)
-            low_min -= padding
-            high_max += padding
-            height = high_max - low_min
+    def _draw(self, painter, x, o, h, l, c, step: int) -> None:
+        half_width = 0.3 * step  # Bar width 0.6
+        body_bottom = np.minimum(o, c)
+        body_height = np.abs(c - o)
+        # Only draw wick if there's an actual range (high != low)
+        has_wick = h - l > 0.0001
+        # Doji - draw a small horizontal line
+        doji = body_height < 0.0001
+        bullish = c >= o
+
+        for side, color in ((bullish, QColor("#22C55E")), (~bullish, QColor("#EF4444"))):
+            painter.setPen(pg.mkPen(color, width=1))
+            wick = side & has_wick
+            flat = side & doji
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPath(_segments_path(
+                np.r_[x[wick], x[flat] - half_width],
+                np.r_[l[wick], c[flat]],
+                np.r_[x[wick], x[flat] + half_width],
+                np.r_[h[wick], c[flat]],
+            ))
+            body = side & ~doji
+            painter.setBrush(QBrush(color))
+            painter.drawPath(_rects_path(x[body] - half_width, body_bottom[body], 2 * half_width, body_height[body]))
+
+
+class OHLCItem(_PriceBarsItem):
+    """Custom graphics item for OHLC bar chart."""
 
-        return pg.QtCore.QRectF(
-            -1,
-            low_min,
-            len(self.data) + 1,
-            height
-        )
+    def _draw(self, painter, x, o, h, l, c, step: int) -> None:
+        tick_width = 0.3 * step  # Width of open/close ticks
+        # Only draw vertical line (high to low) if there's an actual range
+        has_wick = h - l > 0.0001
+        bullish = c >= o
 
-    def set_data(self, data: pd.DataFrame) -> None:
-        """Update the data and regenerate picture."""
-        self.data = data
-        self._generate_picture()
-        self.prepareGeometryChange()
-        self.update()
+        for side, color in ((bullish, QColor("#22C55E")), (~bullish, QColor("#EF4444"))):
+            painter.setPen(pg.mkPen(color, width=2))
+            wick = side & has_wick
+            painter.drawPath(_segments_path(
+                # High-low line, open tick (left side), close tick (right side)
+                np.r_[x[wick], x[side] - tick_width, x[side]],
+                np.r_[l[wick], o[side], c[side]],
+                np.r_[x[wick], x[side], x[side] + tick_width],
+                np.r_[h[wick], o[side], c[side]],
+            ))
 
 
 class VolumeItem(pg.BarGraphItem):
@@ -480,19 +464,16 @@ class VolumeItem(pg.BarGraphItem):
         heights = np.nan_to_num(data["volume"].values.astype(float), nan=0.0)
 
         # Color based on price direction
-        brushes = []
-        green = pg.mkBrush("#22C55E80")
-        red = pg.mkBrush("#EF444480")
-        transparent = pg.mkBrush("#00000000")
-
-        for _, row in data.iterrows():
-            # Use transparent for NaN rows (future times)
-            if pd.isna(row["close"]) or pd.isna(row["open"]):
-                brushes.append(transparent)
-            elif row["close"] >= row["open"]:
-                brushes.append(green)
-            else:
-                brushes.append(red)
+        palette = [
+            pg.mkBrush("#22C55E80"),
+            pg.mkBrush("#EF444480"),
+            pg.mkBrush("#00000000"),
+        ]
+        close = data["close"].to_numpy(dtype=float)
+        open_price = data["open"].to_numpy(dtype=float)
+        # Use transparent for NaN rows (future times)
+        codes = np.where(np.isnan(close) | np.isnan(open_price), 2, np.where(close >= open_price, 0, 1))
+        brushes = [palette[code] for code in codes]
 
         return x, heights, brushes
 
@@ -755,24 +736,20 @@ class StockChart(QWidget):
                 is_intraday = first_ts.hour != 0 or first_ts.minute != 0
 
 
-        # Check if data is already aggregated (e.g., 15-min bars from 1W period)
-        # If the interval between points is >= 5 min, don't resample
-        needs_resample = is_intraday
-        is_live_1d = False  # Live 1D data from data server (1-min bars, no resample needed)
+        # Historical intraday data arrives already aggregated by the data
+        # server (5-min bars for 1D, 15-min for 1W); only the live 1D chart
+        # gets raw 1-min bars
+        is_live_1d = False
         if is_intraday and len(self._data) >= 2:
             time_diff = (self._data.index[1] - self._data.index[0]).total_seconds()
-            if time_diff >= 300:  # 5 minutes or more - already aggregated
-                needs_resample = False
-            elif time_diff < 120:  # 1-2 minute data from today = live data
+            if time_diff < 120:  # 1-2 minute data from today = live data
                 # Check if this is today's data (live 1D)
                 today = pd.Timestamp.now().normalize()
                 if self._data.index[-1].normalize() == today:
                     is_live_1d = True
-                    needs_resample = False  # Use 1-min bars for live data
 
         if chart_type == "Candlestick":
-            # For candlestick with 1-min intraday data, aggregate to 5-minute bars
-            # Exception: live 1D data uses 1-min bars directly (already has delta volumes)
+            # Live 1D data uses 1-min bars directly (already has delta volumes)
             if is_live_1d:
                 # Live 1D data: make bars connect by setting open = previous close
                 display_data = self._data.copy()
@@ -785,27 +762,17 @@ class StockChart(QWidget):
                 display_data['high'] = display_data[['open', 'high']].max(axis=1)
                 display_data['low'] = display_data[['open', 'low']].min(axis=1)
                 display_data = self._filter_volume_outliers_preserve_index(display_data)
-            elif needs_resample:
-                display_data = self._data.resample('5min').agg({
-                    'open': 'first',
-                    'high': 'max',
-                    'low': 'min',
-                    'close': 'last',
-                    'volume': 'sum'  # Sum per-bar volumes into 5-min buckets
-                })
-                # Don't dropna() - keep full day index with NaN for future times
-                # Remove outlier volume bars (e.g., closing auction totals) only for valid data
-                valid_data = display_data.dropna()
-                if not valid_data.empty:
-                    display_data = self._filter_volume_outliers_preserve_index(display_data)
             else:
                 display_data = self._data
             self._display_data = display_data
-            self.candle_item = CandlestickItem(display_data)
+            # Reuse the item so a reload only re-renders the bars that changed
+            if self.candle_item is None:
+                self.candle_item = CandlestickItem(display_data)
+            else:
+                self.candle_item.set_data(display_data)
             self.price_widget.addItem(self.candle_item)
         elif chart_type == "OHLC":
-            # For OHLC with 1-min intraday data, aggregate to 5-minute bars
-            # Exception: live 1D data uses 1-min bars directly (already has delta volumes)
+            # Live 1D data uses 1-min bars directly (already has delta volumes)
             if is_live_1d:
                 # Live 1D data: make bars connect by setting open = previous close
                 display_data = self._data.copy()
@@ -818,22 +785,13 @@ class StockChart(QWidget):
                 display_data['high'] = display_data[['open', 'high']].max(axis=1)
                 display_data['low'] = display_data[['open', 'low']].min(axis=1)
                 display_data = self._filter_volume_outliers_preserve_index(display_data)
-            elif needs_resample:
-                display_data = self._data.resample('5min').agg({
-                    'open': 'first',
-                    'high': 'max',
-                    'low': 'min',
-                    'close': 'last',
-                    'volume': 'sum'  # Sum per-bar volumes into 5-min buckets
-                })
-                # Don't dropna() - keep full day index with NaN for future times
-                valid_data = display_data.dropna()
-                if not valid_data.empty:
-                    display_data = self._filter_volume_outliers_preserve_index(display_data)
             else:
                 display_data = self._data
             self._display_data = display_data
-            self.ohlc_item = OHLCItem(display_data)
+            if self.ohlc_item is None:
+                self.ohlc_item = OHLCItem(display_data)
+            else:
+                self.ohlc_item.set_data(display_data)
             self.price_widget.addItem(self.ohlc_item)
         elif chart_type == "Line":
             # For line chart, use raw 1-minute data for detail
@@ -953,11 +911,9 @@ class StockChart(QWidget):
 
         # Bollinger Bands
         if self._indicators.get("Bollinger") and len(close) >= 20:
-            sma = self._calculate_sma(close, 20)
-            std = pd.Series(close).rolling(20).std().values
-
-            upper = sma + 2 * std
-            lower = sma - 2 * std
+            sma, upper, lower = get_indicator_cache().get(
+                self._indicator_key(), "bollinger", {"close": close}, period=20, num_std=2.0
+            )
 
             upper_item = self.price_widget.plot(
                 x, upper, pen=pg.mkPen("#9CA3AF", width=1, style=Qt.DashLine)
@@ -973,13 +929,18 @@ class StockChart(QWidget):
             self._indicator_items["Bollinger_lower"] = lower_item
             self._indicator_items["Bollinger_middle"] = middle_item
 
+    def _indicator_key(self) -> Tuple[str, str]:
+        """Indicator cache key: results are reused (and extended by new
+        bars in O(1)) while the same symbol and period are shown."""
+        return (f"{self._ticker}.{self._exchange}", self._current_period)
+
     def _calculate_sma(self, data: np.ndarray, period: int) -> np.ndarray:
         """Calculate Simple Moving Average."""
-        return pd.Series(data).rolling(window=period).mean().values
+        return get_indicator_cache().get(self._indicator_key(), "sma", {"close": data}, period=period)
 
     def _calculate_ema(self, data: np.ndarray, period: int) -> np.ndarray:
         """Calculate Exponential Moving Average."""
-        return pd.Series(data).ewm(span=period, adjust=False).mean().values
+        return get_indicator_cache().get(self._indicator_key(), "ema", {"close": data}, period=period)
 
     def _filter_volume_outliers(self, data: pd.DataFrame) -> pd.DataFrame:
         """Remove volume outliers that are likely closing auction/total volumes."""
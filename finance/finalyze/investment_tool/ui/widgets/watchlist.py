@@ -40,6 +40,7 @@ class WatchlistTableModel(QAbstractTableModel):
     def __init__(self, parent: Optional[QWidget] = None):
         super().__init__(parent)
         self._data: List[Dict[str, Any]] = []
+        self._row_by_symbol: Optional[Dict[str, int]] = None  # built lazily
         self._period: str = "1D"
 
     def set_period(self, period: str) -> None:
@@ -153,8 +154,49 @@ class WatchlistTableModel(QAbstractTableModel):
         """Set the table data."""
         self.beginResetModel()
         self._data = data
+        self._row_by_symbol = None
         self.endResetModel()
 
+    def symbols(self) -> List[str]:
+        """"TICKER.EXCHANGE" for every row."""
+        return [f"{row.get('ticker')}.{row.get('exchange', 'US')}" for row in self._data]
+
+    def _rows_by_symbol(self) -> Dict[str, int]:
+        if self._row_by_symbol is None:
+            self._row_by_symbol = {symbol: i for i, symbol in enumerate(self.symbols())}
+        return self._row_by_symbol
+
+    def apply_live_prices(self, updates: Dict[str, Dict[str, Any]], intraday: bool) -> None:
+        """Update rows in place from pushed live prices, repainting only those rows.
+
+        Mirrors _refresh_watchlist: for 1D the change is price vs previous
+        close; for longer periods only price, volume and the absolute change
+        vs the period's start price move (change % stays the batch value).
+        """
+        rows = self._rows_by_symbol()
+        for symbol, live in updates.items():
+            row_index = rows.get(symbol)
+            if row_index is None or live.get("price") is None:
+                continue
+            row = self._data[row_index]
+
+            row["price"] = live["price"]
+            if live.get("volume") is not None:
+                row["volume"] = live["volume"]
+            if intraday:
+                if live.get("previous_close"):
+                    row["prev_close"] = live["previous_close"]
+                if row["prev_close"]:
+                    row["change"] = row["price"] - row["prev_close"]
+                    row["change_percent"] = row["change"] / row["prev_close"]
+                row["avg_volume"] = row["volume"]
+            elif row.get("open"):
+                row["change"] = row["price"] - row["open"]
+
+            self.dataChanged.emit(
+                self.index(row_index, 0), self.index(row_index, len(self.COLUMNS) - 1)
+            )
+
     def get_ticker_at(self, row: int) -> Optional[str]:
         """Get ticker at row index."""
         if 0 <= row < len(self._data):
@@ -172,6 +214,7 @@ class WatchlistTableModel(QAbstractTableModel):
         if 0 <= row < len(self._data):
             self.beginRemoveRows(QModelIndex(), row, row)
             del self._data[row]
+            self._row_by_symbol = None
             self.endRemoveRows()
 
 
@@ -228,6 +271,7 @@ class WatchlistWidget(QWidget):
         self._watchlists: Dict[int, Watchlist] = {}
         self._current_watchlist_id: Optional[int] = None
         self._current_period: str = "1D"  # Default period, synced with treemap
+        self._live_push_active: bool = False  # Live prices pushed; skip polling refresh
 
         self._setup_ui()
         self._load_watchlists()
@@ -508,9 +552,40 @@ class WatchlistWidget(QWidget):
         return None
 
     def _auto_refresh(self) -> None:
-        """Auto-refresh watchlist. Data comes from local data server (fast, cached)."""
+        """Auto-refresh watchlist. Data comes from local data server (fast, cached).
+
+        Skipped while live prices are pushed (see apply_live_prices).
+        """
+        if self._live_push_active:
+            return
         self._refresh_current()
 
+    def set_live_push_active(self, active: bool) -> None:
+        """Enable/disable polling refresh depending on the live price stream."""
+        self._live_push_active = active
+
+    def _models(self) -> List[WatchlistTableModel]:
+        models = []
+        for i in range(self.tab_widget.count()):
+            table = self.tab_widget.widget(i).findChild(QTableView)
+            model = table.property("model") if table else None
+            if model:
+                models.append(model)
+        return models
+
+    def get_symbols(self) -> set:
+        """"TICKER.EXCHANGE" for every stock in every watchlist tab."""
+        symbols = set()
+        for model in self._models():
+            symbols.update(model.symbols())
+        return symbols
+
+    def apply_live_prices(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        """Apply pushed live prices to all watchlist tabs."""
+        intraday = is_intraday_period(self._current_period)
+        for model in self._models():
+            model.apply_live_prices(updates, intraday)
+
     def _refresh_current(self) -> None:
         """Refresh the current watchlist."""
         if self._current_watchlist_id: